@@ -6,17 +6,30 @@ Saves disk space and speeds up the process significantly
 """
 
 import os
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-import time
 import re
-import csv
-from datetime import datetime
+import time
+import queue
+import threading
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+from html_extract import panel_image_srcs
+from http_client import get_rate_limiter, get_session
+from mirror_pool import mirrored_get, print_mirror_report
+from retry_policy import CLOUDINARY_HOST, retry_call, wait_for_host
+from admin_api import admin_call, ensure_folder, print_admin_report
+from cdn_probe import probe_chapters
+from upload_manifest import (
+    asset_entry, check_upload_manifest, load_manga_upload_manifests, load_upload_manifest,
+    panel_index, record_uploads, shared_asset_entry
+)
+from chapter_index import get_chapter_catalog
+from chapter_manifest import HASH_ALGORITHM, new_hasher
+from panel_store import PANEL_STORE_DIR, get_panel_store, print_savings_report
+from metadata_store import get_store, metadata_exists, CLOUDINARY_CSV_FIELDS
 
 # ============================================
 # CONFIGURATION
@@ -30,7 +43,17 @@ cloudinary.config(
 
 CLOUDINARY_BASE = "manga"  # Base folder in Cloudinary
 METADATA_CSV = "cloudinary_manga_metadata.csv"
+PANEL_STORE_ROOT = PANEL_STORE_DIR  # Registry of uploaded content, reused for repeated panels
 MAX_RETRY_ATTEMPTS = 3
+FETCH_WORKERS = 4       # Source downloads in flight per chapter (the per-host budget still applies)
+UPLOAD_WORKERS = 4      # Cloudinary uploads in flight per chapter
+UPLOAD_QUEUE_SIZE = 8   # Downloaded panels waiting for upload; fetchers pause when it is full
+REMOTE_FETCH = False    # Let Cloudinary pull panels by source URL (hosts that refuse fall back to proxying)
+REMOTE_FETCH_FAILURE_LIMIT = 3  # Failed pulls before a host is proxied for the rest of the run
+SOURCE_HEAD_TIMEOUT = 10        # HEAD to the source that a pulled panel's size is checked against
+
+_remote_fetch_failures = {}  # host -> failed Cloudinary pulls this run
+_remote_fetch_lock = threading.Lock()
 
 # ============================================
 # HELPER FUNCTIONS
@@ -50,80 +73,301 @@ def print_header(title):
 
 
 def ensure_cloudinary_folder(folder_path):
-    """Create folder structure in Cloudinary"""
-    try:
-        cloudinary.api.create_folder(folder_path)
-        return True
-    except Exception as e:
-        # Folder might already exist
-        if 'already exists' in str(e).lower() or 'exist' in str(e).lower():
-            return True
-        print(f"⚠️  Folder creation warning: {str(e)[:50]}")
-        return False
+    """Create folder structure in Cloudinary (parents included; known folders cost no Admin API call)"""
+    return ensure_folder(folder_path)
 
 
 # ============================================
 # METADATA MANAGEMENT
 # ============================================
 
-def update_metadata(manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error='', cloudinary_urls=[]):
-    """Update metadata CSV with chapter information"""
-    
-    # Ensure CSV exists
-    if not os.path.exists(METADATA_CSV):
-        with open(METADATA_CSV, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'manga_name', 'manga_slug', 'chapter_number', 
-                'panel_count', 'expected_count', 'status', 
-                'timestamp', 'error', 'cloudinary_folder'
-            ])
-    
-    # Read existing rows
-    rows = []
-    chapter_exists = False
-    
-    with open(METADATA_CSV, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        
-        for row in reader:
-            if row['manga_slug'] == manga_slug and int(row['chapter_number']) == chapter_num:
-                # Update existing
-                row['manga_name'] = manga_name
-                row['panel_count'] = panel_count
-                row['expected_count'] = expected_count
-                row['status'] = status
-                row['timestamp'] = datetime.now().isoformat()
-                row['error'] = error
-                row['cloudinary_folder'] = f"{CLOUDINARY_BASE}/{manga_slug}/chapter-{chapter_num:03d}"
-                chapter_exists = True
-            rows.append(row)
-    
-    # Write back
-    with open(METADATA_CSV, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-        
-        if not chapter_exists:
-            writer.writerow({
-                'manga_name': manga_name,
-                'manga_slug': manga_slug,
-                'chapter_number': chapter_num,
-                'panel_count': panel_count,
-                'expected_count': expected_count,
-                'status': status,
-                'timestamp': datetime.now().isoformat(),
-                'error': error,
-                'cloudinary_folder': f"{CLOUDINARY_BASE}/{manga_slug}/chapter-{chapter_num:03d}"
-            })
+def update_metadata(manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error=''):
+    """
+    Upsert chapter information in the metadata store (exported to METADATA_CSV after each run).
+    Per-panel upload results live in the chapter's upload manifest.
+    """
+    get_store(METADATA_CSV).upsert_chapter(
+        manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error,
+        cloudinary_folder=f"{CLOUDINARY_BASE}/{manga_slug}/chapter-{chapter_num:03d}"
+    )
+
+
+def export_metadata():
+    """Refresh METADATA_CSV from the metadata store"""
+    rows = get_store(METADATA_CSV).export_csv(METADATA_CSV, fieldnames=CLOUDINARY_CSV_FIELDS)
+    print(f"💾 Exported {rows} metadata rows to {METADATA_CSV}")
 
 
 # ============================================
 # CORE SCRAPING WITH DIRECT UPLOAD
 # ============================================
 
+def upload_panel_bytes(content, img_url, idx, cloudinary_chapter_folder, store):
+    """
+    Upload one downloaded panel as panel-NNN, unless the same content was uploaded before.
+    Returns: (upload manifest entry, reused)
+    """
+    # Same content uploaded before (e.g. a credits page): reference that asset
+    hasher = new_hasher()
+    hasher.update(content)
+    key = f"{HASH_ALGORITHM}-{hasher.hexdigest()}"
+    shared = store.remote_asset(key)
+    if shared:
+        store.remember_source(img_url, key)
+        store.add_saving('upload', len(content))
+        return shared_asset_entry(idx, shared[0], shared[1], len(content), img_url), True
+    
+    # Get file extension
+    ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
+    ext = ext.lstrip('.')
+    
+    # Normalize extension
+    if ext.lower() == 'jpeg':
+        ext = 'jpg'
+    
+    # Upload to Cloudinary directly from memory
+    upload_result = retry_call(lambda: cloudinary.uploader.upload(
+        BytesIO(content),
+        folder=cloudinary_chapter_folder,
+        public_id=f"panel-{idx:03d}",
+        overwrite=False,
+        resource_type="auto",
+        use_filename=False,
+        unique_filename=False,
+        format=ext
+    ), CLOUDINARY_HOST)
+    
+    cloudinary_url = upload_result.get('secure_url')
+    store.record_remote(
+        key, len(content), f".{ext}",
+        cloudinary_url, upload_result.get('public_id'), img_url
+    )
+    return asset_entry(idx, upload_result, img_url), False
+
+
+def download_panel_bytes(img_url, headers):
+    """Source panel into memory (mirror-aware, shared retry policy)"""
+    img_response = mirrored_get(img_url, headers=headers, timeout=15)
+    img_response.raise_for_status()
+    return img_response.content
+
+
+# ---------- server-side fetch ----------
+
+def remote_fetch_allowed(img_url):
+    """False once the panel's host has refused Cloudinary's pulls REMOTE_FETCH_FAILURE_LIMIT times"""
+    with _remote_fetch_lock:
+        return _remote_fetch_failures.get(urlparse(img_url).netloc, 0) < REMOTE_FETCH_FAILURE_LIMIT
+
+
+def note_remote_fetch_failure(img_url, error):
+    host = urlparse(img_url).netloc
+    with _remote_fetch_lock:
+        failures = _remote_fetch_failures.get(host, 0) + 1
+        _remote_fetch_failures[host] = failures
+    if failures == REMOTE_FETCH_FAILURE_LIMIT:
+        print(f"🛡️  {host} refuses server-side fetches ({str(error)[:60]}), proxying its panels from now on")
+
+
+def source_panel_size(img_url, headers):
+    """Size the source reports for a panel to us (HEAD with our headers), or None if it won't say"""
+    def attempt():
+        get_rate_limiter().acquire(img_url)
+        return get_session().head(img_url, headers=headers, timeout=SOURCE_HEAD_TIMEOUT, allow_redirects=True)
+    
+    try:
+        response = retry_call(attempt, img_url)
+    except Exception:
+        return None
+    response.close()
+    
+    length = response.headers.get('Content-Length')
+    if response.status_code != 200 or response.headers.get('Content-Encoding') or not (length or '').isdigit():
+        return None
+    return int(length)
+
+
+def reject_pulled_asset(upload_result, reason):
+    """Delete a pulled asset that isn't the panel and raise, so the proxied upload takes its place"""
+    cloudinary.uploader.destroy(upload_result.get('public_id'), resource_type=upload_result.get('resource_type'))
+    raise ValueError(reason)
+
+
+def upload_panel_remote(img_url, idx, cloudinary_chapter_folder, store, headers=None):
+    """
+    Have Cloudinary download the panel from its source URL (our machine never sees the bytes).
+    Hotlink / Referer protection can hand Cloudinary an error page or a placeholder image,
+    so the pulled asset must be an image of the size the source reports to us (HEAD).
+    Raises if the pull fails or the asset doesn't match (it is deleted first).
+    With overwrite=False an already published panel-NNN comes back unchanged
+    ('existing'); it is kept as is and never deleted.
+    Returns: upload manifest entry
+    """
+    upload_result = retry_call(lambda: cloudinary.uploader.upload(
+        img_url,
+        folder=cloudinary_chapter_folder,
+        public_id=f"panel-{idx:03d}",
+        overwrite=False,
+        resource_type="auto",
+        use_filename=False,
+        unique_filename=False
+    ), CLOUDINARY_HOST)
+    
+    size = upload_result.get('bytes', 0)
+    existing = upload_result.get('existing', False)
+    if not existing:
+        if upload_result.get('resource_type') != 'image':
+            reject_pulled_asset(upload_result, f"Source returned {upload_result.get('resource_type')} content, not an image")
+        
+        expected_size = source_panel_size(img_url, headers)
+        if expected_size is not None and expected_size != size:
+            reject_pulled_asset(upload_result, f"Pulled {size} bytes but the source serves us {expected_size} (placeholder image?)")
+    
+    # No local bytes to hash, so Cloudinary's etag (MD5 of the content) keys the asset.
+    # Content dedupe looks up HASH_ALGORITHM keys, so a pulled panel is only ever
+    # reused through its source URL, never as the shared copy of identical content.
+    store.record_remote(
+        f"md5-{upload_result.get('etag')}", size, f".{upload_result.get('format', 'jpg')}",
+        upload_result.get('secure_url'), upload_result.get('public_id'), img_url
+    )
+    if not existing:
+        store.add_saving('remote_fetch', size)
+    return asset_entry(idx, upload_result, img_url)
+
+
+def known_uploads(cloudinary_chapter_folder, attempted):
+    """
+    Panels of a chapter already in Cloudinary: its upload manifest, or for a chapter
+    attempted before manifests existed, an Admin API listing of its folder, followed
+    page by page (saved as the chapter's manifest, empty if nothing was found, so it
+    is never listed again).
+    Returns: the upload manifest, or None for a chapter never attempted
+    """
+    manifest = load_upload_manifest(cloudinary_chapter_folder)
+    if manifest is not None or not attempted:
+        return manifest
+    
+    resources = []
+    next_cursor = None
+    
+    while True:
+        result = admin_call(
+            cloudinary.api.resources,
+            type='upload',
+            prefix=f"{cloudinary_chapter_folder}/",
+            max_results=500,
+            resource_type='image',
+            next_cursor=next_cursor
+        )
+        resources.extend(result.get('resources', []))
+        
+        next_cursor = result.get('next_cursor')
+        if not next_cursor:
+            break
+    
+    entries = [
+        asset_entry(panel_index(resource['public_id']), resource)
+        for resource in resources
+        if resource['public_id'].rsplit('/', 1)[0] == cloudinary_chapter_folder
+        and panel_index(resource['public_id']) is not None
+    ]
+    return record_uploads(cloudinary_chapter_folder, entries)
+
+
+def transfer_panels(image_urls, headers, cloudinary_chapter_folder, store, remote_fetch=REMOTE_FETCH, skip=()):
+    """
+    Move a chapter's panels from the source to Cloudinary as a producer/consumer pipeline.
+    FETCH_WORKERS download into a bounded queue that UPLOAD_WORKERS drain, so source
+    and upload latency overlap; fetchers pause while the queue is full, which bounds
+    memory. Panel numbers are fixed by page position before anything is dispatched.
+    With remote_fetch, panels are queued without downloading and Cloudinary pulls
+    them by URL; a refused pull falls back to downloading and uploading the bytes.
+    Panel indexes in skip (already uploaded) are neither fetched nor uploaded.
+    Returns: ({panel_index: upload manifest entry}, failed_count)
+    """
+    total = len(image_urls)
+    uploaded = {}
+    failures = []
+    results_lock = threading.Lock()
+    panel_queue = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+    
+    def finish(idx, entry, message):
+        with results_lock:
+            uploaded[idx] = entry
+        print(f"{message} [{idx}/{total}] panel-{idx:03d}")
+    
+    def fail(idx, message):
+        with results_lock:
+            failures.append(idx)
+        print(f"❌ [{idx}/{total}] {message[:80]}")
+    
+    def fetch(idx, img_url):
+        try:
+            # Same source URL already uploaded: reuse that asset, no download or upload
+            known = store.remote_asset_for_url(img_url)
+            if known:
+                cloudinary_url, public_id, size = known
+                store.add_saving('download', size)
+                store.add_saving('upload', size)
+                finish(idx, shared_asset_entry(idx, cloudinary_url, public_id, size, img_url), "♻️  Reused shared asset")
+                return
+            
+            if remote_fetch and remote_fetch_allowed(img_url):
+                content = None  # Cloudinary downloads it
+            else:
+                content = download_panel_bytes(img_url, headers)
+        except Exception as e:
+            fail(idx, f"Download failed: {e}")
+            return
+        
+        panel_queue.put((idx, img_url, content))  # Blocks while uploads are behind
+    
+    def upload_worker():
+        while True:
+            item = panel_queue.get()
+            if item is None:
+                return
+            idx, img_url, content = item
+            
+            if content is None:
+                try:
+                    finish(idx, upload_panel_remote(img_url, idx, cloudinary_chapter_folder, store, headers),
+                           "🛰️  Pulled by Cloudinary")
+                    continue
+                except Exception as e:
+                    note_remote_fetch_failure(img_url, e)
+                try:
+                    content = download_panel_bytes(img_url, headers)
+                except Exception as e:
+                    fail(idx, f"Download failed: {e}")
+                    continue
+            
+            try:
+                entry, reused = upload_panel_bytes(content, img_url, idx, cloudinary_chapter_folder, store)
+            except Exception as e:
+                fail(idx, f"Upload failed: {e}")
+                continue
+            finish(idx, entry, "♻️  Duplicate content, reused shared asset" if reused else "✅ Uploaded")
+    
+    uploaders = [threading.Thread(target=upload_worker, daemon=True) for _ in range(max(1, UPLOAD_WORKERS))]
+    for thread in uploaders:
+        thread.start()
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, FETCH_WORKERS)) as fetchers:
+            for idx, img_url in enumerate(image_urls, 1):
+                if idx not in skip:
+                    fetchers.submit(fetch, idx, img_url)
+    finally:
+        # One stop marker per uploader, queued behind the remaining panels
+        for _ in uploaders:
+            panel_queue.put(None)
+        for thread in uploaders:
+            thread.join()
+    
+    return uploaded, len(failures)
+
+
 def scrape_chapter_direct_to_cloudinary(chapter_url, manga_name, manga_slug, chapter_num):
     """
     Scrape chapter and upload directly to Cloudinary
@@ -141,12 +385,11 @@ def scrape_chapter_direct_to_cloudinary(chapter_url, manga_name, manga_slug, cha
     
     try:
         # Fetch chapter page
-        response = requests.get(chapter_url, headers=headers, timeout=10)
+        response = mirrored_get(chapter_url, headers=headers, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        images = soup.select('.page-break.no-gaps img')
-        expected_count = len(images)
+        raw_urls = panel_image_srcs(response.content)
+        expected_count = len(raw_urls)
         
         print(f"🔍 Found {expected_count} panels to upload")
         
@@ -156,12 +399,7 @@ def scrape_chapter_direct_to_cloudinary(chapter_url, manga_name, manga_slug, cha
         
         # Get image URLs
         image_urls = []
-        for img in images:
-            img_url = (img.get('src') or 
-                      img.get('data-src') or 
-                      img.get('data-lazy-src') or
-                      img.get('data-original'))
-            
+        for img_url in raw_urls:
             if img_url:
                 img_url = img_url.strip()
                 full_url = urljoin(chapter_url, img_url)
@@ -175,60 +413,38 @@ def scrape_chapter_direct_to_cloudinary(chapter_url, manga_name, manga_slug, cha
         cloudinary_chapter_folder = f"{CLOUDINARY_BASE}/{manga_slug}/chapter-{chapter_num:03d}"
         
         print(f"☁️  Cloudinary folder: {cloudinary_chapter_folder}")
-        ensure_cloudinary_folder(f"{CLOUDINARY_BASE}/{manga_slug}")
-        ensure_cloudinary_folder(cloudinary_chapter_folder)
-        
-        # Upload images directly to Cloudinary
-        uploaded_count = 0
-        failed_count = 0
-        cloudinary_urls = []
-        
-        print(f"\n📤 Uploading {len(image_urls)} panels directly to Cloudinary...\n")
         
-        for idx, img_url in enumerate(image_urls, 1):
-            try:
-                # Download image to memory
-                img_response = requests.get(img_url, headers=headers, timeout=15)
-                img_response.raise_for_status()
-                
-                # Get file extension
-                ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
-                ext = ext.lstrip('.')
-                
-                # Normalize extension
-                if ext.lower() == 'jpeg':
-                    ext = 'jpg'
-                
-                # Create public_id (filename without extension)
-                public_id = f"panel-{idx:03d}"
-                
-                # Upload to Cloudinary directly from memory
-                upload_result = cloudinary.uploader.upload(
-                    BytesIO(img_response.content),
-                    folder=cloudinary_chapter_folder,
-                    public_id=public_id,
-                    overwrite=False,
-                    resource_type="auto",
-                    use_filename=False,
-                    unique_filename=False,
-                    format=ext
-                )
-                
-                cloudinary_url = upload_result.get('secure_url')
-                cloudinary_urls.append(cloudinary_url)
-                
-                print(f"✅ [{idx}/{len(image_urls)}] Uploaded: panel-{idx:03d}.{ext} → Cloudinary")
-                uploaded_count += 1
-                
-                # Be polite - small delay
-                time.sleep(0.3)
-                
-            except requests.exceptions.RequestException as e:
-                print(f"❌ [{idx}/{len(image_urls)}] Download failed: {str(e)[:60]}")
-                failed_count += 1
-            except Exception as e:
-                print(f"❌ [{idx}/{len(image_urls)}] Upload failed: {str(e)[:60]}")
-                failed_count += 1
+        # A retried chapter only costs its missing panels
+        attempted = get_store(METADATA_CSV).get_chapter(manga_slug, chapter_num) is not None
+        previous = known_uploads(cloudinary_chapter_folder, attempted)
+        skip = {
+            entry['index'] for entry in (previous['panels'].values() if previous else [])
+            if entry['index'] <= len(image_urls)
+        }
+        missing = len(image_urls) - len(skip)
+        if skip:
+            print(f"⏭️  {len(skip)} panels already uploaded, {missing} missing")
+        
+        uploaded, failed_count = {}, 0
+        if missing:
+            ensure_cloudinary_folder(cloudinary_chapter_folder)
+            
+            # Fetch and upload overlap: downloaded panels queue up for the upload workers
+            print(f"\n📤 Uploading {missing} panels directly to Cloudinary "
+                  f"({FETCH_WORKERS} fetchers → {UPLOAD_WORKERS} uploaders"
+                  f"{', server-side fetch' if REMOTE_FETCH else ''})...\n")
+            
+            store = get_panel_store(PANEL_STORE_ROOT)
+            uploaded, failed_count = transfer_panels(image_urls, headers, cloudinary_chapter_folder, store, skip=skip)
+        
+        # What Cloudinary answered for each panel, kept for verification and publishing
+        manifest = record_uploads(cloudinary_chapter_folder, uploaded.values(), expected_count, chapter_url)
+        chapter_entries = sorted(
+            (entry for entry in manifest['panels'].values() if entry['index'] <= len(image_urls)),
+            key=lambda entry: entry['index']
+        )
+        uploaded_count = len(chapter_entries)
+        cloudinary_urls = [entry['secure_url'] for entry in chapter_entries]
         
         # Determine status
         if uploaded_count == expected_count:
@@ -244,7 +460,7 @@ def scrape_chapter_direct_to_cloudinary(chapter_url, manga_name, manga_slug, cha
         # Update metadata
         update_metadata(
             manga_name, manga_slug, chapter_num,
-            uploaded_count, expected_count, status, error_msg, cloudinary_urls
+            uploaded_count, expected_count, status, error_msg
         )
         
         # Summary
@@ -269,47 +485,15 @@ def scrape_chapter_direct_to_cloudinary(chapter_url, manga_name, manga_slug, cha
 # ============================================
 
 def get_all_chapters(manga_url):
-    """Get list of all chapters from manga page"""
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    }
+    """Get list of all chapters from manga page (shared, persisted chapter catalog)"""
     
     print(f"🔍 Fetching chapter list from: {manga_url}")
     
-    try:
-        response = requests.get(manga_url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        chapter_links = []
-        links = soup.select('ul.main li a')
-        
-        for link in links:
-            href = link.get('href')
-            if href and '/chapter-' in href:
-                match = re.search(r'chapter-(\d+)', href)
-                if match:
-                    chapter_num = int(match.group(1))
-                    full_url = urljoin(manga_url, href)
-                    chapter_links.append({
-                        'url': full_url,
-                        'number': chapter_num,
-                        'text': link.get_text(strip=True)
-                    })
-        
-        # Remove duplicates and sort
-        unique_chapters = {ch['number']: ch for ch in chapter_links}
-        sorted_chapters = sorted(unique_chapters.values(), key=lambda x: x['number'])
-        
-        print(f"✅ Found {len(sorted_chapters)} chapters")
-        
-        return sorted_chapters
-        
-    except Exception as e:
-        print(f"❌ Error fetching chapter list: {e}")
-        return []
+    sorted_chapters = get_chapter_catalog(manga_url)
+    
+    print(f"✅ Found {len(sorted_chapters)} chapters")
+    
+    return sorted_chapters
 
 
 # ============================================
@@ -373,8 +557,8 @@ def scrape_all_chapters_direct(manga_url, manga_name, manga_slug, start_chapter=
             else:
                 failed_chapters.append(chapter_num)
             
-            # Delay between chapters
-            time.sleep(2)
+            # Pacing comes from the per-host budget; a parked host holds the next chapter here
+            wait_for_host(chapter['url'])
             
         except KeyboardInterrupt:
             print("\n\n⚠️  Download interrupted by user")
@@ -396,47 +580,54 @@ def scrape_all_chapters_direct(manga_url, manga_name, manga_slug, start_chapter=
     print(f"📄 Metadata: {METADATA_CSV}")
     print(f"💡 Disk space used: 0 bytes (direct upload)")
     print("="*80 + "\n")
+    
+    print_savings_report(get_panel_store(PANEL_STORE_ROOT))
+    print_mirror_report()
+    print_admin_report()
+    export_metadata()
 
 
 def load_existing_metadata(manga_slug):
     """Load existing metadata for a manga"""
     existing = {}
     
-    if not os.path.exists(METADATA_CSV):
-        return existing
-    
-    with open(METADATA_CSV, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['manga_slug'] == manga_slug:
-                chapter_num = int(row['chapter_number'])
-                existing[chapter_num] = {
-                    'panel_count': int(row['panel_count']),
-                    'expected_count': int(row.get('expected_count', row['panel_count'])),
-                    'status': row['status']
-                }
+    for chapter_num, row in get_store(METADATA_CSV).load_manga(manga_slug).items():
+        existing[chapter_num] = {
+            'panel_count': row['panel_count'],
+            'expected_count': row['expected_count'],
+            'status': row['status']
+        }
     
     return existing
 
 
-def verify_cloudinary_manga(manga_slug):
-    """Verify manga in Cloudinary using metadata"""
+def verify_cloudinary_manga(manga_slug, remote=False):
+    """
+    Verify manga in Cloudinary using metadata and the chapters' upload manifests
+    (chapters uploaded before manifests existed are judged by metadata alone).
+    With remote=True every recorded panel is also probed on the CDN (HEAD requests,
+    no Admin API quota), so deleted or never-finished assets are found.
+    """
     print_header(f"🔍 VERIFYING: {manga_slug}")
     
-    if not os.path.exists(METADATA_CSV):
+    if not metadata_exists(METADATA_CSV):
         print("❌ No metadata file found")
         return []
     
     # Load metadata
-    metadata = {}
-    with open(METADATA_CSV, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['manga_slug'] == manga_slug:
-                chapter_num = int(row['chapter_number'])
-                metadata[chapter_num] = row
+    metadata = get_store(METADATA_CSV).load_manga(manga_slug)
+    
+    manifests = load_manga_upload_manifests(f"{CLOUDINARY_BASE}/{manga_slug}")
+    
+    print(f"📊 Found metadata for {len(metadata)} chapters, upload manifests for {len(manifests)}\n")
     
-    print(f"📊 Found metadata for {len(metadata)} chapters\n")
+    probes = {}
+    if remote:
+        panel_total = sum(len(manifest['panels']) for manifest in manifests.values())
+        print(f"🛰️  Probing {panel_total} panels on the CDN...")
+        started = time.monotonic()
+        probes = probe_chapters({n: m for n, m in manifests.items() if n in metadata})
+        print(f"🛰️  Probed in {time.monotonic() - started:.1f}s\n")
     
     issues = []
     checked = 0
@@ -444,14 +635,33 @@ def verify_cloudinary_manga(manga_slug):
     for chapter_num, meta in sorted(metadata.items()):
         checked += 1
         status = meta['status']
-        panel_count = int(meta['panel_count'])
-        expected = int(meta.get('expected_count', panel_count))
+        panel_count = meta['panel_count']
+        expected = meta['expected_count']
         
         if status == 'failed' or panel_count != expected:
             print(f"❌ Chapter {chapter_num}: {status} ({panel_count}/{expected} panels)")
             issues.append(chapter_num)
-        else:
-            print(f"✅ Chapter {chapter_num}: OK ({panel_count} panels)")
+            continue
+        
+        if chapter_num in manifests:
+            panel_count, expected, is_valid, issue = check_upload_manifest(manifests[chapter_num], expected)
+            if not is_valid:
+                print(f"❌ Chapter {chapter_num}: {issue}")
+                issues.append(chapter_num)
+                continue
+        elif remote:
+            print(f"❌ Chapter {chapter_num}: no upload manifest, nothing to probe")
+            issues.append(chapter_num)
+            continue
+        
+        if probes.get(chapter_num):
+            problems = probes[chapter_num]
+            name, issue = sorted(problems.items())[0]
+            print(f"❌ Chapter {chapter_num}: {len(problems)} panels not served by the CDN ({name}: {issue})")
+            issues.append(chapter_num)
+            continue
+        
+        print(f"✅ Chapter {chapter_num}: OK ({panel_count} panels{', served by the CDN' if remote else ''})")
     
     print(f"\n{'='*80}")
     print(f"📊 Verification Summary")
@@ -510,7 +720,7 @@ def retry_failed_chapters(manga_url, manga_name, manga_slug):
             else:
                 still_failed.append(chapter_num)
             
-            time.sleep(2)
+            wait_for_host(chapter_map[chapter_num]['url'])
             
         except Exception as e:
             print(f"❌ Chapter {chapter_num} error: {e}")
@@ -524,6 +734,8 @@ def retry_failed_chapters(manga_url, manga_name, manga_slug):
     
     if still_failed:
         print(f"Chapter numbers: {', '.join(map(str, still_failed))}")
+    
+    export_metadata()
 
 
 # ============================================
@@ -576,7 +788,8 @@ def main():
         
         elif choice == '3':
             manga_slug = input("Enter manga slug: ").strip()
-            verify_cloudinary_manga(manga_slug)
+            remote = input("Probe every panel on the CDN too? (y/n): ").strip().lower() == 'y'
+            verify_cloudinary_manga(manga_slug, remote=remote)
         
         elif choice == '4':
             retry_failed_chapters(manga_url, manga_name, manga_slug)
@@ -8,9 +8,7 @@ import os
 import sys
 import time
 import json
-import csv
 from datetime import datetime
-from pathlib import Path
 
 # Import from your existing modules
 # Assuming manga_scraper.py and cloudinary_manager.py are in the same directory
@@ -20,7 +18,19 @@ try:
         scrape_all_chapters,
         verify_all_chapters_local,
         redownload_chapters,
-        get_all_chapters
+        get_all_chapters,
+        check_new_chapters
+    )
+    from metadata_store import get_store, metadata_exists
+    from chapter_manifest import check_manifest, list_local_images, load_manifest
+    from disk_budget import ChapterDiskCache, chapter_number
+    from image_integrity import check_image_file
+    from verify_cache import list_chapter_folders
+    from panel_transcode import transcode_manga, TRANSCODE_FORMAT, TRANSCODE_QUALITY
+    from retry_policy import CLOUDINARY_HOST, RetryPolicy, retry_call, wait_for_host
+    from admin_api import ensure_folder, mark_folder_known, print_admin_report
+    from upload_manifest import (
+        asset_entry, load_manga_upload_manifests, panel_index, record_uploads, uploaded_public_ids
     )
     from cloudinary_manager import (
         auto_upload_missing,
@@ -44,6 +54,12 @@ BASE_PATH = r"E:\UOM\My-CODE_RUSH\projects\HiManga\public"
 METADATA_CSV = os.path.join(BASE_PATH, 'manga_metadata.csv')
 CLOUDINARY_BASE = "manga"  # Base folder in Cloudinary
 MAX_RETRY_ATTEMPTS = 3  # Maximum retry attempts for failed chapters
+FIX_ROUND_POLICY = RetryPolicy(base_delay=5, max_delay=120)  # Backoff between fix rounds
+CHAPTER_WORKERS = 4  # Chapters scraped in parallel (they share one per-host request budget)
+DEEP_VERIFY = False  # Decode-check every panel before upload (results are cached per file)
+DISCARD_DAMAGED = False  # With DEEP_VERIFY: delete damaged panels and re-download them (else report only)
+TRANSCODE_PANELS = False  # Re-encode panels to TRANSCODE_FORMAT before upload (needs Pillow)
+DISK_BUDGET_GB = None  # Cap on local chapter storage: chapters upload as they finish and are evicted (oldest upload first) once confirmed
 PIPELINE_LOG = os.path.join(BASE_PATH, 'pipeline_log.json')
 
 
@@ -113,9 +129,10 @@ def print_step(step_num, total_steps, description):
     print(f"{'─'*80}\n")
 
 
-def step1_scrape_manga(manga_url, manga_name, manga_slug, start_chapter=1, end_chapter=None):
+def step1_scrape_manga(manga_url, manga_name, manga_slug, start_chapter=1, end_chapter=None, disk_cache=None):
     """
     Step 1: Scrape all chapters from manga website
+    With a disk_cache each chapter is uploaded as soon as it is complete.
     Returns: (success, total_chapters, failed_chapters)
     """
     print_step(1, 5, "SCRAPING MANGA CHAPTERS")
@@ -146,7 +163,9 @@ def step1_scrape_manga(manga_url, manga_name, manga_slug, start_chapter=1, end_c
             manga_slug=manga_slug,
             base_path=BASE_PATH,
             start_chapter=start_chapter,
-            end_chapter=end_chapter
+            end_chapter=end_chapter,
+            chapter_workers=CHAPTER_WORKERS,
+            disk_cache=disk_cache
         )
         
         # Count failed chapters from metadata
@@ -174,7 +193,9 @@ def step2_verify_chapters(manga_slug):
         chapters_to_fix = verify_all_chapters_local(
             manga_slug=manga_slug,
             base_path=BASE_PATH,
-            metadata_csv_path=METADATA_CSV
+            metadata_csv_path=METADATA_CSV,
+            deep=DEEP_VERIFY,
+            discard_damaged_panels=DISCARD_DAMAGED
         )
         
         if len(chapters_to_fix) == 0:
@@ -207,7 +228,8 @@ def step3_fix_failed_chapters(manga_url, manga_name, manga_slug, failed_chapters
             manga_slug=manga_slug,
             base_path=BASE_PATH,
             chapter_numbers=failed_chapters,
-            metadata_csv_path=METADATA_CSV
+            metadata_csv_path=METADATA_CSV,
+            resume=True
         )
         
         # Verify again after re-download
@@ -215,7 +237,9 @@ def step3_fix_failed_chapters(manga_url, manga_name, manga_slug, failed_chapters
         still_failed = verify_all_chapters_local(
             manga_slug=manga_slug,
             base_path=BASE_PATH,
-            metadata_csv_path=METADATA_CSV
+            metadata_csv_path=METADATA_CSV,
+            deep=DEEP_VERIFY,
+            discard_damaged_panels=DISCARD_DAMAGED
         )
         
         if len(still_failed) == 0:
@@ -230,9 +254,40 @@ def step3_fix_failed_chapters(manga_url, manga_name, manga_slug, failed_chapters
         return False, failed_chapters
 
 
-def step4_upload_to_cloudinary(manga_slug):
+def step3b_transcode_panels(manga_slug):
+    """
+    Optional step between verification and upload: re-encode panels to a smaller format.
+    Panels already in Cloudinary keep their format, so local and remote paths still match.
+    Returns: (success, transcode_summary)
+    """
+    print_step('3b', 5, f"TRANSCODING PANELS TO {TRANSCODE_FORMAT.upper()}")
+    
+    try:
+        local_folder = os.path.join(BASE_PATH, manga_slug)
+        cloudinary_base = f"{CLOUDINARY_BASE}/{manga_slug}"
+        
+        uploaded = {
+            os.path.splitext(public_id[len(cloudinary_base) + 1:])[0]
+            for public_id in get_uploaded_files(local_folder, cloudinary_base)
+        }
+        
+        summary = transcode_manga(
+            local_folder,
+            target_format=TRANSCODE_FORMAT,
+            quality=TRANSCODE_QUALITY,
+            skip_panels=uploaded
+        )
+        return True, summary
+        
+    except Exception as e:
+        print(f"❌ Transcode error: {e}")
+        return False, {}
+
+
+def step4_upload_to_cloudinary(manga_slug, disk_cache=None):
     """
     Step 4: Upload to Cloudinary
+    With a disk_cache only chapters without a confirmed upload are sent (per chapter).
     Returns: (success, uploaded_count, failed_count)
     """
     print_step(4, 5, "UPLOADING TO CLOUDINARY")
@@ -248,9 +303,12 @@ def step4_upload_to_cloudinary(manga_slug):
             print(f"❌ Local folder not found: {local_folder}")
             return False, 0, 0
         
-        # Use the auto-upload function from cloudinary_manager
-        # We need to implement a return value version
-        uploaded, failed = upload_manga_to_cloudinary(local_folder, cloudinary_base)
+        if disk_cache is not None:
+            uploaded, failed = upload_pending_chapters(manga_slug, disk_cache)
+        else:
+            # Use the auto-upload function from cloudinary_manager
+            # We need to implement a return value version
+            uploaded, failed = upload_manga_to_cloudinary(local_folder, cloudinary_base)
         
         print(f"\n✅ Upload complete!")
         print(f"📤 Uploaded: {uploaded}")
@@ -263,9 +321,10 @@ def step4_upload_to_cloudinary(manga_slug):
         return False, 0, 0
 
 
-def step5_final_verification(manga_slug):
+def step5_final_verification(manga_slug, disk_cache=None):
     """
     Step 5: Final verification (local + cloudinary)
+    With a disk_cache, Cloudinary is checked against the upload record instead of the local files.
     Returns: (success, summary)
     """
     print_step(5, 5, "FINAL VERIFICATION")
@@ -284,16 +343,19 @@ def step5_final_verification(manga_slug):
         local_folder = os.path.join(BASE_PATH, manga_slug)
         cloudinary_base = f"{CLOUDINARY_BASE}/{manga_slug}"
         
-        local_files = get_local_image_files(local_folder, cloudinary_base)
-        cloudinary_files = get_all_public_ids_with_extension(cloudinary_base)
-        
-        missing_in_cloudinary = local_files - cloudinary_files
+        if disk_cache is not None:
+            missing_in_cloudinary, cloudinary_file_count = check_upload_record(manga_slug)
+        else:
+            local_files = get_local_image_files(local_folder, cloudinary_base)
+            cloudinary_files = get_uploaded_files(local_folder, cloudinary_base)
+            missing_in_cloudinary = local_files - cloudinary_files
+            cloudinary_file_count = len(cloudinary_files)
         
         summary = {
             'local_issues': len(local_issues),
             'missing_in_cloudinary': len(missing_in_cloudinary),
             'local_chapters': count_local_chapters(manga_slug),
-            'cloudinary_files': len(cloudinary_files)
+            'cloudinary_files': cloudinary_file_count
         }
         
         print("\n" + "="*80)
@@ -326,38 +388,53 @@ def get_failed_chapters_from_metadata(manga_slug):
     """Get list of failed chapter numbers from metadata"""
     failed = []
     
-    if not os.path.exists(METADATA_CSV):
+    if not metadata_exists(METADATA_CSV):
         return failed
     
-    with open(METADATA_CSV, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['manga_slug'] == manga_slug:
-                status = row.get('status', '')
-                panel_count = int(row.get('panel_count', 0))
-                expected_count = int(row.get('expected_count', 0))
-                
-                if status == 'failed' or (expected_count > 0 and panel_count != expected_count):
-                    chapter_num = int(row['chapter_number'])
-                    failed.append(chapter_num)
+    for chapter_num, row in get_store(METADATA_CSV).load_manga(manga_slug).items():
+        status = row['status']
+        panel_count = row['panel_count']
+        expected_count = row['expected_count']
+        
+        if status == 'failed' or (expected_count > 0 and panel_count != expected_count):
+            failed.append(chapter_num)
     
     return failed
 
 
 def get_local_image_files(local_folder, cloudinary_base):
-    """Get set of all local image files with cloudinary path format"""
-    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.tiff'}
-    local_files = set()
-    
-    for root, dirs, files in os.walk(local_folder):
-        for file in files:
-            if Path(file).suffix.lower() in image_extensions:
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, local_folder)
-                cloudinary_path = f"{cloudinary_base}/{relative_path}".replace('\\', '/')
-                local_files.add(normalize_extension(cloudinary_path))
+    """Get set of all local image files with cloudinary path format (chapter manifests list the panels)"""
+    return {
+        normalize_extension(f"{cloudinary_base}/{relative_path}")
+        for relative_path in list_local_images(local_folder)
+    }
+
+
+def get_uploaded_files(local_folder, cloudinary_base):
+    """
+    public_id.extension of every file uploaded for a manga. Read from the upload
+    manifests when every local chapter has one; otherwise listed through the Admin API.
+    """
+    manifests = load_manga_upload_manifests(cloudinary_base)
+    local_chapters = {
+        chapter_number(folder_name)
+        for folder_name in (list_chapter_folders(local_folder) if os.path.isdir(local_folder) else [])
+    }
+    if not manifests or not local_chapters <= set(manifests):
+        return get_all_public_ids_with_extension(cloudinary_base)
     
-    return local_files
+    files = set()
+    for manifest in manifests.values():
+        files |= uploaded_public_ids(manifest)
+    return files
+
+
+def collect_upload(uploads, cloudinary_path, upload_result):
+    """Keep a panel's upload result for its chapter's upload manifest"""
+    folder_path, filename = cloudinary_path.rsplit('/', 1)
+    index = panel_index(filename)
+    if index is not None:
+        uploads.setdefault(folder_path, []).append(asset_entry(index, upload_result))
 
 
 def count_local_chapters(manga_slug):
@@ -376,24 +453,13 @@ def upload_manga_to_cloudinary(local_folder, cloudinary_base):
     Upload manga to Cloudinary and return counts
     Returns: (uploaded_count, failed_count)
     """
-    from cloudinary_manager import get_all_public_ids_with_extension
-    import cloudinary.uploader
-    import cloudinary.api
-    
-    # Get local and cloudinary files
-    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.tiff'}
-    local_files_map = {}
-    
-    for root, dirs, files in os.walk(local_folder):
-        for file in files:
-            if Path(file).suffix.lower() in image_extensions:
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, local_folder)
-                cloudinary_path = f"{cloudinary_base}/{relative_path}".replace('\\', '/')
-                normalized_path = normalize_extension(cloudinary_path)
-                local_files_map[normalized_path] = full_path
+    # Get local (from chapter manifests) and cloudinary files
+    local_files_map = {
+        normalize_extension(f"{cloudinary_base}/{relative_path}"): full_path
+        for relative_path, full_path in list_local_images(local_folder).items()
+    }
     
-    cloudinary_files = get_all_public_ids_with_extension(cloudinary_base)
+    cloudinary_files = get_uploaded_files(local_folder, cloudinary_base)
     missing_in_cloudinary = set(local_files_map.keys()) - cloudinary_files
     
     if len(missing_in_cloudinary) == 0:
@@ -402,45 +468,19 @@ def upload_manga_to_cloudinary(local_folder, cloudinary_base):
     
     print(f"📤 Uploading {len(missing_in_cloudinary)} missing files...")
     
-    # Create folder structure
-    folders_to_create = set()
-    for cloudinary_path in missing_in_cloudinary:
-        folder_path = '/'.join(cloudinary_path.split('/')[:-1])
-        if folder_path:
-            parts = folder_path.split('/')
-            for i in range(len(parts)):
-                folder = '/'.join(parts[:i+1])
-                folders_to_create.add(folder)
-    
-    for folder in sorted(folders_to_create):
-        try:
-            cloudinary.api.create_folder(folder)
-        except:
-            pass  # Folder might already exist
+    # Create folder structure (one call per chapter folder creates its parents; known folders are skipped)
+    chapter_folders = {'/'.join(cloudinary_path.split('/')[:-1]) for cloudinary_path in missing_in_cloudinary}
+    for folder in sorted(chapter_folders):
+        ensure_folder(folder)
     
     # Upload files
     uploaded = 0
     failed = 0
+    uploads = {}  # chapter folder -> upload results for its manifest
     
     for cloudinary_path in sorted(missing_in_cloudinary):
-        local_path = local_files_map[cloudinary_path]
-        path_parts = cloudinary_path.split('/')
-        filename_no_ext = os.path.splitext(path_parts[-1])[0]
-        folder_path = '/'.join(path_parts[:-1])
-        
         try:
-            upload_params = {
-                'public_id': filename_no_ext,
-                'overwrite': False,
-                'resource_type': "auto",
-                'use_filename': False,
-                'unique_filename': False
-            }
-            
-            if folder_path:
-                upload_params['folder'] = folder_path
-            
-            cloudinary.uploader.upload(local_path, **upload_params)
+            collect_upload(uploads, cloudinary_path, upload_panel(local_files_map[cloudinary_path], cloudinary_path))
             uploaded += 1
             print(f"✅ [{uploaded + failed}/{len(missing_in_cloudinary)}] Uploaded: {cloudinary_path}")
             
@@ -448,9 +488,150 @@ def upload_manga_to_cloudinary(local_folder, cloudinary_base):
             failed += 1
             print(f"❌ [{uploaded + failed}/{len(missing_in_cloudinary)}] Failed: {cloudinary_path}")
     
+    for folder_path, entries in uploads.items():
+        record_uploads(folder_path, entries)
+    
     return uploaded, failed
 
 
+def upload_panel(local_path, cloudinary_path):
+    """
+    Upload one file to folder/public_id taken from its cloudinary path (extension dropped).
+    An asset that already exists is left as is (overwrite=False) and still counts as confirmed.
+    Returns: Cloudinary's upload result
+    """
+    path_parts = cloudinary_path.split('/')
+    upload_params = {
+        'public_id': os.path.splitext(path_parts[-1])[0],
+        'overwrite': False,
+        'resource_type': "auto",
+        'use_filename': False,
+        'unique_filename': False
+    }
+    
+    folder_path = '/'.join(path_parts[:-1])
+    if folder_path:
+        upload_params['folder'] = folder_path
+    
+    result = retry_call(lambda: cloudinary.uploader.upload(local_path, **upload_params), CLOUDINARY_HOST)
+    mark_folder_known(folder_path)  # The upload created it
+    return result
+
+
+# ============================================
+# DISK-BUDGETED MODE
+# ============================================
+
+def upload_chapter(chapter_folder, cloudinary_folder, expected_count=None):
+    """
+    Upload every panel a chapter's manifest lists, recording the results in its upload manifest.
+    Returns: (confirmed_count, failed_count)
+    """
+    confirmed = 0
+    failed = 0
+    uploads = {}
+    for relative_path, full_path in sorted(list_local_images(chapter_folder).items()):
+        try:
+            cloudinary_path = f"{cloudinary_folder}/{relative_path}"
+            collect_upload(uploads, cloudinary_path, upload_panel(full_path, cloudinary_path))
+            confirmed += 1
+        except Exception as e:
+            failed += 1
+            print(f"❌ Upload failed: {cloudinary_folder}/{relative_path} ({str(e)[:60]})")
+    
+    if uploads:
+        record_uploads(cloudinary_folder, uploads.get(cloudinary_folder, []), expected_count)
+    return confirmed, failed
+
+
+def make_chapter_uploader(manga_slug):
+    """
+    Uploader for ChapterDiskCache: a chapter is only confirmed when its manifest
+    checks out, its panels decode (DEEP_VERIFY) and Cloudinary accepted every panel.
+    """
+    def upload(chapter_folder):
+        manifest = load_manifest(chapter_folder)
+        if manifest is None:
+            return None
+        
+        _, _, is_valid, issue = check_manifest(chapter_folder, manifest, manifest['expected_count'])
+        if not is_valid:
+            print(f"⚠️  {os.path.basename(chapter_folder)} not uploaded: {issue}")
+            return None
+        
+        if DEEP_VERIFY:
+            for filename in manifest['panels']:
+                panel_ok, issue = check_image_file(os.path.join(chapter_folder, filename))
+                if not panel_ok:
+                    print(f"⚠️  {os.path.basename(chapter_folder)} not uploaded: {filename}: {issue}")
+                    return None
+        
+        cloudinary_folder = f"{CLOUDINARY_BASE}/{manga_slug}/{os.path.basename(chapter_folder)}"
+        confirmed, failed = upload_chapter(chapter_folder, cloudinary_folder, manifest['expected_count'])
+        if failed or confirmed != manifest['expected_count']:
+            return None
+        
+        print(f"☁️  Chapter {chapter_number(chapter_folder)} confirmed in Cloudinary ({confirmed} panels)")
+        return confirmed, cloudinary_folder
+    
+    return upload
+
+
+def create_disk_cache(manga_slug):
+    """ChapterDiskCache for a manga when DISK_BUDGET_GB is set, else None"""
+    if not DISK_BUDGET_GB:
+        return None
+    return ChapterDiskCache(
+        os.path.join(BASE_PATH, manga_slug), manga_slug, METADATA_CSV,
+        int(DISK_BUDGET_GB * 1024 ** 3), uploader=make_chapter_uploader(manga_slug)
+    )
+
+
+def upload_pending_chapters(manga_slug, disk_cache):
+    """
+    Upload the complete chapters on disk that have no confirmed upload yet
+    (e.g. fixed in step 3, or scraped before the budget was enabled).
+    Returns: (uploaded_panel_count, failed_chapter_count)
+    """
+    metadata = get_store(METADATA_CSV).load_manga(manga_slug)
+    manga_path = os.path.join(BASE_PATH, manga_slug)
+    
+    uploaded = 0
+    failed = 0
+    for folder_name in sorted(list_chapter_folders(manga_path)):
+        chapter_folder = os.path.join(manga_path, folder_name)
+        chapter_num = chapter_number(chapter_folder)
+        row = metadata.get(chapter_num)
+        if disk_cache.is_uploaded(chapter_num) or not row or row['status'] != 'success':
+            continue
+        
+        confirmed = disk_cache.chapter_ready(chapter_folder)
+        if confirmed:
+            uploaded += confirmed
+        else:
+            failed += 1
+    
+    return uploaded, failed
+
+
+def check_upload_record(manga_slug):
+    """
+    Compare the chapters scraped successfully with the confirmed uploads,
+    without touching local files or the Cloudinary Admin API.
+    Returns: (chapters missing or incomplete in Cloudinary, confirmed panel count)
+    """
+    store = get_store(METADATA_CSV)
+    uploads = store.load_uploads(manga_slug)
+    
+    missing = [
+        chapter_num for chapter_num, row in store.load_manga(manga_slug).items()
+        if row['status'] == 'success' and (
+            chapter_num not in uploads or uploads[chapter_num]['panel_count'] != row['expected_count']
+        )
+    ]
+    return missing, sum(row['panel_count'] for row in uploads.values())
+
+
 # ============================================
 # MAIN ORCHESTRATOR
 # ============================================
@@ -487,12 +668,13 @@ def run_full_pipeline(manga_url, manga_name=None, start_chapter=1, end_chapter=N
     # Track overall success
     pipeline_success = True
     failed_chapters = []
+    disk_cache = create_disk_cache(manga_slug)
     
     try:
         # STEP 1: Scrape
         if not manga_state.get('scraping_complete') or force_restart:
             success, total_chapters, failed = step1_scrape_manga(
-                manga_url, manga_name, manga_slug, start_chapter, end_chapter
+                manga_url, manga_name, manga_slug, start_chapter, end_chapter, disk_cache
             )
             
             if not success:
@@ -520,6 +702,7 @@ def run_full_pipeline(manga_url, manga_name=None, start_chapter=1, end_chapter=N
         
         # STEP 3: Fix failed chapters (with retry logic)
         retry_count = manga_state.get('retry_count', 0)
+        fix_round = 0
         while failed_chapters and retry_count < MAX_RETRY_ATTEMPTS:
             success, still_failed = step3_fix_failed_chapters(
                 manga_url, manga_name, manga_slug, failed_chapters, retry_count
@@ -547,15 +730,25 @@ def run_full_pipeline(manga_url, manga_name=None, start_chapter=1, end_chapter=N
                 state.update_manga_state(manga_slug, {'retry_count': 0})
             
             failed_chapters = still_failed
-            time.sleep(5)  # Wait before retry
+            
+            # Back off before the next round, and hold it while the source host is parked
+            time.sleep(FIX_ROUND_POLICY.delay(fix_round))
+            fix_round += 1
+            wait_for_host(manga_url)
         
         state.update_manga_state(manga_slug, {
             'verification_complete': True,
             'failed_chapters': failed_chapters
         })
         
+        # STEP 3b: Transcode (optional, originals are kept if it fails)
+        if TRANSCODE_PANELS:
+            success, transcode_summary = step3b_transcode_panels(manga_slug)
+            if success:
+                state.update_manga_state(manga_slug, {'transcode_summary': transcode_summary})
+        
         # STEP 4: Upload to Cloudinary
-        success, uploaded, upload_failed = step4_upload_to_cloudinary(manga_slug)
+        success, uploaded, upload_failed = step4_upload_to_cloudinary(manga_slug, disk_cache)
         if not success:
             state.update_manga_state(manga_slug, {'status': 'upload_failed'})
             return False, {}
@@ -567,7 +760,7 @@ def run_full_pipeline(manga_url, manga_name=None, start_chapter=1, end_chapter=N
         })
         
         # STEP 5: Final verification
-        success, summary = step5_final_verification(manga_slug)
+        success, summary = step5_final_verification(manga_slug, disk_cache)
         
         # Update final state
         final_status = 'complete' if (success and len(failed_chapters) == 0) else 'complete_with_errors'
@@ -588,6 +781,7 @@ def run_full_pipeline(manga_url, manga_name=None, start_chapter=1, end_chapter=N
         if failed_chapters:
             print(f"\n⚠️  Failed chapter numbers: {', '.join(map(str, sorted(failed_chapters)))}")
         
+        print_admin_report()
         print(f"\n📝 Full log saved to: {PIPELINE_LOG}")
         print("="*80 + "\n")
         
@@ -654,6 +848,49 @@ def process_manga_list(manga_list):
     return results
 
 
+def poll_new_chapters(manga_urls):
+    """
+    Check ongoing series for chapters we don't hold yet and scrape only those.
+    Each unchanged series costs a single conditional request (see chapter_index).
+    Returns: {manga_slug: [new chapter numbers]}
+    """
+    print_header("🔔 NEW CHAPTER CHECK")
+    
+    found = {}
+    
+    for manga_url in manga_urls:
+        manga_slug = get_manga_slug_from_url(manga_url)
+        if not manga_slug:
+            print(f"❌ Invalid manga URL: {manga_url}")
+            continue
+        
+        new_chapters = check_new_chapters(manga_url, manga_slug, METADATA_CSV)
+        if not new_chapters:
+            print(f"✅ {manga_slug}: up to date\n")
+            continue
+        
+        numbers = [ch['number'] for ch in new_chapters]
+        found[manga_slug] = numbers
+        print(f"🆕 {manga_slug}: {len(numbers)} new chapters ({', '.join(map(str, numbers))})\n")
+        
+        scrape_all_chapters(
+            manga_url=manga_url,
+            manga_name=manga_slug.replace('-', ' ').title(),
+            manga_slug=manga_slug,
+            base_path=BASE_PATH,
+            chapter_workers=CHAPTER_WORKERS,
+            new_only=True
+        )
+    
+    print_header("📊 NEW CHAPTER SUMMARY")
+    print(f"Series checked: {len(manga_urls)}")
+    print(f"Series with new chapters: {len(found)}")
+    for manga_slug, numbers in found.items():
+        print(f"  🆕 {manga_slug}: {', '.join(map(str, numbers))}")
+    
+    return found
+
+
 # ============================================
 # CLI INTERFACE
 # ============================================
@@ -769,4 +1006,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # python MasterScrapingPipeline.py --new-only <manga_url> [<manga_url> ...]
+    if len(sys.argv) > 1 and sys.argv[1] == '--new-only':
+        poll_new_chapters(sys.argv[2:])
+    else:
+        main()
\ No newline at end of file
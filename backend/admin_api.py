@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+CLOUDINARY ADMIN API GATEWAY
+Every Admin API call (folder creation, resource listings) goes through here:
+  - the hourly budget is read from the X-FeatureRateLimit-* headers of each
+    answer, and callers slow down as it runs low instead of hitting 420s
+  - folders known to exist are cached (per cloud, on disk), so a folder is
+    created at most once; uploads with folder= create folders implicitly and
+    mark them known too
+"""
+
+import os
+import json
+import time
+import calendar
+import threading
+from datetime import datetime
+
+import cloudinary
+import cloudinary.api
+
+from retry_policy import CLOUDINARY_HOST, retry_call
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+FOLDER_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cloudinary_folders.json')
+ADMIN_API_RESERVE = 20          # Calls kept back for interactive use; bulk jobs wait for the reset below this
+ADMIN_API_PACE_BELOW = 0.25     # Fraction of the hourly budget left at which calls start being spaced out
+ADMIN_API_LIMITED_PAUSE = 600.0 # Wait after a 420 that came without a reset time
+
+_budget = None
+_folders = None
+_singletons_lock = threading.Lock()
+
+
+def reset_timestamp(value):
+    """Epoch seconds of a rate-limit reset time (time tuple, datetime, or epoch), or None"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(calendar.timegm(value))  # email.utils.parsedate tuple, in GMT
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================
+# HOURLY BUDGET
+# ============================================
+
+class AdminApiBudget:
+    """Remaining Admin API calls this hour, as last reported by Cloudinary"""
+    
+    def __init__(self, reserve=ADMIN_API_RESERVE, pace_below=ADMIN_API_PACE_BELOW):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None      # Epoch seconds
+        self.calls = 0
+        self.waited = 0.0
+        self._next_call = 0.0     # Monotonic time before which a paced caller may not go
+        self._lock = threading.Lock()
+    
+    def delay(self):
+        """
+        Reserve the right to make one call.
+        Returns: (seconds to wait, slot_taken); without a slot the caller asks again after waiting
+        """
+        with self._lock:
+            if self.remaining is None or self.reset_at is None:
+                return 0, True
+            
+            until_reset = self.reset_at - time.time()
+            if until_reset <= 0:
+                # A new hour: the next answer reports the fresh budget
+                self.remaining = None
+                return 0, True
+            
+            if self.remaining <= self.reserve:
+                return until_reset, False
+            
+            self.remaining -= 1  # Counted now so parallel callers space out too
+            if self.limit and self.remaining < self.limit * self.pace_below:
+                # Spread what is left over the rest of the hour
+                now = time.monotonic()
+                start = max(now, self._next_call)
+                self._next_call = start + until_reset / max(1, self.remaining - self.reserve)
+                return start - now, True
+            return 0, True
+    
+    def wait(self):
+        while True:
+            wait, slot_taken = self.delay()
+            if wait > 0:
+                with self._lock:
+                    self.waited += wait
+                if not slot_taken:
+                    print(f"⏳ Admin API budget low ({self.remaining}/{self.limit} left), "
+                          f"waiting {wait / 60:.0f} min for the hourly reset...")
+                time.sleep(wait)
+            if slot_taken:
+                return
+    
+    def record(self, result):
+        """Take the budget from an Admin API answer (cloudinary.api.Response)"""
+        limit = getattr(result, 'rate_limit_allowed', None)
+        remaining = getattr(result, 'rate_limit_remaining', None)
+        reset_at = reset_timestamp(getattr(result, 'rate_limit_reset_at', None))
+        with self._lock:
+            self.calls += 1
+            if remaining is not None:
+                self.limit = limit
+                self.remaining = remaining
+                self.reset_at = reset_at
+    
+    def exhausted(self):
+        """Cloudinary answered 420: nothing left until the reset"""
+        with self._lock:
+            self.remaining = 0
+            if self.reset_at is None or self.reset_at <= time.time():
+                self.reset_at = time.time() + ADMIN_API_LIMITED_PAUSE
+        print("🛑 Admin API rate limit reached, pausing Admin API calls until the hourly reset")
+    
+    def call(self, func, *args, **kwargs):
+        """One Admin API call, within the budget"""
+        self.wait()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if type(e).__name__ == 'RateLimited':
+                self.exhausted()
+            raise
+        self.record(result)
+        return result
+
+
+def get_admin_budget():
+    """Return the process-wide Admin API budget"""
+    global _budget
+    if _budget is None:
+        with _singletons_lock:
+            if _budget is None:
+                _budget = AdminApiBudget()
+    return _budget
+
+
+def admin_call(func, *args, **kwargs):
+    """
+    Call a cloudinary.api function within the hourly budget and the shared retry policy.
+    A 420 parks every Admin API caller until the reset rather than failing the job.
+    Returns: the API response
+    """
+    budget = get_admin_budget()
+    return retry_call(lambda: budget.call(func, *args, **kwargs), CLOUDINARY_HOST)
+
+
+# ============================================
+# FOLDER CACHE
+# ============================================
+
+class FolderCache:
+    """Folders known to exist in each cloud, kept in FOLDER_CACHE_FILE"""
+    
+    def __init__(self, path=FOLDER_CACHE_FILE):
+        self.path = path
+        self.known = {}   # cloud name -> set of folder paths
+        self.created = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.known = {cloud: set(folders) for cloud, folders in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring unreadable folder cache {self.path}: {e}")
+    
+    def save(self):
+        """Write the cache atomically (called with the lock held)"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({cloud: sorted(folders) for cloud, folders in self.known.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def folders(self):
+        return self.known.setdefault(cloudinary.config().cloud_name or '', set())
+    
+    def is_known(self, folder_path):
+        with self._lock:
+            return folder_path in self.folders()
+    
+    def mark_known(self, folder_path):
+        """Remember a folder and all its parents (create_folder and uploads create the whole path)"""
+        parts = folder_path.strip('/').split('/')
+        with self._lock:
+            folders = self.folders()
+            new = {'/'.join(parts[:i + 1]) for i in range(len(parts))} - folders
+            if new:
+                folders.update(new)
+                self.save()
+    
+    def ensure(self, folder_path):
+        """
+        Create a folder unless it is already known to exist.
+        Returns: True if the folder exists
+        """
+        folder_path = folder_path.replace('\\', '/').strip('/')
+        if not folder_path:
+            return True
+        if self.is_known(folder_path):
+            with self._lock:
+                self.skipped += 1
+            return True
+        
+        try:
+            admin_call(cloudinary.api.create_folder, folder_path)
+        except Exception as e:
+            # Folder might already exist
+            if 'exist' not in str(e).lower():
+                print(f"⚠️  Folder creation warning: {str(e)[:50]}")
+                return False
+        with self._lock:
+            self.created += 1
+        self.mark_known(folder_path)
+        return True
+
+
+def get_folder_cache():
+    """Return the process-wide folder cache"""
+    global _folders
+    if _folders is None:
+        with _singletons_lock:
+            if _folders is None:
+                _folders = FolderCache()
+    return _folders
+
+
+def ensure_folder(folder_path):
+    """Create a Cloudinary folder (and its parents) at most once. Returns: True if it exists"""
+    return get_folder_cache().ensure(folder_path)
+
+
+def mark_folder_known(folder_path):
+    """Record a folder an upload has just created implicitly"""
+    if folder_path:
+        get_folder_cache().mark_known(folder_path.replace('\\', '/'))
+
+
+def print_admin_report():
+    """Print Admin API usage and folder cache savings for this run"""
+    budget = get_admin_budget()
+    folders = get_folder_cache()
+    remaining = f"{budget.remaining}/{budget.limit}" if budget.remaining is not None else "unknown"
+    print(f"🔑 Admin API: {budget.calls} calls this run, {remaining} left this hour"
+          f"{f', waited {budget.waited:.0f}s for budget' if budget.waited else ''}; "
+          f"folders created {folders.created}, creates skipped {folders.skipped}")
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+ASYNCIO MANGA SCRAPER
+Alternative engine to manga_scraper's thread pools: one event loop, many cheap in-flight requests.
+Produces the same <slug>/chapter-NNN/panel-NNN.ext layout and the same metadata rows,
+so the two engines can be benchmarked against each other.
+Requests go through the same retry policy and per-host circuit breakers as the
+threaded engine (retry_policy), and interrupted panels resume with a Range request.
+"""
+
+import os
+import re
+import time
+import asyncio
+from urllib.parse import urlparse
+import aiohttp
+
+from http_client import DEFAULT_HEADERS, HOST_RATE_LIMIT, HOST_BURST
+from chapter_index import INDEX_TTL, unheld_chapters
+from retry_policy import DEFAULT_POLICY, get_circuit_breakers, parse_retry_after
+from chapter_manifest import new_hasher, panel_entry, update_manifest
+from manga_scraper import (
+    get_manga_slug_from_url,
+    build_chapter_page,
+    get_all_chapters,
+    panel_filename,
+    expected_content_length,
+    parse_content_range,
+    finish_panel_write,
+    CHUNK_SIZE,
+    PARTIAL_SUFFIX,
+    update_single_chapter_metadata,
+    export_metadata_csv,
+    load_existing_metadata,
+    completed_panel_count,
+    write_scrape_summary
+)
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+MAX_IN_FLIGHT = 1024        # Requests in flight across the whole loop
+MAX_PER_HOST = 64           # Open connections per host
+MAX_CHAPTERS_IN_FLIGHT = 16 # Chapters being scraped at once (their panels share MAX_IN_FLIGHT)
+PAGE_TIMEOUT = 15           # Seconds for chapter / index pages
+PANEL_TIMEOUT = 60          # Seconds for a single panel
+
+
+# ============================================
+# PER-HOST RATE LIMITING
+# ============================================
+
+class AsyncHostRateLimiter:
+    """Token-bucket request budget per host for coroutines (host_rate=None disables it)"""
+    
+    def __init__(self, rate=HOST_RATE_LIMIT, burst=HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # host -> (tokens, last_refill)
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, url):
+        """Wait until the URL's host has budget for one more request"""
+        if not self.rate:
+            return
+        
+        host = urlparse(url).netloc
+        
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                tokens, last_refill = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last_refill) * self.rate)
+                
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            
+            await asyncio.sleep(wait)
+
+
+# ============================================
+# BLOCKING FILE I/O (run in worker threads)
+# ============================================
+
+def part_size(tmp_path):
+    """Bytes already in a panel's .part file (0 if there is none)"""
+    try:
+        return os.path.getsize(tmp_path)
+    except FileNotFoundError:
+        return 0
+
+
+def hash_part(tmp_path, hasher):
+    """Feed the bytes already in a .part file to the hasher, so a resumed digest covers the whole file"""
+    with open(tmp_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+
+
+def write_chunk(f, hasher, chunk):
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+def close_synced(f):
+    """Flush, fsync and close a panel's .part file"""
+    try:
+        f.flush()
+        os.fsync(f.fileno())
+    finally:
+        f.close()
+
+
+# ============================================
+# RETRIES
+# ============================================
+
+def status_of_async(exc):
+    """HTTP status of an aiohttp error, or None"""
+    return exc.status if isinstance(exc, aiohttp.ClientResponseError) else None
+
+
+def is_retryable_async(exc, policy=DEFAULT_POLICY):
+    """aiohttp counterpart of retry_policy.is_retryable"""
+    status = status_of_async(exc)
+    if status is not None:
+        return status in policy.retry_statuses
+    return isinstance(exc, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                            asyncio.TimeoutError, ConnectionError))
+
+
+def retry_after_async(exc):
+    headers = getattr(exc, 'headers', None) or {}
+    return parse_retry_after(headers.get('Retry-After'))
+
+
+async def retry_async(attempt, url, policy=None):
+    """
+    Async counterpart of retry_policy.retry_call: await attempt() (a coroutine factory
+    making one request to url's host) with jittered backoff, Retry-After and the
+    host's shared circuit breaker. Waits happen with asyncio.sleep, holding no slot.
+    Returns: attempt()'s result; the last error is raised when attempts run out
+    """
+    policy = policy or DEFAULT_POLICY
+    breaker = get_circuit_breakers().get(url)
+    
+    for attempt_number in range(policy.max_attempts):
+        wait = breaker.before_request()
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = breaker.before_request()
+        
+        try:
+            result = await attempt()
+        except Exception as e:
+            if not is_retryable_async(e, policy):
+                # 4xx and local errors say nothing about the host's health
+                if status_of_async(e) is not None:
+                    breaker.record_success()
+                else:
+                    breaker.release()
+                raise
+            retry_after = retry_after_async(e)
+            breaker.record_failure(retry_after)
+            if attempt_number == policy.max_attempts - 1:
+                raise
+            await asyncio.sleep(policy.delay(attempt_number, retry_after))
+            continue
+        
+        breaker.record_success()
+        return result
+
+
+class AsyncEngine:
+    """Holds the aiohttp session, in-flight cap and host budget for one run"""
+    
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, host_rate=HOST_RATE_LIMIT):
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self.limiter = AsyncHostRateLimiter(rate=host_rate)
+        self.semaphore = None
+        self.session = None
+    
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.max_in_flight)
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.max_per_host)
+        self.session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+    
+    async def fetch_page(self, url, timeout=PAGE_TIMEOUT):
+        """GET a page (retried under the shared policy) and return its body as bytes"""
+        async def attempt():
+            async with self.semaphore:
+                await self.limiter.acquire(url)
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    response.raise_for_status()
+                    return await response.read()
+        
+        return await retry_async(attempt, url)
+    
+    async def stream_panel(self, img_url, tmp_path, filepath, resume):
+        """
+        One attempt at a panel. With resume, bytes already in the .part file are kept
+        and the rest is asked for with a Range request (a host answering 200 sends it all again).
+        Returns: (size, content hash)
+        """
+        offset = await asyncio.to_thread(part_size, tmp_path) if resume else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        
+        async with self.semaphore:
+            await self.limiter.acquire(img_url)
+            async with self.session.get(img_url, headers=headers,
+                                        timeout=aiohttp.ClientTimeout(total=PANEL_TIMEOUT)) as response:
+                range_start, range_total = parse_content_range(response.headers.get('Content-Range'))
+                # 416, or a 206 for another range: our partial file doesn't fit, start over
+                restart = bool(offset) and (response.status == 416
+                                            or (response.status == 206 and range_start != offset))
+                if not restart:
+                    response.raise_for_status()
+                    content_length = expected_content_length(response.headers)
+                    
+                    mode = 'wb'
+                    if offset and response.status == 206:
+                        mode = 'ab'
+                        if range_total is not None:
+                            content_length = range_total
+                        elif content_length is not None:
+                            content_length += offset
+                    
+                    hasher = new_hasher()
+                    written = 0
+                    if mode == 'ab':
+                        await asyncio.to_thread(hash_part, tmp_path, hasher)
+                        written = offset
+                    
+                    f = await asyncio.to_thread(open, tmp_path, mode)
+                    try:
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            await asyncio.to_thread(write_chunk, f, hasher, chunk)
+                            written += len(chunk)
+                    finally:
+                        await asyncio.to_thread(close_synced, f)
+        
+        if restart:
+            await asyncio.to_thread(os.remove, tmp_path)
+            return await self.stream_panel(img_url, tmp_path, filepath, resume=False)
+        
+        await asyncio.to_thread(finish_panel_write, tmp_path, filepath, written, content_length)
+        return written, hasher.hexdigest()
+    
+    async def download_panel(self, img_url, idx, output_folder, resume=False):
+        """
+        Stream one panel to panel-NNN<ext> in CHUNK_SIZE pieces, via an fsynced .part file.
+        Disk writes, hashing and fsync run in worker threads so a slow disk never stalls the loop.
+        Failed attempts are retried under the shared policy and continue the .part file
+        they left behind; with resume=True so does the first attempt.
+        Returns: (filename, manifest_entry)
+        """
+        filename = panel_filename(img_url, idx)
+        filepath = os.path.join(output_folder, filename)
+        tmp_path = filepath + PARTIAL_SUFFIX
+        attempts = 0
+        
+        async def attempt():
+            nonlocal attempts
+            attempts += 1
+            return await self.stream_panel(img_url, tmp_path, filepath, resume or attempts > 1)
+        
+        written, digest = await retry_async(attempt, img_url)
+        return filename, panel_entry(idx, written, digest, img_url)
+
+
+# ============================================
+# SCRAPING
+# ============================================
+
+async def gather_bounded(jobs, limit):
+    """
+    Await coroutine factories with at most `limit` running at once
+    (coroutines are only created when a slot frees up).
+    Returns: results in job order
+    """
+    results = [None] * len(jobs)
+    queue = iter(enumerate(jobs))
+    
+    async def worker():
+        for i, job in queue:
+            results[i] = await job()
+    
+    await asyncio.gather(*(worker() for _ in range(min(max(1, limit), len(jobs)))))
+    return results
+
+
+async def get_all_chapters_async(manga_url, max_age=INDEX_TTL):
+    """
+    manga_scraper.get_all_chapters off the loop: both engines read the same chapter
+    catalog (chapter_index), so a fresh index is reused and a stale one is revalidated
+    with one conditional GET.
+    """
+    return await asyncio.to_thread(get_all_chapters, manga_url, max_age)
+
+
+async def scrape_chapter_async(engine, url, output_folder, metadata_csv_path, manga_name, manga_slug, update_immediately=False):
+    """
+    Async counterpart of manga_scraper.scrape_chapter.
+    Returns: (panel_count, success_status, error_message, expected_count)
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    
+    chapter_match = re.search(r'chapter-(\d+)', output_folder)
+    chapter_num = int(chapter_match.group(1)) if chapter_match else 0
+    
+    async def record(panel_count, expected_count, status, error_msg):
+        # The CSV update is blocking file I/O, keep it off the event loop
+        if update_immediately and metadata_csv_path:
+            await asyncio.to_thread(
+                update_single_chapter_metadata, metadata_csv_path, manga_name, manga_slug,
+                chapter_num, panel_count, expected_count, status, error_msg
+            )
+    
+    try:
+        html = await engine.fetch_page(url)
+        page = build_chapter_page(url, html)
+        image_urls, expected_count = page.panel_urls, page.expected_count
+        
+        if not image_urls:
+            print(f"✗ Chapter {chapter_num}: No images found")
+            await record(0, expected_count, 'failed', 'No images found')
+            return 0, False, "No images found", expected_count
+        
+        results = await asyncio.gather(
+            *(engine.download_panel(img_url, idx, output_folder)
+              for idx, img_url in enumerate(image_urls, 1)),
+            return_exceptions=True
+        )
+        
+        downloaded_count = 0
+        saved_panels = {}
+        for idx, result in enumerate(results, 1):
+            if isinstance(result, Exception):
+                print(f"✗ Chapter {chapter_num} panel {idx}: {result}")
+            else:
+                filename, entry = result
+                saved_panels[filename] = entry
+                downloaded_count += 1
+        
+        if saved_panels:
+            await asyncio.to_thread(update_manifest, output_folder, url, expected_count, saved_panels)
+        
+        print(f"✓ Chapter {chapter_num}: {downloaded_count}/{expected_count} images saved")
+        
+        status = 'success' if downloaded_count == expected_count else 'partial'
+        error_msg = '' if downloaded_count == expected_count else f'Downloaded {downloaded_count}/{expected_count}'
+        await record(downloaded_count, expected_count, status, error_msg)
+        
+        return downloaded_count, downloaded_count == expected_count, "", expected_count
+    
+    except Exception as e:
+        error_msg = str(e) or e.__class__.__name__
+        print(f"✗ Chapter {chapter_num}: {error_msg}")
+        await record(0, 0, 'failed', error_msg)
+        return 0, False, error_msg, 0
+
+
+async def scrape_all_chapters_async(manga_url, manga_name, manga_slug, base_path, start_chapter=1, end_chapter=None,
+                                    max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, host_rate=HOST_RATE_LIMIT,
+                                    max_chapters=MAX_CHAPTERS_IN_FLIGHT, new_only=False):
+    """
+    Async counterpart of manga_scraper.scrape_all_chapters (same catalog, skip logic, metadata and summary).
+    At most max_chapters chapters are scraped at once.
+    With new_only=True only chapters that have no metadata row yet are scraped.
+    """
+    
+    metadata_csv_path = os.path.join(base_path, 'manga_metadata.csv')
+    existing_metadata = load_existing_metadata(metadata_csv_path, manga_slug)
+    
+    async with AsyncEngine(max_in_flight, max_per_host, host_rate) as engine:
+        chapters = await get_all_chapters_async(manga_url)
+        
+        if not chapters:
+            print("\n✗ Could not fetch chapter list")
+            return
+        
+        # Filter by range
+        if start_chapter or end_chapter:
+            chapters = [ch for ch in chapters
+                       if (ch['number'] >= start_chapter)
+                       and (not end_chapter or ch['number'] <= end_chapter)]
+        
+        if new_only:
+            chapters = unheld_chapters(chapters, existing_metadata)
+            if not chapters:
+                print(f"\n✓ No new chapters for {manga_name}")
+                return
+        
+        print(f"\n{'='*60}")
+        print(f"Will download {len(chapters)} {'new ' if new_only else ''}chapters (asyncio engine)")
+        print(f"Manga: {manga_name} ({manga_slug})")
+        print(f"Metadata CSV: {metadata_csv_path}")
+        print(f"In flight: {max_in_flight} total, {max_per_host} per host, {max_chapters} chapters")
+        print(f"{'='*60}\n")
+        
+        manga_path = os.path.join(base_path, manga_slug)
+        os.makedirs(manga_path, exist_ok=True)
+        
+        skipped_chapters = []
+        pending = []
+        
+        for chapter in chapters:
+            chapter_num = chapter['number']
+            chapter_folder = os.path.join(manga_path, f"chapter-{chapter_num:03d}")
+            
+            panel_count = completed_panel_count(chapter_folder, existing_metadata.get(chapter_num))
+            if panel_count is not None:
+                print(f"⊘ Chapter {chapter_num} already complete with {panel_count} panels, skipping...")
+                skipped_chapters.append(chapter_num)
+                continue
+            
+            pending.append((chapter_num, lambda url=chapter['url'], folder=chapter_folder: scrape_chapter_async(
+                engine, url, folder, metadata_csv_path,
+                manga_name, manga_slug, update_immediately=True
+            )))
+        
+        started = time.monotonic()
+        results = await gather_bounded([job for _, job in pending], max_chapters)
+        elapsed = time.monotonic() - started
+    
+    succeeded_chapters = []
+    failed_chapters = []
+    for (chapter_num, _), (panel_count, success, error, expected_count) in zip(pending, results):
+        if success and panel_count > 0:
+            succeeded_chapters.append(chapter_num)
+        else:
+            failed_chapters.append(chapter_num)
+    
+    summary_path = write_scrape_summary(
+        manga_path, manga_name, manga_slug, len(chapters),
+        skipped_chapters, succeeded_chapters, failed_chapters
+    )
+    export_metadata_csv(metadata_csv_path)
+    
+    print(f"\n{'='*60}")
+    print("DOWNLOAD SUMMARY (asyncio engine)")
+    print(f"{'='*60}")
+    print(f"✓ Successfully downloaded: {len(skipped_chapters) + len(succeeded_chapters)}/{len(chapters)} chapters")
+    if failed_chapters:
+        print(f"✗ Failed chapters: {', '.join(map(str, sorted(failed_chapters)))}")
+    print(f"⏱ Download time: {elapsed:.1f}s")
+    print(f"Location: {manga_path}")
+    print(f"Metadata: {metadata_csv_path}")
+    print(f"Summary: {summary_path}")
+    print(f"{'='*60}\n")
+
+
+def run_async_scrape(manga_url, manga_name, manga_slug, base_path, start_chapter=1, end_chapter=None, **options):
+    """Blocking entry point for callers outside an event loop"""
+    asyncio.run(scrape_all_chapters_async(
+        manga_url, manga_name, manga_slug, base_path, start_chapter, end_chapter, **options
+    ))
+
+
+if __name__ == "__main__":
+    base_path = r"E:\UOM\My-CODE_RUSH\projects\HiManga\public"
+    
+    print("=" * 60)
+    print("Universal Manga Scraper (asyncio engine)")
+    print("=" * 60)
+    
+    manga_url = input("\nEnter manga URL (e.g., https://www.mangaread.org/manga/one-piece/): ").strip()
+    manga_slug = get_manga_slug_from_url(manga_url)
+    
+    if not manga_slug:
+        print("✗ Invalid manga URL format")
+        exit(1)
+    
+    manga_name = input(f"Enter manga name (default: {manga_slug.replace('-', ' ').title()}): ").strip()
+    if not manga_name:
+        manga_name = manga_slug.replace('-', ' ').title()
+    
+    start = input("Start chapter (default: 1): ").strip()
+    end = input("End chapter (optional): ").strip()
+    rate = input(f"Requests/second per host (default: {HOST_RATE_LIMIT}, 0 = unlimited): ").strip()
+    
+    try:
+        run_async_scrape(
+            manga_url, manga_name, manga_slug, base_path,
+            start_chapter=int(start) if start else 1,
+            end_chapter=int(end) if end else None,
+            host_rate=float(rate) if rate else HOST_RATE_LIMIT
+        )
+    except KeyboardInterrupt:
+        print("\n\nOperation cancelled by user.")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+CDN PROBES
+Remote verification of uploaded chapters without the Admin API: every panel
+recorded in a chapter's upload manifest gets a HEAD request to its delivery
+URL. Chapters are probed as batches on a shared, capped worker pool, and
+panels found intact are cached for CDN_PROBE_TTL so repeat checks only probe
+what is new or was missing.
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import get_session
+from retry_policy import RetryPolicy, retry_call
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CDN_PROBE_WORKERS = 32          # HEAD requests in flight (stays within the session's keep-alive pool)
+CDN_PROBE_TIMEOUT = 10
+CDN_PROBE_TTL = 6 * 3600        # Seconds a panel found intact is trusted without probing again
+CDN_PROBE_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cdn_probe_cache.json')
+CDN_PROBE_POLICY = RetryPolicy(max_attempts=3, max_delay=10)
+
+
+# ============================================
+# CACHE
+# ============================================
+
+class ProbeCache:
+    """Delivery URLs last found intact, with the time of the probe; safe to share between threads"""
+    
+    def __init__(self, path=CDN_PROBE_CACHE_FILE, ttl=CDN_PROBE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self.load()
+    
+    def load(self):
+        """Read the cache file (a missing or unreadable file is an empty cache)"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def is_fresh(self, url):
+        with self._lock:
+            checked_at = self.entries.get(url)
+        return checked_at is not None and time.time() - checked_at < self.ttl
+    
+    def store(self, url):
+        with self._lock:
+            self.entries[url] = time.time()
+            self._dirty = True
+    
+    def save(self):
+        """Write the cache back if anything changed (expired entries are dropped)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            self.entries = {url: at for url, at in self.entries.items() if now - at < self.ttl}
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+
+# ============================================
+# PROBING
+# ============================================
+
+def probe_panel(entry):
+    """
+    HEAD one panel's delivery URL.
+    Returns: issue description, or '' if the CDN serves it with the recorded size
+    """
+    url = entry.get('secure_url')
+    if not url:
+        return "no delivery URL recorded"
+    
+    session = get_session()
+    try:
+        response = retry_call(
+            lambda: session.head(url, timeout=CDN_PROBE_TIMEOUT, allow_redirects=True),
+            url, CDN_PROBE_POLICY
+        )
+    except Exception as e:
+        return f"probe failed ({str(e)[:40]})"
+    
+    response.close()
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
+    
+    length = response.headers.get('Content-Length')
+    if entry.get('bytes') and length and length.isdigit() and int(length) != entry['bytes']:
+        return f"size {length} != recorded {entry['bytes']}"
+    return ''
+
+
+def submit_chapter(manifest, executor, cache):
+    """
+    Queue one chapter's panels on the shared executor (panels cached as intact are skipped).
+    Returns: the chapter's batch, {panel_name: (entry, future)}
+    """
+    return {
+        name: (entry, executor.submit(probe_panel, entry))
+        for name, entry in manifest['panels'].items()
+        if not cache.is_fresh(entry.get('secure_url'))
+    }
+
+
+def collect_chapter(batch, cache):
+    """
+    Wait for a chapter's probes.
+    Returns: {panel_name: issue} for the panels that failed
+    """
+    problems = {}
+    for name, (entry, future) in batch.items():
+        issue = future.result()
+        if issue:
+            problems[name] = issue
+        else:
+            cache.store(entry['secure_url'])
+    return problems
+
+
+def probe_chapters(manifests, workers=CDN_PROBE_WORKERS, cache=None):
+    """
+    Probe a manga's chapters, one batch per chapter, at most `workers` requests in flight.
+    manifests: {chapter_number: upload manifest}
+    Returns: {chapter_number: {panel_name: issue}} (empty dict = every panel served)
+    """
+    cache = cache or ProbeCache()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # Every batch is queued up front so the pool stays full across chapter boundaries
+            batches = {
+                chapter_num: submit_chapter(manifest, executor, cache)
+                for chapter_num, manifest in sorted(manifests.items())
+            }
+            return {chapter_num: collect_chapter(batch, cache) for chapter_num, batch in batches.items()}
+    finally:
+        cache.save()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+CHAPTER CATALOG
+The one place that knows each manga's chapter list (URL, number, title,
+first_seen, last_seen). Lists are kept on disk per manga, reused for
+INDEX_TTL seconds, refreshed with conditional GETs (If-None-Match /
+If-Modified-Since) after that, and concurrent lookups of the same manga
+share a single request.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from datetime import datetime
+from urllib.parse import urljoin, urlparse
+from http_client import polite_get
+from html_extract import chapter_link_items
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+CHAPTER_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chapter_index')
+INDEX_TIMEOUT = 15  # Seconds for the series page request
+INDEX_TTL = 600     # Seconds a checked index is reused without asking the site again
+
+_indexes = {}          # manga_url -> index dict, so repeat lookups skip the JSON file
+_manga_locks = {}      # manga_url -> lock serialising refreshes of that manga
+_locks_lock = threading.Lock()
+
+
+# ============================================
+# PARSING
+# ============================================
+
+def parse_chapter_links(html, manga_url):
+    """
+    Extract chapter links from a manga index page.
+    Returns: list of {'url', 'number', 'text'} sorted by chapter number, without duplicates
+    """
+    # Find all chapter links
+    chapter_links = []
+    
+    for href, text in chapter_link_items(html):
+        if href and '/chapter-' in href:
+            # Extract chapter number
+            match = re.search(r'chapter-(\d+)', href)
+            if match:
+                chapter_num = int(match.group(1))
+                full_url = urljoin(manga_url, href)
+                chapter_links.append({
+                    'url': full_url,
+                    'number': chapter_num,
+                    'text': text
+                })
+    
+    # Remove duplicates and sort by chapter number
+    unique_chapters = {ch['number']: ch for ch in chapter_links}
+    return sorted(unique_chapters.values(), key=lambda x: x['number'])
+
+
+# ============================================
+# INDEX FILES
+# ============================================
+
+def index_path(manga_url, index_dir=CHAPTER_INDEX_DIR):
+    """JSON file holding one manga's index (named after the last URL path segment)"""
+    name = urlparse(manga_url).path.rstrip('/').rsplit('/', 1)[-1] or 'index'
+    name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+    return os.path.join(index_dir, f"{name}.json")
+
+
+def load_index(manga_url, index_dir=CHAPTER_INDEX_DIR):
+    """
+    Stored index for a manga, or None.
+    Returns: {'manga_url', 'etag', 'last_modified', 'fetched_at', 'checked_at', 'chapters'}
+    """
+    path = index_path(manga_url, index_dir)
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠ Ignoring unreadable chapter index {path}: {e}")
+        return None
+    
+    # Two series sharing a last path segment must not share an index
+    if index.get('manga_url') != manga_url:
+        return None
+    return index
+
+
+def save_index(index, index_dir=CHAPTER_INDEX_DIR):
+    """Write an index atomically"""
+    os.makedirs(index_dir, exist_ok=True)
+    path = index_path(index['manga_url'], index_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# ============================================
+# REFRESH
+# ============================================
+
+def diff_chapters(old_chapters, new_chapters):
+    """
+    Compare two chapter lists by number.
+    Returns: (added, removed) chapter dicts, sorted by number
+    """
+    old_numbers = {ch['number'] for ch in old_chapters}
+    new_numbers = {ch['number'] for ch in new_chapters}
+    added = [ch for ch in new_chapters if ch['number'] not in old_numbers]
+    removed = [ch for ch in old_chapters if ch['number'] not in new_numbers]
+    return added, removed
+
+
+def merge_seen(old_chapters, chapters, now):
+    """Carry first_seen over from the previous index and stamp last_seen on every chapter"""
+    first_seen = {ch['number']: ch.get('first_seen') for ch in old_chapters}
+    for ch in chapters:
+        ch['first_seen'] = first_seen.get(ch['number']) or now
+        ch['last_seen'] = now
+    return chapters
+
+
+def manga_lock(manga_url):
+    with _locks_lock:
+        return _manga_locks.setdefault(manga_url, threading.Lock())
+
+
+def refresh_chapter_index(manga_url, max_age=INDEX_TTL, index_dir=CHAPTER_INDEX_DIR):
+    """
+    Bring a manga's stored index up to date.
+    An index checked less than max_age seconds ago is returned as is; otherwise
+    one conditional GET revalidates it. Concurrent callers for the same manga
+    wait for the first one's request instead of sending their own.
+    Raises on network / HTTP errors (the stored index is left untouched).
+    Returns: (chapters, added, not_modified)
+    """
+    with manga_lock(manga_url):
+        index = _indexes.get(manga_url) or load_index(manga_url, index_dir)
+        
+        if index and max_age and time.time() - index.get('checked_at', 0) < max_age:
+            _indexes[manga_url] = index
+            return index['chapters'], [], True
+        
+        headers = {}
+        if index:
+            if index.get('etag'):
+                headers['If-None-Match'] = index['etag']
+            if index.get('last_modified'):
+                headers['If-Modified-Since'] = index['last_modified']
+        
+        response = polite_get(manga_url, timeout=INDEX_TIMEOUT, headers=headers)
+        now = datetime.now().isoformat()
+        
+        if index and response.status_code == 304:
+            for ch in index['chapters']:
+                ch['last_seen'] = now
+            index['checked_at'] = time.time()
+            save_index(index, index_dir)
+            _indexes[manga_url] = index
+            return index['chapters'], [], True
+        
+        response.raise_for_status()
+        chapters = parse_chapter_links(response.content, manga_url)
+        
+        # An empty parse is more likely a broken page than a series with no chapters
+        if not chapters and index and index['chapters']:
+            print("⚠ Series page returned no chapters, keeping the stored index")
+            return index['chapters'], [], False
+        
+        old_chapters = index['chapters'] if index else []
+        added, removed = diff_chapters(old_chapters, chapters)
+        if removed:
+            print(f"⚠ {len(removed)} chapters disappeared from the series page: "
+                  f"{', '.join(str(ch['number']) for ch in removed)}")
+        
+        index = {
+            'manga_url': manga_url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': now,
+            'checked_at': time.time(),
+            'chapters': merge_seen(old_chapters, chapters, now),
+        }
+        save_index(index, index_dir)
+        _indexes[manga_url] = index
+        
+        return chapters, added, False
+
+
+def get_chapter_catalog(manga_url, max_age=INDEX_TTL):
+    """
+    Chapter list of a manga for any module (sorted by number, each with
+    url, number, text, first_seen, last_seen). Empty list on errors.
+    """
+    try:
+        chapters, _, _ = refresh_chapter_index(manga_url, max_age)
+        return chapters
+    except Exception as e:
+        print(f"✗ Error fetching chapter list: {e}")
+        return []
+
+
+def unheld_chapters(chapters, held_numbers):
+    """Chapters whose number isn't in held_numbers (e.g. the metadata rows we already have)"""
+    held = set(held_numbers)
+    return [ch for ch in chapters if ch['number'] not in held]
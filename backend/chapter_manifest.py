@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+CHAPTER MANIFESTS
+Every chapter-NNN folder gets a manifest.json describing its panels:
+file name, position, size, a fast content hash and the source URL.
+Verification, local listings and uploads read the manifest instead of
+walking and re-deriving the folder contents.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg', '.tiff', '.avif'}
+
+
+# ============================================
+# HASHING
+# ============================================
+
+def detect_hash_algorithm():
+    """Fastest available content hash"""
+    if xxhash is not None:
+        return 'xxh3_128'
+    if blake3 is not None:
+        return 'blake3'
+    return 'blake2b_128'
+
+
+HASH_ALGORITHM = detect_hash_algorithm()
+
+
+def new_hasher(algorithm=HASH_ALGORITHM):
+    """Incremental hasher (update / hexdigest) for the given algorithm"""
+    if algorithm == 'xxh3_128':
+        return xxhash.xxh3_128()
+    if algorithm == 'blake3':
+        return blake3.blake3()
+    if algorithm == 'blake2b_128':
+        return hashlib.blake2b(digest_size=16)
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+
+def hash_file(path, algorithm=HASH_ALGORITHM):
+    """Content hash of a file"""
+    hasher = new_hasher(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# ============================================
+# READ / WRITE
+# ============================================
+
+def manifest_path(chapter_folder):
+    return os.path.join(chapter_folder, MANIFEST_FILE)
+
+
+def load_manifest(chapter_folder):
+    """A chapter's manifest, or None if it has none (or an unreadable / older-format one)"""
+    path = manifest_path(chapter_folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(chapter_folder, manifest):
+    """Write a manifest atomically"""
+    path = manifest_path(chapter_folder)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def panel_entry(index, size, digest, url, algorithm=HASH_ALGORITHM):
+    """One manifest record for a saved panel"""
+    return {'index': index, 'size': size, 'hash': digest, 'hash_algorithm': algorithm, 'url': url}
+
+
+def update_manifest(chapter_folder, chapter_url, expected_count, panels):
+    """
+    Merge freshly saved panels into the chapter's manifest.
+    panels: {filename: panel_entry(...)}
+    Entries that point at the same panel position under another file name are replaced,
+    and entries past expected_count (the page now has fewer panels) are dropped.
+    """
+    # A chapter from before manifests existed: record what is already on disk first
+    manifest = load_manifest(chapter_folder) or build_manifest(chapter_folder, expected_count)
+    manifest['chapter_url'] = chapter_url or manifest.get('chapter_url')
+    manifest['expected_count'] = expected_count
+    
+    new_indexes = {entry['index'] for entry in panels.values()}
+    manifest['panels'] = {
+        name: entry for name, entry in manifest['panels'].items()
+        if entry['index'] not in new_indexes and (not expected_count or entry['index'] <= expected_count)
+    }
+    manifest['panels'].update(panels)
+    
+    write_manifest(chapter_folder, manifest)
+    return manifest
+
+
+def build_manifest(chapter_folder, expected_count=None):
+    """
+    Create a manifest for a chapter downloaded before manifests existed.
+    Source URLs are unknown, so they are recorded as None.
+    """
+    panels = {}
+    with os.scandir(chapter_folder) as entries:
+        for entry in entries:
+            match = re.match(r'panel-(\d+)', entry.name)
+            if match and entry.is_file() and not entry.name.endswith('.part'):
+                panels[entry.name] = panel_entry(
+                    int(match.group(1)), entry.stat().st_size, hash_file(entry.path), None
+                )
+    
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'chapter_url': None,
+        'expected_count': expected_count if expected_count is not None else len(panels),
+        'panels': panels,
+    }
+    write_manifest(chapter_folder, manifest)
+    return manifest
+
+
+# ============================================
+# VERIFICATION AND LISTINGS
+# ============================================
+
+def check_manifest(chapter_folder, manifest, expected_count):
+    """
+    Verify a chapter against its manifest: every expected position is recorded
+    once and the file on disk still has the recorded size.
+    Returns: (actual_panel_count, expected_panel_count, is_valid, issue_description)
+    """
+    panels = manifest['panels']
+    
+    sizes = {}
+    with os.scandir(chapter_folder) as entries:
+        for entry in entries:
+            if entry.name in panels and entry.is_file():
+                sizes[entry.name] = entry.stat().st_size
+    
+    actual_count = len(sizes)
+    
+    if actual_count == 0:
+        return 0, expected_count, False, "No panels found"
+    
+    if not expected_count:
+        return actual_count, 0, False, "No expected count in metadata"
+    
+    missing = [name for name in panels if name not in sizes]
+    if missing:
+        return actual_count, expected_count, False, f"{len(missing)} panels listed in manifest are missing"
+    
+    changed = [name for name, size in sizes.items() if size != panels[name]['size']]
+    if changed:
+        return actual_count, expected_count, False, f"{len(changed)} panels differ in size from manifest"
+    
+    if actual_count != expected_count:
+        return actual_count, expected_count, False, f"Panel count mismatch: expected {expected_count}, got {actual_count}"
+    
+    if sorted(entry['index'] for entry in panels.values()) != list(range(1, expected_count + 1)):
+        return actual_count, expected_count, False, "Panel numbering has gaps"
+    
+    return actual_count, expected_count, True, ""
+
+
+def list_local_images(local_folder):
+    """
+    Image files under a manga folder. Chapter folders with a manifest contribute
+    only the panels it lists; folders without one contribute every image.
+    Returns: {relative_path (forward slashes): full_path}
+    """
+    files = {}
+    
+    for root, dirs, filenames in os.walk(local_folder):
+        manifest = load_manifest(root) if MANIFEST_FILE in filenames else None
+        if manifest is not None:
+            # Only files the manifest vouches for (stray files and leftovers are skipped)
+            dirs[:] = []
+            filenames = [f for f in filenames if f in manifest['panels']]
+        
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                full_path = os.path.join(root, filename)
+                files[os.path.relpath(full_path, local_folder).replace('\\', '/')] = full_path
+    
+    return files
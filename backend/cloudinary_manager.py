@@ -12,6 +12,7 @@ import csv
 import os
 from pathlib import Path
 from datetime import datetime
+from admin_api import admin_call, ensure_folder, get_folder_cache
 
 # ============================================
 # CONFIGURATION
@@ -145,23 +146,16 @@ def auto_upload_missing():
     folders_to_create = set()
     
     for cloudinary_path in missing_in_cloudinary:
-        # Extract folder path (everything before the filename)
+        # Extract folder path (everything before the filename); creating it creates its parents
         folder_path = '/'.join(cloudinary_path.split('/')[:-1])
         if folder_path:
-            # Add all parent folders
-            parts = folder_path.split('/')
-            for i in range(len(parts)):
-                folder = '/'.join(parts[:i+1])
-                folders_to_create.add(folder)
+            folders_to_create.add(folder_path)
     
-    # Create folders
+    # Create folders (ones already known to exist cost no Admin API call)
+    folder_cache = get_folder_cache()
     for folder in sorted(folders_to_create):
-        try:
-            cloudinary.api.create_folder(folder)
+        if not folder_cache.is_known(folder) and ensure_folder(folder):
             print(f"✅ Created: {folder}")
-        except Exception as e:
-            if 'already exists' not in str(e).lower() and 'exist' not in str(e).lower():
-                print(f"⚠️  {folder}: {str(e)[:50]}")
     
     # Step 5: Upload missing files
     print("\n📤 Uploading missing files...\n")
@@ -310,34 +304,22 @@ def upload_images():
     print("\n📁 Creating folder structure in Cloudinary...")
     created_folders = 0
     
-    # First, create the base folder if specified
-    if cloudinary_base:
-        try:
-            cloudinary.api.create_folder(cloudinary_base)
-            print(f"✅ Created base folder: {cloudinary_base}")
-            created_folders += 1
-        except Exception as e:
-            if 'already exists' in str(e).lower() or 'exist' in str(e).lower():
-                print(f"⏭️  Base folder exists: {cloudinary_base}")
-            else:
-                print(f"⚠️  Note: {str(e)[:50]}")
+    # Each level is created at most once (parents come with their children, known folders are skipped)
+    folder_cache = get_folder_cache()
+    folder_paths = [cloudinary_base] if cloudinary_base else []
+    folder_paths += [
+        f"{cloudinary_base}/{folder}".replace('\\', '/') if cloudinary_base else folder.replace('\\', '/')
+        for folder in sorted(all_folders)
+    ]
     
-    # Then create all subfolders
-    for folder in sorted(all_folders):
-        try:
-            folder_path = f"{cloudinary_base}/{folder}".replace('\\', '/') if cloudinary_base else folder.replace('\\', '/')
-            # Create folder by calling the create_folder API
-            cloudinary.api.create_folder(folder_path)
+    for folder_path in folder_paths:
+        if folder_cache.is_known(folder_path):
+            print(f"⏭️  Folder exists: {folder_path}")
+        elif ensure_folder(folder_path):
             print(f"✅ Created folder: {folder_path}")
             created_folders += 1
-        except cloudinary.exceptions.Error as e:
-            # Folder might already exist, that's okay
-            if 'already exists' in str(e).lower() or 'exist' in str(e).lower():
-                print(f"⏭️  Folder exists: {folder_path}")
-            else:
-                print(f"⚠️  Could not create folder {folder_path}: {str(e)[:50]}")
-        except Exception as e:
-            print(f"⚠️  Could not create folder {folder_path}: {str(e)[:50]}")
+        else:
+            print(f"⚠️  Could not create folder {folder_path}")
     
     print(f"\n✅ Folder structure ready!")
     print(f"💡 TIP: In Cloudinary UI, use 'Folder View' to see organized structure")
@@ -531,7 +513,8 @@ def list_folders():
         next_cursor = None
         
         while True:
-            result = cloudinary.api.root_folders(
+            result = admin_call(
+                cloudinary.api.root_folders,
                 max_results=500,
                 next_cursor=next_cursor
             )
@@ -577,7 +560,8 @@ def search_by_tag():
         next_cursor = None
         
         while True:
-            result = cloudinary.api.resources_by_tag(
+            result = admin_call(
+                cloudinary.api.resources_by_tag,
                 tag,
                 max_results=500,
                 next_cursor=next_cursor
@@ -733,7 +717,8 @@ def get_all_resources_recursive(folder_path=""):
     
     while True:
         try:
-            result = cloudinary.api.resources(
+            result = admin_call(
+                cloudinary.api.resources,
                 type='upload',
                 prefix=folder_path,
                 max_results=500,
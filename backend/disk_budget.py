@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+DISK-BUDGETED CHAPTER CACHE
+Lets the pipeline process series larger than the local disk: chapter folders
+count against a byte budget, and once a chapter's upload is confirmed its
+local files become evictable, first confirmed first evicted (FIFO: nothing
+reads a chapter back once it is uploaded, so there is no recency to track).
+Scraping only waits
+when the budget is full and nothing can be evicted yet. Confirmed uploads are
+recorded in the metadata store (uploads table), so final verification can
+read the record instead of the files.
+"""
+
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+
+from chapter_manifest import load_manifest
+from metadata_store import get_store
+from panel_store import PANEL_STORE_DIR, blob_key, get_panel_store
+from verify_cache import list_chapter_folders
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DEFAULT_CHAPTER_ESTIMATE = 30 * 1024 * 1024  # Reserved per chapter before any chapter size is known
+BUDGET_POLL = 5.0                            # Seconds a blocked scraper waits before looking again
+
+
+def chapter_number(chapter_folder):
+    match = re.search(r'chapter-(\d+)', os.path.basename(chapter_folder))
+    return int(match.group(1)) if match else 0
+
+
+def folder_size(chapter_folder):
+    """Bytes of a chapter folder (from its manifest when it has one)"""
+    manifest = load_manifest(chapter_folder)
+    if manifest is not None:
+        return sum(entry['size'] for entry in manifest['panels'].values())
+    
+    total = 0
+    try:
+        with os.scandir(chapter_folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    total += entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+# ============================================
+# CACHE
+# ============================================
+
+class ChapterDiskCache:
+    """
+    Byte budget over one manga's chapter folders; safe to share between chapter workers.
+    uploader(chapter_folder) uploads a finished chapter and returns
+    (confirmed_panel_count, cloudinary_folder), or None if any panel is not confirmed.
+    """
+    
+    def __init__(self, manga_path, manga_slug, metadata_csv_path, budget_bytes, uploader=None):
+        self.manga_path = manga_path
+        self.manga_slug = manga_slug
+        self.budget = budget_bytes
+        self.uploader = uploader
+        self.store = get_store(metadata_csv_path)
+        self.uploads = self.store.load_uploads(manga_slug)
+        
+        self.sizes = {}                  # chapter folder -> bytes on disk
+        self.evictable = OrderedDict()   # uploaded chapter folders, in order of upload confirmation
+        self.reserved = 0                # Bytes promised to chapters being scraped
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        
+        store_root = os.path.join(os.path.dirname(os.path.abspath(manga_path)), PANEL_STORE_DIR)
+        self.panel_store = get_panel_store(store_root) if os.path.isdir(store_root) else None
+        
+        self.scan()
+    
+    def scan(self):
+        """Account for chapter folders already on disk; uploaded ones start out evictable"""
+        if not os.path.isdir(self.manga_path):
+            return
+        
+        folders = {}
+        for name in list_chapter_folders(self.manga_path):
+            folder = os.path.join(self.manga_path, name)
+            folders[chapter_number(folder)] = folder
+            self.sizes[folder] = folder_size(folder)
+        
+        # load_uploads is ordered by confirmation time, the eviction order
+        for chapter_num, row in self.uploads.items():
+            if chapter_num in folders and not row['evicted_at']:
+                self.evictable[folders[chapter_num]] = None
+    
+    @property
+    def used(self):
+        return sum(self.sizes.values())
+    
+    def estimate(self):
+        """Bytes to reserve for the next chapter: the average chapter size seen so far"""
+        sizes = [size for size in self.sizes.values() if size]
+        return sum(sizes) // len(sizes) if sizes else DEFAULT_CHAPTER_ESTIMATE
+    
+    def is_uploaded(self, chapter_num):
+        """True if the chapter's upload is confirmed (its local copy may be gone)"""
+        return chapter_num in self.uploads
+    
+    # ---------- scraping ----------
+    
+    def acquire(self):
+        """
+        Reserve room for one chapter, evicting uploaded chapters as needed.
+        Blocks while the budget is full and nothing is evictable yet.
+        Victims are picked, and their bytes taken off the books, under the lock
+        together with the budget check, so concurrent workers never evict for the
+        same shortfall twice; the files are deleted after the lock is released.
+        Returns: the number of bytes reserved (pass it back to release)
+        """
+        waiting = False
+        
+        while True:
+            victims = []
+            reserved = None
+            with self._cond:
+                while True:
+                    # Re-estimated on every pass: the first chapters to finish replace the default
+                    estimate = min(self.estimate(), self.budget)
+                    fits = self.used + self.reserved + estimate <= self.budget
+                    # Nothing to evict and nothing in flight that could free space: proceed over budget
+                    stuck = not self.evictable and self.in_flight == 0
+                    if fits or stuck:
+                        if stuck and not fits:
+                            print("⚠️  Disk budget smaller than the chapters on disk, continuing over budget")
+                        self.reserved += estimate
+                        self.in_flight += 1
+                        reserved = estimate
+                        break
+                    
+                    if self.evictable:
+                        victim, _ = self.evictable.popitem(last=False)
+                        victims.append((victim, self.sizes.pop(victim, 0)))
+                        continue
+                    if victims:
+                        break  # Delete what was picked, then look again
+                    
+                    if not waiting:
+                        print(f"⏸️  Disk budget full ({self.used / 1024 / 1024:.0f} MB used), "
+                              f"waiting for uploads to confirm...")
+                        waiting = True
+                    self._cond.wait(timeout=BUDGET_POLL)
+            
+            for victim, size in victims:
+                self.evict(victim, size)
+            if reserved is not None:
+                return reserved
+    
+    def release(self, chapter_folder, reserved):
+        """A chapter finished (or failed): replace its reservation with its real size"""
+        size = folder_size(chapter_folder) if os.path.isdir(chapter_folder) else 0
+        with self._cond:
+            self.reserved -= reserved
+            self.in_flight -= 1
+            if size:
+                self.sizes[chapter_folder] = size
+            self._cond.notify_all()
+    
+    # ---------- uploads ----------
+    
+    def chapter_ready(self, chapter_folder):
+        """
+        Upload a finished chapter; once every panel is confirmed it is recorded
+        and becomes evictable.
+        Returns: confirmed panel count (0 if the upload was not confirmed)
+        """
+        if self.uploader is None:
+            return 0
+        
+        result = self.uploader(chapter_folder)
+        if not result:
+            return 0
+        
+        panel_count, cloudinary_folder = result
+        chapter_num = chapter_number(chapter_folder)
+        size = folder_size(chapter_folder)
+        self.store.record_upload(self.manga_slug, chapter_num, panel_count, size, cloudinary_folder)
+        
+        with self._cond:
+            self.uploads[chapter_num] = {
+                'chapter_number': chapter_num, 'panel_count': panel_count, 'size_bytes': size,
+                'cloudinary_folder': cloudinary_folder, 'evicted_at': None,
+            }
+            self.sizes[chapter_folder] = size
+            self.evictable[chapter_folder] = None
+            self.evictable.move_to_end(chapter_folder)  # Just confirmed: evicted last
+            self._cond.notify_all()
+        return panel_count
+    
+    def evict(self, chapter_folder, size):
+        """
+        Delete an uploaded chapter's local files (and panel-store blobs nothing else links to).
+        Called without the lock, for a victim acquire has already taken off the books.
+        """
+        manifest = load_manifest(chapter_folder)
+        keys = [blob_key(entry) for entry in manifest['panels'].values()] if manifest else []
+        
+        shutil.rmtree(chapter_folder, ignore_errors=True)
+        if self.panel_store is not None and keys:
+            self.panel_store.drop_unlinked(keys)
+        
+        chapter_num = chapter_number(chapter_folder)
+        evicted_at = self.store.mark_evicted(self.manga_slug, chapter_num)
+        
+        with self._cond:
+            if chapter_num in self.uploads:
+                self.uploads[chapter_num]['evicted_at'] = evicted_at
+            self._cond.notify_all()
+        print(f"🧹 Evicted uploaded chapter {chapter_num} ({size / 1024 / 1024:.1f} MB)")
+    
+    def print_usage(self):
+        with self._cond:
+            print(f"💽 Disk budget: {self.used / 1024 / 1024:.0f} / {self.budget / 1024 / 1024:.0f} MB used, "
+                  f"{len(self.evictable)} uploaded chapters evictable, "
+                  f"{sum(1 for row in self.uploads.values() if row['evicted_at'])} evicted")
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+FAST HTML EXTRACTION
+Reads only the two things the scrapers need from a page:
+  - chapter pages: the images under .page-break.no-gaps
+  - manga index pages: the links under ul.main li
+Uses selectolax or lxml (C parsers) when installed, else BeautifulSoup restricted
+to the relevant subtrees with a SoupStrainer.
+
+Run directly with recorded pages to check parity against the full BeautifulSoup parse:
+    python html_extract.py chapter.html index.html
+(tests/test_html_extract.py runs the same check on the recorded pages in tests/fixtures/)
+"""
+
+import sys
+import time
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.dammit import UnicodeDammit
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser  # selectolax < 1.0 (Modest)
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml.html
+    from lxml.etree import ParserError as LxmlParserError
+except ImportError:
+    lxml = None
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+PANEL_SELECTOR = '.page-break.no-gaps img'
+CHAPTER_LINK_SELECTOR = 'ul.main li a'
+
+# Attributes that may hold a panel's URL, in priority order (lazy loaders use data-*)
+IMG_URL_ATTRS = ('src', 'data-src', 'data-lazy-src', 'data-original')
+
+PANEL_XPATH = (
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' page-break ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' no-gaps ')]//img"
+)
+CHAPTER_LINK_XPATH = "//ul[contains(concat(' ', normalize-space(@class), ' '), ' main ')]//li//a"
+
+
+def detect_backend():
+    """Fastest available backend name"""
+    if SelectolaxParser is not None:
+        return 'selectolax'
+    if lxml is not None:
+        return 'lxml'
+    return 'bs4'
+
+
+BACKEND = detect_backend()
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+def has_class(class_name):
+    """
+    SoupStrainer matcher for one class token. At parse time the strainer sees the
+    whole class string ("page-break no-gaps"), so class_='page-break' would never match.
+    """
+    return lambda value: value is not None and class_name in value.split()
+
+
+def is_empty(html):
+    return not html or not html.strip()
+
+
+def page_encoding(html):
+    """Encoding BeautifulSoup would decode page bytes with (declared charset, BOM, else sniffed)"""
+    return UnicodeDammit(html, is_html=True).original_encoding or 'utf-8'
+
+
+def as_text(html):
+    """Page as str for selectolax, decoded exactly as BeautifulSoup decodes it"""
+    if isinstance(html, bytes):
+        return UnicodeDammit(html, is_html=True).unicode_markup
+    return html
+
+
+def lxml_tree(html):
+    """
+    lxml document from raw page bytes (str is encoded, so an XML encoding
+    declaration can't make lxml refuse it), or None for an empty document
+    """
+    if isinstance(html, bytes):
+        encoding = page_encoding(html)
+    else:
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    try:
+        return lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding=encoding))
+    except LxmlParserError:
+        return None
+
+
+def first_url_attr(get_attr):
+    """First non-empty value among IMG_URL_ATTRS, or None"""
+    for attr in IMG_URL_ATTRS:
+        value = get_attr(attr)
+        if value:
+            return value
+    return None
+
+
+# ============================================
+# BACKENDS
+# ============================================
+# Every backend returns the same shapes:
+#   panels -> one raw URL value (or None) per matched <img>, in document order
+#   links  -> (href or None, stripped text) per matched <a>, in document order
+
+def panel_srcs_bs4_full(html):
+    """Reference implementation: full html.parser parse, exactly as the scrapers used to do it"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return [first_url_attr(img.get) for img in soup.select(PANEL_SELECTOR)]
+
+
+def chapter_links_bs4_full(html):
+    """Reference implementation for index pages"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return [(link.get('href'), link.get_text(strip=True)) for link in soup.select(CHAPTER_LINK_SELECTOR)]
+
+
+def panel_srcs_bs4(html):
+    """BeautifulSoup building only the .page-break subtrees"""
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(class_=has_class('page-break')))
+    return [first_url_attr(img.get) for img in soup.select(PANEL_SELECTOR)]
+
+
+def chapter_links_bs4(html):
+    """BeautifulSoup building only the ul.main subtrees"""
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('ul', class_=has_class('main')))
+    return [(link.get('href'), link.get_text(strip=True)) for link in soup.select(CHAPTER_LINK_SELECTOR)]
+
+
+def panel_srcs_lxml(html):
+    tree = None if is_empty(html) else lxml_tree(html)
+    if tree is None:
+        return []
+    return [first_url_attr(img.get) for img in tree.xpath(PANEL_XPATH)]
+
+
+def chapter_links_lxml(html):
+    tree = None if is_empty(html) else lxml_tree(html)
+    if tree is None:
+        return []
+    return [
+        (link.get('href'), ''.join(text.strip() for text in link.itertext()))
+        for link in tree.xpath(CHAPTER_LINK_XPATH)
+    ]
+
+
+def panel_srcs_selectolax(html):
+    if is_empty(html):
+        return []
+    tree = SelectolaxParser(as_text(html))
+    return [first_url_attr(img.attributes.get) for img in tree.css(PANEL_SELECTOR)]
+
+
+def chapter_links_selectolax(html):
+    if is_empty(html):
+        return []
+    tree = SelectolaxParser(as_text(html))
+    return [
+        (link.attributes.get('href'), link.text(deep=True, separator='', strip=True))
+        for link in tree.css(CHAPTER_LINK_SELECTOR)
+    ]
+
+
+PANEL_EXTRACTORS = {
+    'bs4-full': panel_srcs_bs4_full,
+    'bs4': panel_srcs_bs4,
+    'lxml': panel_srcs_lxml,
+    'selectolax': panel_srcs_selectolax,
+}
+
+CHAPTER_LINK_EXTRACTORS = {
+    'bs4-full': chapter_links_bs4_full,
+    'bs4': chapter_links_bs4,
+    'lxml': chapter_links_lxml,
+    'selectolax': chapter_links_selectolax,
+}
+
+
+# ============================================
+# PUBLIC API
+# ============================================
+
+def panel_image_srcs(html, backend=None):
+    """Raw panel URL values of a chapter page (None where an <img> has no URL attribute)"""
+    return PANEL_EXTRACTORS[backend or BACKEND](html)
+
+
+def chapter_link_items(html, backend=None):
+    """(href, text) pairs of a manga index page's chapter list"""
+    return CHAPTER_LINK_EXTRACTORS[backend or BACKEND](html)
+
+
+def available_backends():
+    """Backends usable in this environment"""
+    backends = ['bs4-full', 'bs4']
+    if lxml is not None:
+        backends.append('lxml')
+    if SelectolaxParser is not None:
+        backends.append('selectolax')
+    return backends
+
+
+def check_parity(html, repeat=5):
+    """
+    Compare every available backend with the full BeautifulSoup parse on one page.
+    Returns: {backend: {'panels_match', 'links_match', 'seconds'}}
+    """
+    expected_panels = panel_srcs_bs4_full(html)
+    expected_links = chapter_links_bs4_full(html)
+    
+    results = {}
+    for backend in available_backends():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            panels = panel_image_srcs(html, backend)
+            links = chapter_link_items(html, backend)
+        results[backend] = {
+            'panels_match': panels == expected_panels,
+            'links_match': links == expected_links,
+            'seconds': (time.perf_counter() - started) / repeat,
+        }
+    
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python html_extract.py <recorded_page.html> [...]")
+        sys.exit(1)
+    
+    print(f"Default backend: {BACKEND}")
+    all_match = True
+    
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            html = f.read()
+        
+        print(f"\n📄 {path}")
+        for backend, result in check_parity(html).items():
+            ok = result['panels_match'] and result['links_match']
+            all_match = all_match and ok
+            print(f"  {'✓' if ok else '✗'} {backend:<10} {result['seconds'] * 1000:8.2f} ms"
+                  f"  panels={'OK' if result['panels_match'] else 'MISMATCH'}"
+                  f"  links={'OK' if result['links_match'] else 'MISMATCH'}")
+    
+    sys.exit(0 if all_match else 1)
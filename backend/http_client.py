@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SHARED HTTP CLIENT
+One pooled requests.Session for all scraper modules (keep-alive + default headers),
+a per-host request budget and the shared retry policy (see retry_policy)
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from retry_policy import retry_call
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+POOL_CONNECTIONS = 8    # Number of distinct hosts kept in the pool
+POOL_MAXSIZE = 32       # Keep-alive connections per host (>= max concurrent requests)
+HOST_RATE_LIMIT = 8.0   # Sustained requests per second allowed per host
+HOST_BURST = 8          # Requests a host may receive back-to-back before throttling
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://www.mangaread.org/',
+}
+
+_session = None
+_session_lock = threading.Lock()
+_rate_limiter = None
+
+
+# ============================================
+# SESSION MANAGEMENT
+# ============================================
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, headers=None):
+    """Create a requests.Session with sized keep-alive pools and default headers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_session():
+    """Return the shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    """Close the shared session and drop its pooled connections"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# ============================================
+# PER-HOST RATE LIMITING
+# ============================================
+
+class HostRateLimiter:
+    """Token-bucket request budget per host, safe to share between threads"""
+    
+    def __init__(self, rate=HOST_RATE_LIMIT, burst=HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}  # host -> (tokens, last_refill)
+        self._lock = threading.Lock()
+    
+    def acquire(self, url):
+        """Block until the URL's host has budget for one more request"""
+        host = urlparse(url).netloc
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last_refill = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last_refill) * self.rate)
+                
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            
+            time.sleep(wait)
+
+
+def get_rate_limiter():
+    """Return the process-wide per-host rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _session_lock:
+            if _rate_limiter is None:
+                _rate_limiter = HostRateLimiter()
+    return _rate_limiter
+
+
+def polite_get(url, policy=None, **kwargs):
+    """
+    GET through the shared session after taking a slot from the host budget.
+    Network errors and retryable statuses are retried with backoff, and requests
+    to a host whose circuit is open wait until it recovers.
+    """
+    def attempt():
+        get_rate_limiter().acquire(url)
+        return get_session().get(url, **kwargs)
+    
+    return retry_call(attempt, url, policy)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+PANEL IMAGE INTEGRITY
+Deep verification of downloaded panels: magic bytes, end-of-image markers and
+(when Pillow is installed) a full decode, spread over a process pool.
+Every extension in chapter_manifest.IMAGE_EXTENSIONS is recognised; a format
+Pillow has no decoder for is judged on its header and trailer alone.
+Results are cached per manga by (path, size, mtime), so repeat runs only look
+at panels that changed.
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, UnidentifiedImageError
+except ImportError:
+    Image = None
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+INTEGRITY_CACHE_FILE = 'integrity_cache.json'  # Kept in the manga folder
+INTEGRITY_WORKERS = os.cpu_count() or 4         # Decoding is CPU bound
+INTEGRITY_CHUNKSIZE = 32                        # Panels handed to a worker at a time
+HEAD_BYTES = 512                                # Leading bytes sniffed (SVG may open with an XML prolog)
+TAIL_BYTES = 64                                 # Trailing bytes searched for an end marker
+
+
+# ============================================
+# SINGLE FILE CHECK
+# ============================================
+
+def sniff_format(head):
+    """Image format from the first bytes of a file, or None"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[4:12] in (b'ftypavif', b'ftypavis'):
+        return 'avif'
+    if head.startswith(b'BM'):
+        return 'bmp'
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    if b'<svg' in head.lower():
+        return 'svg'
+    return None
+
+
+def check_image_file(path, decode=True):
+    """
+    Header, trailer and (with decode and Pillow) decode check of one panel.
+    decode=False is the cheap check: two small reads per file.
+    Returns: (is_valid, issue_description)
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return False, "Empty file"
+        
+        with open(path, 'rb') as f:
+            head = f.read(HEAD_BYTES)
+            f.seek(max(0, size - TAIL_BYTES))
+            tail = f.read()
+    except OSError as e:
+        return False, f"Unreadable: {e}"
+    
+    image_format = sniff_format(head)
+    if image_format is None:
+        if head.lstrip()[:1] == b'<':
+            return False, "HTML/XML page saved as image"
+        return False, "Unknown image format"
+    
+    # Truncated downloads lose their end marker first
+    if image_format == 'jpeg' and b'\xff\xd9' not in tail:
+        return False, "Truncated JPEG (no end marker)"
+    if image_format == 'png' and b'IEND' not in tail:
+        return False, "Truncated PNG (no IEND chunk)"
+    if image_format == 'gif' and not tail.rstrip(b'\x00').endswith(b';'):
+        return False, "Truncated GIF (no trailer)"
+    if image_format == 'webp' and int.from_bytes(head[4:8], 'little') + 8 > size:
+        return False, "Truncated WebP (RIFF size mismatch)"
+    if image_format == 'bmp' and int.from_bytes(head[2:6], 'little') > size:
+        return False, "Truncated BMP (header size mismatch)"
+    if image_format == 'svg':
+        # Vector markup: Pillow can't decode it, a closing tag is the best check
+        if b'</svg>' not in tail.lower():
+            return False, "Truncated SVG (no closing tag)"
+        return True, ""
+    
+    if decode and Image is not None:
+        try:
+            with Image.open(path) as img:
+                img.load()
+        except UnidentifiedImageError:
+            pass  # No decoder for this format in the installed Pillow (e.g. AVIF without the plugin)
+        except Exception as e:
+            return False, f"Decode failed: {e}"
+    
+    return True, ""
+
+
+def check_image_job(path):
+    """Process-pool unit: (path, is_valid, issue_description)"""
+    is_valid, issue = check_image_file(path)
+    return path, is_valid, issue
+
+
+# ============================================
+# CACHE
+# ============================================
+
+class IntegrityCache:
+    """Per-manga integrity results keyed by panel path relative to the manga folder"""
+    
+    def __init__(self, manga_path):
+        self.manga_path = manga_path
+        self.path = os.path.join(manga_path, INTEGRITY_CACHE_FILE)
+        self.entries = self.load()
+        self._dirty = False
+    
+    def load(self):
+        """Read the cache file (a missing or unreadable file is an empty cache)"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def key(self, path):
+        return os.path.relpath(path, self.manga_path).replace('\\', '/')
+    
+    def lookup(self, path, size, mtime_ns):
+        """Cached (is_valid, issue) if the file's size and mtime are unchanged"""
+        entry = self.entries.get(self.key(path))
+        if entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            return entry['valid'], entry['issue']
+        return None
+    
+    def store(self, path, size, mtime_ns, is_valid, issue):
+        self.entries[self.key(path)] = {'size': size, 'mtime_ns': mtime_ns, 'valid': is_valid, 'issue': issue}
+        self._dirty = True
+    
+    def forget(self, path):
+        if self.entries.pop(self.key(path), None) is not None:
+            self._dirty = True
+    
+    def save(self):
+        """Write the cache back if anything changed"""
+        if not self._dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+# ============================================
+# BULK VERIFICATION
+# ============================================
+
+def verify_images(manga_path, panel_paths, workers=INTEGRITY_WORKERS):
+    """
+    Deep-check panels, reusing cached results for files whose size and mtime are unchanged.
+    Returns: {path: issue_description} for damaged panels only
+    """
+    cache = IntegrityCache(manga_path)
+    damaged = {}
+    to_check = {}
+    
+    for path in panel_paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            damaged[path] = f"Unreadable: {e}"
+            continue
+        
+        cached = cache.lookup(path, stat.st_size, stat.st_mtime_ns)
+        if cached is None:
+            to_check[path] = stat
+        elif not cached[0]:
+            damaged[path] = cached[1]
+    
+    if to_check:
+        print(f"🔬 Deep-checking {len(to_check)} panels ({len(panel_paths) - len(to_check)} cached, "
+              f"{'full decode' if Image is not None else 'header/trailer only, Pillow not installed'})")
+        
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+            for path, is_valid, issue in executor.map(check_image_job, list(to_check), chunksize=INTEGRITY_CHUNKSIZE):
+                stat = to_check[path]
+                cache.store(path, stat.st_size, stat.st_mtime_ns, is_valid, issue)
+                if not is_valid:
+                    damaged[path] = issue
+    
+    cache.save()
+    return damaged
+
+
+def discard_damaged(manga_path, damaged, store=None):
+    """
+    Delete damaged panels so a resumed re-download fetches them again.
+    With a panel store, the blobs they came from are dropped too (with their
+    source URLs), so the store can't hand the same bytes back.
+    Returns: number of files removed
+    """
+    cache = IntegrityCache(manga_path)
+    removed = 0
+    for path in damaged:
+        if store is not None:
+            store.forget_file(path)
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        cache.forget(path)
+    cache.save()
+    return removed
@@ -1,11 +1,28 @@
 import os
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-import time
 import re
-import csv
-from datetime import datetime
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_client import close_session
+from mirror_pool import mirrored_get, print_mirror_report
+from retry_policy import wait_for_host
+from html_extract import panel_image_srcs
+from chapter_index import INDEX_TTL, refresh_chapter_index, unheld_chapters
+from metadata_store import get_store, metadata_exists
+from chapter_manifest import (
+    MANIFEST_FILE, build_manifest, check_manifest, load_manifest, new_hasher, panel_entry, update_manifest
+)
+from panel_store import PANEL_STORE_DIR, get_panel_store, print_savings_report
+from image_integrity import check_image_file, discard_damaged, verify_images
+from verify_cache import VERIFY_WORKERS, VerificationCache, folder_mtime, list_chapter_folders, scan_folder
+
+PANEL_WORKERS = 8    # Concurrent panel downloads per chapter (host budget still applies)
+CHAPTER_WORKERS = 1  # Chapters in flight at once in scrape_all_chapters
+CHUNK_SIZE = 64 * 1024  # Bytes per streamed panel write
+PARTIAL_SUFFIX = '.part'  # In-progress downloads, renamed into place when complete
+DEDUPE_PANELS = True  # Hardlink repeated panels to one blob in <base_path>/panel_store
 
 def get_manga_slug_from_url(manga_url):
     """Extract slug from manga URL"""
@@ -14,33 +31,272 @@ def get_manga_slug_from_url(manga_url):
     return match.group(1) if match else None
 
 
+def parse_panel_urls(html, page_url):
+    """
+    Extract panel image URLs from a chapter page, in page order.
+    Returns: (image_urls, expected_count)
+    """
+    # Raw URL value of each image in the page-break no-gaps blocks (None if it has none)
+    raw_urls = panel_image_srcs(html)
+    
+    # Keep order, use list instead of set
+    image_urls = []
+    for img_url in raw_urls:
+        if img_url:
+            # Strip whitespace/newlines from URL
+            img_url = img_url.strip()
+            # Convert relative URLs to absolute
+            image_urls.append(urljoin(page_url, img_url))
+    
+    return image_urls, len(raw_urls)
+
+
+class ChapterPage:
+    """A chapter page fetched and parsed once per run"""
+    
+    def __init__(self, url, panel_urls, expected_count):
+        self.url = url
+        self.panel_urls = panel_urls          # Ordered, absolute image URLs
+        self.expected_count = expected_count  # Number of .page-break.no-gaps images
+        # Fingerprint of the panel list rather than the raw HTML, which changes
+        # on every request (ads, nonces) even when the chapter itself hasn't
+        self.fingerprint = hashlib.sha1('\n'.join(panel_urls).encode('utf-8')).hexdigest()
+
+
+_chapter_pages = {}
+_chapter_pages_lock = threading.Lock()
+
+
+def build_chapter_page(url, html):
+    """
+    Parse a chapter page and remember the result for the rest of the run.
+    Pages without panel URLs are not cached, so a retry fetches them again.
+    """
+    image_urls, expected_count = parse_panel_urls(html, url)
+    page = ChapterPage(url, image_urls, expected_count)
+    if image_urls:
+        with _chapter_pages_lock:
+            _chapter_pages[url] = page
+    return page
+
+
+def fetch_chapter_page(url, refresh=False):
+    """
+    Return the ChapterPage for url, fetching it only if this run hasn't already.
+    Raises on HTTP errors (nothing is cached then).
+    """
+    if not refresh:
+        with _chapter_pages_lock:
+            page = _chapter_pages.get(url)
+        if page is not None:
+            return page
+    
+    response = mirrored_get(url, timeout=10)
+    response.raise_for_status()
+    
+    return build_chapter_page(url, response.content)
+
+
+def clear_chapter_page_cache():
+    """Forget every cached chapter page"""
+    with _chapter_pages_lock:
+        _chapter_pages.clear()
+
+
 def get_expected_panel_count(url):
     """
-    Get the expected number of panels from the chapter page.
+    Get the expected number of panels from the chapter page (served from the run cache when possible).
     Returns: (expected_count, error_message)
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://www.mangaread.org/',
-    }
+    try:
+        return fetch_chapter_page(url).expected_count, ""
+    except Exception as e:
+        return 0, str(e)
+
+
+def panel_filename(img_url, idx):
+    """panel-NNN plus the extension taken from the image URL (.jpg if none)"""
+    ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
+    return f"panel-{idx:03d}{ext}"
+
+
+def is_panel_file(filename):
+    """True for finished panel files (in-progress .part downloads are excluded)"""
+    return filename.startswith('panel-') and not filename.endswith(PARTIAL_SUFFIX)
+
+
+def finish_panel_write(tmp_path, filepath, written, content_length):
+    """
+    Move a fully written, fsynced temp file onto its final panel path.
+    Raises IOError if the size disagrees with Content-Length. A short temp file
+    is kept so a resumed download can continue it with a Range request;
+    an oversized one is removed.
+    """
+    if content_length is not None and written != content_length:
+        if written > content_length:
+            os.remove(tmp_path)
+        raise IOError(f"Truncated download: got {written} of {content_length} bytes")
     
+    # Atomic on the same filesystem, so readers never see a half-written panel
+    os.replace(tmp_path, filepath)
+
+
+def expected_content_length(headers):
+    """Content-Length as an int, or None when absent or when the body is content-encoded"""
+    length = headers.get('Content-Length')
+    if length is None or headers.get('Content-Encoding'):
+        return None
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+        return int(length)
+    except ValueError:
+        return None
+
+
+def parse_content_range(value):
+    """
+    Parse a 'bytes start-end/total' Content-Range header.
+    Returns: (start, total) with total None when the server reports '*'
+    """
+    match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', value or '')
+    if not match:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), (int(total) if total != '*' else None)
+
+
+def download_panel(img_url, idx, output_folder, resume=False):
+    """
+    Stream one panel to panel-NNN<ext>, NNN being its position in the page.
+    Bytes go to a .part file that is fsynced and renamed into place when complete.
+    With resume=True an existing .part file is continued with a Range request
+    when the host answers 206; otherwise the panel is fetched from the start.
+    The content hash is computed while streaming.
+    Returns: (filename, manifest_entry)
+    """
+    filename = panel_filename(img_url, idx)
+    filepath = os.path.join(output_folder, filename)
+    tmp_path = filepath + PARTIAL_SUFFIX
+    
+    offset = os.path.getsize(tmp_path) if resume and os.path.exists(tmp_path) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+    
+    with mirrored_get(img_url, timeout=10, stream=True, headers=headers) as img_response:
+        range_start, range_total = parse_content_range(img_response.headers.get('Content-Range'))
+        if offset and (img_response.status_code == 416
+                       or (img_response.status_code == 206 and range_start != offset)):
+            # Our partial file doesn't fit the current resource (or the host sent another range), start over
+            os.remove(tmp_path)
+            return download_panel(img_url, idx, output_folder)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        images = soup.select('.page-break.no-gaps img')
+        img_response.raise_for_status()
+        content_length = expected_content_length(img_response.headers)
         
-        return len(images), ""
-    except Exception as e:
-        return 0, str(e)
+        mode = 'wb'
+        if offset and img_response.status_code == 206:
+            mode = 'ab'
+            if range_total is not None:
+                content_length = range_total
+            elif content_length is not None:
+                content_length += offset
+        
+        hasher = new_hasher()
+        written = 0
+        if mode == 'ab':
+            # Hash the bytes we already have so the digest covers the whole file
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+            written = offset
+        
+        with open(tmp_path, mode) as f:
+            for chunk in img_response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                hasher.update(chunk)
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    finish_panel_write(tmp_path, filepath, written, content_length)
+    
+    return filename, panel_entry(idx, written, hasher.hexdigest(), img_url)
+
+
+def manga_panel_store(manga_path):
+    """The panel store shared by every manga under the manga folder's base path, or None when disabled"""
+    if not DEDUPE_PANELS:
+        return None
+    base_path = os.path.dirname(os.path.abspath(manga_path))
+    return get_panel_store(os.path.join(base_path, PANEL_STORE_DIR))
+
+
+def chapter_panel_store(chapter_folder):
+    """The panel store of the manga a chapter folder belongs to (see manga_panel_store)"""
+    return manga_panel_store(os.path.dirname(os.path.abspath(chapter_folder)))
+
+
+def fetch_panel(img_url, idx, output_folder, resume=False, store=None):
+    """
+    download_panel through the panel store: a source URL the store already holds
+    is hardlinked instead of downloaded, and new downloads are deduplicated by content.
+    Returns: (filename, manifest_entry)
+    """
+    if store is not None:
+        filename = panel_filename(img_url, idx)
+        placed = store.materialize_url(img_url, os.path.join(output_folder, filename))
+        if placed:
+            size, key = placed
+            algorithm, digest = key.split('-', 1)
+            return filename, panel_entry(idx, size, digest, img_url, algorithm)
+    
+    filename, entry = download_panel(img_url, idx, output_folder, resume)
+    
+    if store is not None:
+        try:
+            accepted, issue = store.adopt(os.path.join(output_folder, filename), entry)
+            if not accepted:
+                print(f"⚠ Panel store: not storing {filename} ({issue})")
+        except Exception as e:
+            # The panel itself is saved; only the deduplication is lost
+            print(f"⚠ Panel store: {e}")
+    
+    return filename, entry
 
 
-def scrape_chapter(url, output_folder, metadata_csv_path, manga_name, manga_slug, update_immediately=False):
+def find_missing_panels(chapter_folder, image_urls):
+    """
+    Compare a chapter folder with the page's image list.
+    A panel needs fetching if its file is missing or empty, if only a .part file exists,
+    or if it is damaged: its size differs from the chapter manifest or it fails the
+    header/trailer check.
+    A panel saved under another extension (transcoded by panel_transcode) counts as present.
+    Returns: list of (panel_index, image_url) in page order
+    """
+    manifest = load_manifest(chapter_folder)
+    recorded = manifest['panels'] if manifest else {}
+    
+    present = set()
+    with os.scandir(chapter_folder) as entries:
+        for entry in entries:
+            if not (is_panel_file(entry.name) and entry.is_file()):
+                continue
+            size = entry.stat().st_size
+            if size == 0 or (entry.name in recorded and recorded[entry.name]['size'] != size):
+                continue
+            if not check_image_file(entry.path, decode=False)[0]:
+                continue
+            present.add(os.path.splitext(entry.name)[0])
+    
+    return [
+        (idx, img_url) for idx, img_url in enumerate(image_urls, 1)
+        if os.path.splitext(panel_filename(img_url, idx))[0] not in present
+    ]
+
+
+def scrape_chapter(url, output_folder, metadata_csv_path, manga_name, manga_slug, update_immediately=False, max_workers=PANEL_WORKERS, resume=False):
     """
     Scrape a single chapter using Beautiful Soup.
+    Panels are fetched by up to max_workers threads; numbering follows page order.
+    With resume=True only missing or damaged panels are fetched (see find_missing_panels).
     Returns: (panel_count, success_status, error_message, expected_count)
     """
     print(f"\nFetching page: {url}")
@@ -52,42 +308,11 @@ def scrape_chapter(url, output_folder, metadata_csv_path, manga_name, manga_slug
     chapter_match = re.search(r'chapter-(\d+)', output_folder)
     chapter_num = int(chapter_match.group(1)) if chapter_match else 0
     
-    # Headers to mimic a browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Referer': 'https://www.mangaread.org/',
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find images only in page-break no-gaps class
-        images = soup.select('.page-break.no-gaps img')
-        expected_count = len(images)
+        page = fetch_chapter_page(url)
+        image_urls, expected_count = page.panel_urls, page.expected_count
         
         print(f"Found {expected_count} images in .page-break.no-gaps")
-        
-        # Keep order, use list instead of set
-        image_urls = []
-        for img in images:
-            # Try different attributes where image URL might be stored
-            img_url = (img.get('src') or 
-                      img.get('data-src') or 
-                      img.get('data-lazy-src') or
-                      img.get('data-original'))
-            
-            if img_url:
-                # Strip whitespace/newlines from URL
-                img_url = img_url.strip()
-                # Convert relative URLs to absolute
-                full_url = urljoin(url, img_url)
-                image_urls.append(full_url)
-        
         print(f"Found {len(image_urls)} image URLs")
         
         if not image_urls:
@@ -96,29 +321,37 @@ def scrape_chapter(url, output_folder, metadata_csv_path, manga_name, manga_slug
                 update_single_chapter_metadata(metadata_csv_path, manga_name, manga_slug, chapter_num, 0, expected_count, 'failed', 'No images found')
             return 0, False, "No images found", expected_count
         
-        # Download images in order
-        downloaded_count = 0
-        for idx, img_url in enumerate(image_urls, 1):
-            try:
-                print(f"Downloading image {idx}/{len(image_urls)}: {img_url[:80]}...")
-                
-                img_response = requests.get(img_url, headers=headers, timeout=10)
-                img_response.raise_for_status()
-                
-                # Get file extension from URL
-                ext = os.path.splitext(urlparse(img_url).path)[1] or '.jpg'
-                filename = f"panel-{idx:03d}{ext}"
-                filepath = os.path.join(output_folder, filename)
-                
-                with open(filepath, 'wb') as f:
-                    f.write(img_response.content)
-                
-                print(f"✓ Saved: {filename}")
-                downloaded_count += 1
-                time.sleep(0.5)  # Be polite, don't hammer the server
-                
-            except Exception as e:
-                print(f"✗ Failed to download {img_url}: {e}")
+        # Work out which panels to fetch
+        if resume:
+            to_fetch = find_missing_panels(output_folder, image_urls)
+            print(f"Resume: {len(image_urls) - len(to_fetch)} panels already on disk, {len(to_fetch)} to fetch")
+        else:
+            to_fetch = list(enumerate(image_urls, 1))
+        
+        # Download images concurrently; the index is fixed before dispatch so
+        # panel-NNN always matches the image's position on the page.
+        # Politeness comes from the shared per-host budget in http_client.
+        downloaded_count = len(image_urls) - len(to_fetch)
+        saved_panels = {}
+        store = chapter_panel_store(output_folder)
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {
+                executor.submit(fetch_panel, img_url, idx, output_folder, resume, store): (idx, img_url)
+                for idx, img_url in to_fetch
+            }
+            
+            for future in as_completed(futures):
+                idx, img_url = futures[future]
+                try:
+                    filename, entry = future.result()
+                    saved_panels[filename] = entry
+                    print(f"✓ Saved [{idx}/{len(image_urls)}]: {filename}")
+                    downloaded_count += 1
+                except Exception as e:
+                    print(f"✗ Failed to download {img_url}: {e}")
+        
+        if saved_panels:
+            update_manifest(output_folder, url, expected_count, saved_panels)
         
         print(f"✓ Done! {downloaded_count}/{expected_count} images saved to: {output_folder}")
         
@@ -139,95 +372,34 @@ def scrape_chapter(url, output_folder, metadata_csv_path, manga_name, manga_slug
 
 
 def update_single_chapter_metadata(metadata_csv_path, manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error_msg=''):
-    """Update metadata for a single chapter immediately after download"""
-    
-    # Ensure metadata file exists with headers
-    if not os.path.exists(metadata_csv_path):
-        with open(metadata_csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['manga_name', 'manga_slug', 'chapter_number', 'panel_count', 'expected_count', 'status', 'timestamp', 'error'])
-    
-    # Read all existing rows
-    rows = []
-    chapter_exists = False
-    
-    with open(metadata_csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        
-        for row in reader:
-            if row['manga_slug'] == manga_slug and int(row['chapter_number']) == chapter_num:
-                # Update existing row
-                row['manga_name'] = manga_name
-                row['panel_count'] = panel_count
-                row['expected_count'] = expected_count
-                row['status'] = status
-                row['timestamp'] = datetime.now().isoformat()
-                row['error'] = error_msg
-                chapter_exists = True
-            rows.append(row)
-    
-    # Write back all rows
-    with open(metadata_csv_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(rows)
-        
-        # Add new row if chapter didn't exist
-        if not chapter_exists:
-            writer.writerow({
-                'manga_name': manga_name,
-                'manga_slug': manga_slug,
-                'chapter_number': chapter_num,
-                'panel_count': panel_count,
-                'expected_count': expected_count,
-                'status': status,
-                'timestamp': datetime.now().isoformat(),
-                'error': error_msg
-            })
-
-
-def get_all_chapters(manga_url):
-    """Get list of all chapters from the manga page"""
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-    }
+    """Upsert metadata for a single chapter immediately after download (SQLite store behind the CSV)"""
+    get_store(metadata_csv_path).upsert_chapter(
+        manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error_msg
+    )
+
+
+def export_metadata_csv(metadata_csv_path):
+    """Refresh the metadata CSV interchange file from the store"""
+    rows = get_store(metadata_csv_path).export_csv(metadata_csv_path)
+    print(f"✓ Exported {rows} metadata rows to {metadata_csv_path}")
+
+
+def get_all_chapters(manga_url, max_age=INDEX_TTL):
+    """
+    Get list of all chapters from the manga page, via the shared chapter catalog.
+    A list checked within max_age seconds is reused; older ones are revalidated
+    with a conditional GET, so an unchanged series page is not downloaded again.
+    """
     
     print(f"Fetching chapter list from: {manga_url}")
     
     try:
-        response = requests.get(manga_url, headers=headers, timeout=15)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find all chapter links
-        chapter_links = []
-        links = soup.select('ul.main li a')
-        
-        print(f"Found {len(links)} chapter links")
-        
-        for link in links:
-            href = link.get('href')
-            if href and '/chapter-' in href:
-                # Extract chapter number
-                match = re.search(r'chapter-(\d+)', href)
-                if match:
-                    chapter_num = int(match.group(1))
-                    full_url = urljoin(manga_url, href)
-                    chapter_links.append({
-                        'url': full_url,
-                        'number': chapter_num,
-                        'text': link.get_text(strip=True)
-                    })
-        
-        # Remove duplicates and sort by chapter number
-        unique_chapters = {ch['number']: ch for ch in chapter_links}
-        sorted_chapters = sorted(unique_chapters.values(), key=lambda x: x['number'])
-        
-        print(f"✓ Found {len(sorted_chapters)} unique chapters")
+        sorted_chapters, added, not_modified = refresh_chapter_index(manga_url, max_age)
+        
+        if not_modified:
+            print(f"✓ Series page unchanged, {len(sorted_chapters)} chapters from the catalog")
+        else:
+            print(f"✓ Found {len(sorted_chapters)} unique chapters ({len(added)} new since last check)")
         if sorted_chapters:
             print(f"  First: Chapter {sorted_chapters[0]['number']}")
             print(f"  Last: Chapter {sorted_chapters[-1]['number']}")
@@ -239,17 +411,22 @@ def get_all_chapters(manga_url):
         return []
 
 
-def verify_chapter_local(chapter_folder, expected_panels_from_metadata):
+def check_new_chapters(manga_url, manga_slug, metadata_csv_path):
     """
-    Verify a chapter folder using metadata only (no web fetch).
+    Chapters on the series page that we hold no metadata for (one conditional GET).
+    Returns: list of chapter dicts, sorted by number
+    """
+    # Always revalidate here: this is the call that decides whether anything is new
+    chapters = get_all_chapters(manga_url, max_age=0)
+    return unheld_chapters(chapters, load_existing_metadata(metadata_csv_path, manga_slug))
+
+
+def check_panel_files(file_names, expected_panels_from_metadata):
+    """
+    Check a chapter's file names against the expected panel count.
     Returns: (actual_panel_count, expected_panel_count, is_valid, issue_description)
     """
-    if not os.path.exists(chapter_folder):
-        return 0, expected_panels_from_metadata, False, "Folder doesn't exist"
-    
-    # Count panel files
-    panel_files = [f for f in os.listdir(chapter_folder) 
-                   if f.startswith('panel-') and os.path.isfile(os.path.join(chapter_folder, f))]
+    panel_files = [f for f in file_names if is_panel_file(f)]
     
     actual_count = len(panel_files)
     
@@ -279,9 +456,93 @@ def verify_chapter_local(chapter_folder, expected_panels_from_metadata):
     return actual_count, expected_panels_from_metadata, True, ""
 
 
-def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path):
+def verify_chapter_local(chapter_folder, expected_panels_from_metadata):
+    """
+    Verify a chapter folder using metadata only (no web fetch).
+    Returns: (actual_panel_count, expected_panel_count, is_valid, issue_description)
+    """
+    if not os.path.exists(chapter_folder):
+        return 0, expected_panels_from_metadata, False, "Folder doesn't exist"
+    
+    file_names, _, _ = scan_folder(chapter_folder)
+    return check_chapter_files(chapter_folder, file_names, expected_panels_from_metadata)
+
+
+def check_chapter_files(chapter_folder, file_names, expected_count):
+    """Check a listed chapter folder against its manifest, or by file names when it has none"""
+    manifest = load_manifest(chapter_folder) if MANIFEST_FILE in file_names else None
+    if manifest is not None:
+        return check_manifest(chapter_folder, manifest, expected_count)
+    return check_panel_files(file_names, expected_count)
+
+
+def verify_chapter_cached(cache, chapter_path, expected_count):
+    """
+    verify_chapter_local through a VerificationCache.
+    An unchanged folder mtime costs one stat; an unchanged listing skips the check.
+    Returns: (actual_panel_count, expected_panel_count, is_valid, issue_description, from_cache)
+    """
+    folder_name = os.path.basename(chapter_path)
+    mtime_ns = folder_mtime(chapter_path)
+    if mtime_ns is None:
+        return 0, expected_count, False, "Folder doesn't exist", False
+    
+    result = cache.lookup(folder_name, mtime_ns, expected_count)
+    if result is not None:
+        return (*result, True)
+    
+    file_names, entry_count, signature = scan_folder(chapter_path)
+    result = cache.lookup_signature(folder_name, entry_count, signature, expected_count)
+    from_cache = result is not None
+    if not from_cache:
+        result = check_chapter_files(chapter_path, file_names, expected_count)
+    
+    cache.store(folder_name, mtime_ns, entry_count, signature, expected_count, result)
+    return (*result, from_cache)
+
+
+def deep_verify_chapters(manga_path, chapter_folders, discard=False):
+    """
+    Decode-check every panel of the given chapter folders (see image_integrity).
+    With discard=True damaged panels are deleted so a resumed re-download replaces them;
+    otherwise they are only reported.
+    Returns: {chapter_folder: [(filename, issue), ...]} for chapters with damaged panels
+    """
+    panel_paths = []
+    for folder in chapter_folders:
+        chapter_path = os.path.join(manga_path, folder)
+        try:
+            file_names, _, _ = scan_folder(chapter_path)
+        except OSError:
+            continue
+        panel_paths.extend(os.path.join(chapter_path, f) for f in file_names if is_panel_file(f))
+    
+    damaged = verify_images(manga_path, panel_paths)
+    if discard:
+        discard_damaged(manga_path, damaged, manga_panel_store(manga_path))
+    
+    # Chapters from before manifests existed get one now that their panels are known good
+    damaged_folders = {os.path.basename(os.path.dirname(path)) for path in damaged}
+    for folder in chapter_folders:
+        chapter_path = os.path.join(manga_path, folder)
+        if folder not in damaged_folders and load_manifest(chapter_path) is None:
+            build_manifest(chapter_path)
+    
+    by_chapter = {}
+    for path, issue in sorted(damaged.items()):
+        by_chapter.setdefault(os.path.basename(os.path.dirname(path)), []).append((os.path.basename(path), issue))
+    return by_chapter
+
+
+def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path, workers=VERIFY_WORKERS, deep=False,
+                              discard_damaged_panels=False):
     """
     Verify all chapters using metadata only (no web checks).
+    Chapter folders are read by up to `workers` threads, and folders unchanged
+    since the last run are answered from the manga's verify_cache.json.
+    With deep=True every panel of the chapters that pass is also decode-checked and
+    damaged panels are reported; only with discard_damaged_panels=True are they
+    deleted and their chapters added to the re-download list.
     Returns list of chapters that need re-downloading.
     """
     RED = '\033[91m'
@@ -296,22 +557,12 @@ def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path):
     chapters_to_redownload = []
     
     # Load metadata for this manga
-    metadata = {}
-    if os.path.exists(metadata_csv_path):
-        with open(metadata_csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row['manga_slug'] == manga_slug:
-                    chapter_num = int(row['chapter_number'])
-                    metadata[chapter_num] = {
-                        'panel_count': int(row['panel_count']),
-                        'expected_count': int(row.get('expected_count', row['panel_count'])),
-                        'status': row['status']
-                    }
-    else:
+    if not metadata_exists(metadata_csv_path):
         print(f"{RED}✗ Metadata file not found: {metadata_csv_path}{RESET}")
         return []
     
+    metadata = load_existing_metadata(metadata_csv_path, manga_slug)
+    
     print(f"Loaded metadata for {len(metadata)} chapters\n")
     
     manga_path = os.path.join(base_path, manga_slug)
@@ -321,8 +572,7 @@ def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path):
         return []
     
     # Get all chapter folders
-    chapter_folders = [d for d in os.listdir(manga_path) 
-                      if d.startswith('chapter-') and os.path.isdir(os.path.join(manga_path, d))]
+    chapter_folders = list_chapter_folders(manga_path)
     
     # Sort by chapter number
     def get_chapter_num(folder_name):
@@ -333,8 +583,25 @@ def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path):
     
     print(f"Found {len(chapter_folders)} chapter folders\n")
     
+    cache = VerificationCache(manga_path)
+    
+    # Folders with metadata are checked in parallel; results are printed in chapter order
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for folder in chapter_folders:
+            chapter_num = get_chapter_num(folder)
+            expected_from_metadata = metadata.get(chapter_num, {}).get('expected_count')
+            if expected_from_metadata:
+                jobs[folder] = executor.submit(
+                    verify_chapter_cached, cache, os.path.join(manga_path, folder), expected_from_metadata
+                )
+    
+    cache.save()
+    
     issues_found = 0
     checked_count = 0
+    cached_count = 0
+    valid_folders = []
     
     for folder in chapter_folders:
         chapter_match = re.search(r'chapter-(\d+)', folder)
@@ -342,33 +609,53 @@ def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path):
             continue
         
         chapter_num = int(chapter_match.group(1))
-        chapter_path = os.path.join(manga_path, folder)
         
         checked_count += 1
         
-        expected_from_metadata = metadata.get(chapter_num, {}).get('expected_count')
-        
-        if expected_from_metadata is None or expected_from_metadata == 0:
+        if folder not in jobs:
             print(f"[{checked_count}/{len(chapter_folders)}] {YELLOW}⚠ Chapter {chapter_num}: No metadata, skipping{RESET}")
             continue
         
         print(f"[{checked_count}/{len(chapter_folders)}] Checking Chapter {chapter_num}...", end=' ')
         
-        actual_count, expected_count, is_valid, issue = verify_chapter_local(
-            chapter_path, expected_from_metadata
-        )
+        try:
+            actual_count, expected_count, is_valid, issue, from_cache = jobs[folder].result()
+        except OSError as e:
+            actual_count, is_valid, issue, from_cache = 0, False, f"Could not read folder: {e}", False
+        
+        if from_cache:
+            cached_count += 1
         
         if not is_valid:
             issues_found += 1
             print(f"{RED}✗ {issue}{RESET}")
             chapters_to_redownload.append(chapter_num)
         else:
-            print(f"{GREEN}✓ OK ({actual_count} panels){RESET}")
+            print(f"{GREEN}✓ OK ({actual_count} panels){' (cached)' if from_cache else ''}{RESET}")
+            valid_folders.append(folder)
+    
+    damaged_count = 0
+    if deep and valid_folders:
+        print(f"\nDeep-verifying panels of {len(valid_folders)} chapters...")
+        for folder, damaged in deep_verify_chapters(manga_path, valid_folders, discard_damaged_panels).items():
+            chapter_num = get_chapter_num(folder)
+            damaged_count += len(damaged)
+            issues_found += 1
+            if discard_damaged_panels:
+                chapters_to_redownload.append(chapter_num)
+                print(f"{RED}✗ Chapter {chapter_num}: {len(damaged)} damaged panels removed{RESET}")
+            else:
+                print(f"{YELLOW}⚠ Chapter {chapter_num}: {len(damaged)} damaged panels (left in place, report only){RESET}")
+            for filename, issue in damaged:
+                print(f"    {filename}: {issue}")
     
     print(f"\n{'='*60}")
     print(f"VERIFICATION SUMMARY")
     print(f"{'='*60}")
     print(f"Total chapters checked: {checked_count}")
+    print(f"Unchanged since last check: {cached_count}")
+    if deep:
+        print(f"Damaged panels: {damaged_count}")
     print(f"Issues found: {issues_found}")
     print(f"Chapters to re-download: {len(chapters_to_redownload)}")
     if chapters_to_redownload:
@@ -378,8 +665,11 @@ def verify_all_chapters_local(manga_slug, base_path, metadata_csv_path):
     return list(set(chapters_to_redownload))
 
 
-def redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapter_numbers, metadata_csv_path):
-    """Re-download specific chapters and update metadata immediately"""
+def redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapter_numbers, metadata_csv_path, resume=False):
+    """
+    Re-download specific chapters and update metadata immediately.
+    With resume=True only the missing/damaged panels of each chapter are fetched.
+    """
     print(f"\n{'='*60}")
     print(f"RE-DOWNLOADING {len(chapter_numbers)} CHAPTERS")
     print(f"{'='*60}\n")
@@ -406,6 +696,10 @@ def redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapter_nu
         manga_path = os.path.join(base_path, manga_slug)
         chapter_folder = os.path.join(manga_path, f"chapter-{chapter_num:03d}")
         
+        # No fixed pause between chapters: pacing comes from the per-host budget,
+        # and while the source host's circuit is open the next chapter waits here
+        wait_for_host(chapter_data['url'])
+        
         try:
             panel_count, success, error, expected_count = scrape_chapter(
                 chapter_data['url'],
@@ -413,7 +707,8 @@ def redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapter_nu
                 metadata_csv_path,
                 manga_name,
                 manga_slug,
-                update_immediately=True
+                update_immediately=True,
+                resume=resume
             )
             
             if success and panel_count > 0:
@@ -422,8 +717,6 @@ def redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapter_nu
             else:
                 failed_count += 1
             
-            time.sleep(2)
-            
         except Exception as e:
             print(f"✗ Error re-downloading chapter {chapter_num}: {e}")
             failed_count += 1
@@ -434,27 +727,113 @@ def redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapter_nu
     print(f"✓ Successfully re-downloaded: {success_count}/{len(chapter_numbers)}")
     print(f"✗ Failed: {failed_count}/{len(chapter_numbers)}")
     print(f"{'='*60}\n")
+    
+    export_metadata_csv(metadata_csv_path)
 
 
 def load_existing_metadata(metadata_csv_path, manga_slug):
-    """Load existing metadata for a specific manga"""
+    """Load existing metadata for a specific manga (indexed lookup in the store)"""
     existing = {}
-    if os.path.exists(metadata_csv_path):
-        with open(metadata_csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row['manga_slug'] == manga_slug:
-                    chapter_num = int(row['chapter_number'])
-                    existing[chapter_num] = {
-                        'panel_count': int(row['panel_count']),
-                        'expected_count': int(row.get('expected_count', row['panel_count'])),
-                        'status': row['status']
-                    }
+    for chapter_num, row in get_store(metadata_csv_path).load_manga(manga_slug).items():
+        existing[chapter_num] = {
+            'panel_count': row['panel_count'],
+            'expected_count': row['expected_count'],
+            'status': row['status']
+        }
     return existing
 
 
-def scrape_all_chapters(manga_url, manga_name, manga_slug, base_path, start_chapter=1, end_chapter=None):
-    """Scrape multiple chapters with metadata tracking"""
+def completed_panel_count(chapter_folder, meta):
+    """
+    Resume check shared by the scraping engines.
+    Returns the panel count if metadata says the chapter is complete and the
+    folder agrees, otherwise None.
+    """
+    if not meta or not os.path.exists(chapter_folder):
+        return None
+    
+    if meta['status'] == 'success' and meta['panel_count'] == meta.get('expected_count', meta['panel_count']):
+        panel_count = len([f for f in os.listdir(chapter_folder) 
+                         if is_panel_file(f)])
+        if panel_count == meta['expected_count']:
+            return panel_count
+    
+    return None
+
+
+def write_scrape_summary(manga_path, manga_name, manga_slug, requested_count, skipped_chapters, succeeded_chapters, failed_chapters, interrupted=False):
+    """
+    Write scrape_summary.json for a run. Chapter lists are sorted and no timing
+    information is stored, so the same outcome always produces the same file.
+    Returns: summary file path
+    """
+    summary = {
+        'manga_name': manga_name,
+        'manga_slug': manga_slug,
+        'requested_chapters': requested_count,
+        'successful_chapters': len(skipped_chapters) + len(succeeded_chapters),
+        'skipped_chapters': sorted(skipped_chapters),
+        'downloaded_chapters': sorted(succeeded_chapters),
+        'failed_chapters': sorted(failed_chapters),
+        'interrupted': interrupted,
+    }
+    summary_path = os.path.join(manga_path, 'scrape_summary.json')
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, sort_keys=True, ensure_ascii=False)
+    
+    return summary_path
+
+
+def scrape_chapter_job(chapter, chapter_folder, metadata_csv_path, manga_name, manga_slug, disk_cache=None):
+    """
+    Worker-pool unit for scrape_all_chapters.
+    With a disk_cache (see disk_budget) the chapter first waits for room in the
+    budget, and is handed to the cache's uploader as soon as it is complete.
+    Returns: (chapter_num, succeeded)
+    """
+    chapter_num = chapter['number']
+    reserved = disk_cache.acquire() if disk_cache is not None else 0
+    
+    print(f"\n{'='*60}")
+    print(f"Chapter {chapter_num}: {chapter['text']}")
+    print(f"{'='*60}")
+    
+    try:
+        panel_count, success, error, expected_count = scrape_chapter(
+            chapter['url'], 
+            chapter_folder,
+            metadata_csv_path,
+            manga_name,
+            manga_slug,
+            update_immediately=True
+        )
+        succeeded = success and panel_count > 0
+        if succeeded and disk_cache is not None:
+            disk_cache.chapter_ready(chapter_folder)
+        return chapter_num, succeeded
+    
+    except Exception as e:
+        print(f"✗ Error processing chapter {chapter_num}: {e}")
+        update_single_chapter_metadata(
+            metadata_csv_path, manga_name, manga_slug, chapter_num,
+            0, 0, 'failed', str(e)
+        )
+        return chapter_num, False
+    
+    finally:
+        if disk_cache is not None:
+            disk_cache.release(chapter_folder, reserved)
+
+
+def scrape_all_chapters(manga_url, manga_name, manga_slug, base_path, start_chapter=1, end_chapter=None, chapter_workers=CHAPTER_WORKERS, new_only=False, disk_cache=None):
+    """
+    Scrape multiple chapters with metadata tracking.
+    Up to chapter_workers chapters are in flight at once; all of them share the
+    per-host request budget, so there is no fixed sleep between chapters.
+    With new_only=True only chapters that have no metadata row yet are scraped.
+    With a disk_cache, local storage stays within its budget: chapters are uploaded
+    as they finish, and chapters whose upload is confirmed are not scraped again.
+    """
     
     # Setup metadata CSV in public folder
     metadata_csv_path = os.path.join(base_path, 'manga_metadata.csv')
@@ -475,67 +854,82 @@ def scrape_all_chapters(manga_url, manga_name, manga_slug, base_path, start_chap
                    if (ch['number'] >= start_chapter) 
                    and (not end_chapter or ch['number'] <= end_chapter)]
     
+    if new_only:
+        chapters = unheld_chapters(chapters, existing_metadata)
+        if not chapters:
+            print(f"\n✓ No new chapters for {manga_name}")
+            return
+    
     print(f"\n{'='*60}")
-    print(f"Will download {len(chapters)} chapters")
+    print(f"Will download {len(chapters)} {'new ' if new_only else ''}chapters")
     print(f"Manga: {manga_name} ({manga_slug})")
     print(f"Metadata CSV: {metadata_csv_path}")
+    print(f"Chapter workers: {chapter_workers}")
     print(f"{'='*60}\n")
     
-    success_count = 0
+    skipped_chapters = []
+    succeeded_chapters = []
     failed_chapters = []
+    pending = []
     
     manga_path = os.path.join(base_path, manga_slug)
     os.makedirs(manga_path, exist_ok=True)
     
     for chapter in chapters:
         chapter_num = chapter['number']
-        chapter_url = chapter['url']
         
         # Create folder path
         chapter_folder = os.path.join(manga_path, f"chapter-{chapter_num:03d}")
         
+        if disk_cache is not None and disk_cache.is_uploaded(chapter_num):
+            print(f"⊘ Chapter {chapter_num} already uploaded, skipping...")
+            skipped_chapters.append(chapter_num)
+            continue
+        
         # Check if already exists and is complete
-        if os.path.exists(chapter_folder) and chapter_num in existing_metadata:
-            meta = existing_metadata[chapter_num]
-            if meta['status'] == 'success' and meta['panel_count'] == meta.get('expected_count', meta['panel_count']):
-                panel_count = len([f for f in os.listdir(chapter_folder) 
-                                 if f.startswith('panel-')])
-                if panel_count == meta['expected_count']:
-                    print(f"\n⊘ Chapter {chapter_num} already complete with {panel_count} panels, skipping...")
-                    success_count += 1
-                    continue
+        panel_count = completed_panel_count(chapter_folder, existing_metadata.get(chapter_num))
+        if panel_count is not None:
+            print(f"⊘ Chapter {chapter_num} already complete with {panel_count} panels, skipping...")
+            skipped_chapters.append(chapter_num)
+            continue
         
-        print(f"\n{'='*60}")
-        print(f"Chapter {chapter_num}: {chapter['text']}")
-        print(f"{'='*60}")
+        pending.append((chapter, chapter_folder))
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, chapter_workers))
+    interrupted = False
+    
+    try:
+        futures = [
+            executor.submit(scrape_chapter_job, chapter, chapter_folder, metadata_csv_path, manga_name, manga_slug, disk_cache)
+            for chapter, chapter_folder in pending
+        ]
         
-        try:
-            panel_count, success, error, expected_count = scrape_chapter(
-                chapter_url, 
-                chapter_folder,
-                metadata_csv_path,
-                manga_name,
-                manga_slug,
-                update_immediately=True
-            )
-            
-            if success and panel_count > 0:
-                success_count += 1
+        for future in as_completed(futures):
+            chapter_num, succeeded = future.result()
+            if succeeded:
+                succeeded_chapters.append(chapter_num)
             else:
                 failed_chapters.append(chapter_num)
-            
-            time.sleep(2)
-            
-        except KeyboardInterrupt:
-            print("\n\n⚠ Download interrupted by user")
-            break
-        except Exception as e:
-            print(f"✗ Error processing chapter {chapter_num}: {e}")
-            failed_chapters.append(chapter_num)
-            update_single_chapter_metadata(
-                metadata_csv_path, manga_name, manga_slug, chapter_num,
-                0, 0, 'failed', str(e)
-            )
+    
+    except KeyboardInterrupt:
+        print("\n\n⚠ Download interrupted by user")
+        interrupted = True
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    
+    success_count = len(skipped_chapters) + len(succeeded_chapters)
+    summary_path = write_scrape_summary(
+        manga_path, manga_name, manga_slug, len(chapters),
+        skipped_chapters, succeeded_chapters, failed_chapters, interrupted
+    )
+    export_metadata_csv(metadata_csv_path)
+    
+    store = manga_panel_store(manga_path)
+    if store is not None:
+        print_savings_report(store)
+    print_mirror_report()
+    if disk_cache is not None:
+        disk_cache.print_usage()
     
     # Summary
     print(f"\n{'='*60}")
@@ -543,9 +937,10 @@ def scrape_all_chapters(manga_url, manga_name, manga_slug, base_path, start_chap
     print(f"{'='*60}")
     print(f"✓ Successfully downloaded: {success_count}/{len(chapters)} chapters")
     if failed_chapters:
-        print(f"✗ Failed chapters: {', '.join(map(str, failed_chapters))}")
+        print(f"✗ Failed chapters: {', '.join(map(str, sorted(failed_chapters)))}")
     print(f"Location: {manga_path}")
     print(f"Metadata: {metadata_csv_path}")
+    print(f"Summary: {summary_path}")
     print(f"{'='*60}\n")
 
 
@@ -582,8 +977,9 @@ if __name__ == "__main__":
     print("3. Download single chapter")
     print("4. Verify existing chapters (using metadata only)")
     print("5. Re-download failed/incomplete chapters")
+    print("6. Download new chapters only")
     
-    choice = input("\nEnter choice (1-5): ").strip()
+    choice = input("\nEnter choice (1-6): ").strip()
     
     metadata_csv_path = os.path.join(base_path, 'manga_metadata.csv')
     
@@ -609,6 +1005,7 @@ if __name__ == "__main__":
                 manga_path = os.path.join(base_path, manga_slug)
                 chapter_folder = os.path.join(manga_path, f"chapter-{chapter_num:03d}")
                 scrape_chapter(chapter_data['url'], chapter_folder, metadata_csv_path, manga_name, manga_slug, update_immediately=True)
+                export_metadata_csv(metadata_csv_path)
             else:
                 print(f"✗ Chapter {chapter_num} not found")
         
@@ -616,22 +1013,27 @@ if __name__ == "__main__":
             verify_all_chapters(manga_slug, base_path, metadata_csv_path)
         
         elif choice == "5":
-            if not os.path.exists(metadata_csv_path):
+            if not metadata_exists(metadata_csv_path):
                 print("✗ No metadata CSV found. Download some chapters first.")
             else:
                 chapters_to_fix = verify_all_chapters_local(manga_slug, base_path, metadata_csv_path)
                 if chapters_to_fix:
                     confirm = input(f"\nRe-download {len(chapters_to_fix)} chapters? (yes/no): ")
                     if confirm.lower() in ['yes', 'y']:
-                        redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapters_to_fix, metadata_csv_path)
+                        redownload_chapters(manga_url, manga_name, manga_slug, base_path, chapters_to_fix, metadata_csv_path, resume=True)
                         print("\n✓ Re-download complete! Metadata has been updated.")
                 else:
                     print("✓ All chapters verified successfully!")
         
+        elif choice == "6":
+            scrape_all_chapters(manga_url, manga_name, manga_slug, base_path, new_only=True)
+        
         else:
             print("Invalid choice")
     
     except KeyboardInterrupt:
         print("\n\nOperation cancelled by user.")
     except Exception as e:
-        print(f"\n✗ Error: {e}")
\ No newline at end of file
+        print(f"\n✗ Error: {e}")
+    finally:
+        close_session()
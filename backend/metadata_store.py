@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+CHAPTER METADATA STORE
+SQLite (WAL mode) replacement for rewriting the metadata CSV after every chapter.
+Rows are keyed on (manga_slug, chapter_number); the CSV files stay as import/export interchange.
+"""
+
+import os
+import csv
+import sqlite3
+import threading
+from datetime import datetime
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Column order of manga_metadata.csv; the direct-to-Cloudinary CSV adds cloudinary_folder
+CSV_FIELDS = ['manga_name', 'manga_slug', 'chapter_number', 'panel_count', 'expected_count', 'status', 'timestamp', 'error']
+CLOUDINARY_CSV_FIELDS = CSV_FIELDS + ['cloudinary_folder']
+
+BUSY_TIMEOUT = 30  # Seconds a writer waits for another writer's lock
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# ============================================
+# STORE
+# ============================================
+
+class MetadataStore:
+    """Chapter metadata in SQLite; one connection per thread, safe for concurrent writers"""
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.create_schema()
+    
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def create_schema(self):
+        """Create the chapters and uploads tables and the chapters lookup index"""
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chapters (
+                    manga_slug TEXT NOT NULL,
+                    chapter_number INTEGER NOT NULL,
+                    manga_name TEXT,
+                    panel_count INTEGER NOT NULL DEFAULT 0,
+                    expected_count INTEGER NOT NULL DEFAULT 0,
+                    status TEXT,
+                    timestamp TEXT,
+                    error TEXT DEFAULT '',
+                    cloudinary_folder TEXT,
+                    PRIMARY KEY (manga_slug, chapter_number)
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_chapters_status ON chapters (manga_slug, status)')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS uploads (
+                    manga_slug TEXT NOT NULL,
+                    chapter_number INTEGER NOT NULL,
+                    panel_count INTEGER NOT NULL DEFAULT 0,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    cloudinary_folder TEXT,
+                    confirmed_at TEXT,
+                    evicted_at TEXT,
+                    PRIMARY KEY (manga_slug, chapter_number)
+                )
+            """)
+    
+    def upsert_chapter(self, manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error='', cloudinary_folder=None, timestamp=None):
+        """Insert or update one chapter row (cloudinary_folder is kept when None is passed)"""
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                INSERT INTO chapters (manga_slug, chapter_number, manga_name, panel_count, expected_count,
+                                      status, timestamp, error, cloudinary_folder)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (manga_slug, chapter_number) DO UPDATE SET
+                    manga_name = excluded.manga_name,
+                    panel_count = excluded.panel_count,
+                    expected_count = excluded.expected_count,
+                    status = excluded.status,
+                    timestamp = excluded.timestamp,
+                    error = excluded.error,
+                    cloudinary_folder = COALESCE(excluded.cloudinary_folder, chapters.cloudinary_folder)
+            """, (
+                manga_slug, int(chapter_num), manga_name, int(panel_count), int(expected_count),
+                status, timestamp or datetime.now().isoformat(), error or '', cloudinary_folder
+            ))
+    
+    def load_manga(self, manga_slug):
+        """
+        All chapter rows of one manga.
+        Returns: {chapter_number: row_dict}
+        """
+        rows = self.connection().execute(
+            'SELECT * FROM chapters WHERE manga_slug = ? ORDER BY chapter_number', (manga_slug,)
+        ).fetchall()
+        return {row['chapter_number']: dict(row) for row in rows}
+    
+    def get_chapter(self, manga_slug, chapter_num):
+        """One chapter row as a dict, or None"""
+        row = self.connection().execute(
+            'SELECT * FROM chapters WHERE manga_slug = ? AND chapter_number = ?', (manga_slug, int(chapter_num))
+        ).fetchone()
+        return dict(row) if row else None
+    
+    def record_upload(self, manga_slug, chapter_num, panel_count, size_bytes, cloudinary_folder):
+        """Remember that every panel of a chapter is confirmed in Cloudinary (clears any eviction)"""
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO uploads (manga_slug, chapter_number, panel_count, size_bytes,
+                                                cloudinary_folder, confirmed_at, evicted_at)
+                VALUES (?, ?, ?, ?, ?, ?, NULL)
+            """, (manga_slug, int(chapter_num), int(panel_count), int(size_bytes),
+                  cloudinary_folder, datetime.now().isoformat()))
+    
+    def mark_evicted(self, manga_slug, chapter_num, evicted_at=None):
+        """
+        Note that an uploaded chapter's local files were deleted.
+        Returns: the evicted_at timestamp recorded
+        """
+        evicted_at = evicted_at or datetime.now().isoformat()
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                'UPDATE uploads SET evicted_at = ? WHERE manga_slug = ? AND chapter_number = ?',
+                (evicted_at, manga_slug, int(chapter_num))
+            )
+        return evicted_at
+    
+    def load_uploads(self, manga_slug):
+        """
+        Upload records of one manga, oldest confirmation first.
+        Returns: {chapter_number: row_dict}
+        """
+        rows = self.connection().execute(
+            'SELECT * FROM uploads WHERE manga_slug = ? ORDER BY confirmed_at', (manga_slug,)
+        ).fetchall()
+        return {row['chapter_number']: dict(row) for row in rows}
+    
+    def count(self):
+        """Total number of chapter rows"""
+        return self.connection().execute('SELECT COUNT(*) FROM chapters').fetchone()[0]
+    
+    def import_csv(self, csv_path):
+        """
+        Upsert every row of a metadata CSV (either column layout).
+        Returns: number of rows imported
+        """
+        if not os.path.exists(csv_path):
+            return 0
+        
+        imported = 0
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    panel_count = int(float(row.get('panel_count') or 0))
+                    self.upsert_chapter(
+                        row.get('manga_name', ''),
+                        row['manga_slug'],
+                        int(float(row['chapter_number'])),
+                        panel_count,
+                        int(float(row.get('expected_count') or panel_count)),
+                        row.get('status', ''),
+                        row.get('error', ''),
+                        row.get('cloudinary_folder') or None,
+                        timestamp=row.get('timestamp') or None
+                    )
+                    imported += 1
+                except (KeyError, ValueError) as e:
+                    print(f"⚠ Skipping bad metadata row {row}: {e}")
+        
+        return imported
+    
+    def export_csv(self, csv_path, fieldnames=None):
+        """
+        Write all rows to a CSV in the interchange format.
+        fieldnames defaults to the existing file's header, else CSV_FIELDS.
+        Returns: number of rows written
+        """
+        if fieldnames is None:
+            fieldnames = CSV_FIELDS
+            if os.path.exists(csv_path):
+                with open(csv_path, 'r', encoding='utf-8') as f:
+                    header = csv.DictReader(f).fieldnames
+                if header:
+                    fieldnames = header
+        
+        rows = self.connection().execute(
+            'SELECT * FROM chapters ORDER BY manga_slug, chapter_number'
+        ).fetchall()
+        
+        tmp_path = csv_path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for row in rows:
+                row = dict(row)
+                row['cloudinary_folder'] = row['cloudinary_folder'] or ''
+                writer.writerow(row)
+        os.replace(tmp_path, csv_path)
+        
+        return len(rows)
+    
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+def store_path_for_csv(csv_path):
+    """SQLite file that backs a metadata CSV (same folder and name, .sqlite3)"""
+    return os.path.splitext(csv_path)[0] + '.sqlite3'
+
+
+def metadata_exists(csv_path):
+    """True if there is metadata for this CSV in either form"""
+    return os.path.exists(store_path_for_csv(csv_path)) or os.path.exists(csv_path)
+
+
+def get_store(csv_path):
+    """
+    Shared MetadataStore for a metadata CSV path.
+    The first time the database is created, the existing CSV is imported into it.
+    """
+    db_path = store_path_for_csv(csv_path)
+    key = os.path.abspath(db_path)
+    
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            is_new = not os.path.exists(db_path)
+            folder = os.path.dirname(db_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            store = MetadataStore(db_path)
+            if is_new and os.path.exists(csv_path):
+                imported = store.import_csv(csv_path)
+                print(f"✓ Imported {imported} metadata rows from {csv_path}")
+            _stores[key] = store
+    
+    return store
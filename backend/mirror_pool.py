@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+MIRROR POOL
+Some sources serve the same paths from several mirror hosts
+(e.g. w21.read-onepiece-manga.com and w23.read-onepiece-manga.com).
+Each host keeps rolling latency and error statistics; chapter and panel
+fetches go to the fastest healthy mirror and fail over to the next one
+when a mirror errors, times out or has its circuit open.
+"""
+
+import re
+import time
+import threading
+from urllib.parse import urlparse
+
+from http_client import polite_get
+from retry_policy import RetryPolicy, get_circuit_breakers
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+# Known mirror sets; hosts named wNN.<domain> are also grouped automatically as they are seen
+MIRROR_GROUPS = [
+    ('w21.read-onepiece-manga.com', 'w23.read-onepiece-manga.com'),
+]
+MIRROR_PATTERN = re.compile(r'^w\d+\.(.+)$')
+
+LATENCY_ALPHA = 0.2          # Weight of the newest sample in the rolling latency
+ERROR_ALPHA = 0.3            # Weight of the newest outcome in the rolling error rate
+ERROR_HALF_LIFE = 120.0      # Seconds for a mirror's error rate to halve while it is not used
+ERROR_PENALTY = 10.0         # Seconds of latency an error rate of 100% is worth when ranking mirrors
+MISS_STATUSES = {404, 410}   # The mirror is healthy but doesn't have this path
+
+# Every mirror but the last gets a single attempt; the last one gets the full policy
+FAILOVER_POLICY = RetryPolicy(max_attempts=1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# ============================================
+# PER-HOST STATISTICS
+# ============================================
+
+class MirrorStats:
+    """Rolling latency and error rate of one host"""
+    
+    def __init__(self, host):
+        self.host = host
+        self.latency = None   # Seconds to response headers (EWMA), None until measured
+        self.error_rate = 0.0
+        self.last_error = 0.0
+        self.requests = 0
+        self.errors = 0
+    
+    def record_success(self, latency):
+        self.requests += 1
+        self.latency = latency if self.latency is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency
+        )
+        self.error_rate = (1 - ERROR_ALPHA) * self.current_error_rate()
+    
+    def record_error(self):
+        self.requests += 1
+        self.errors += 1
+        self.error_rate = ERROR_ALPHA + (1 - ERROR_ALPHA) * self.current_error_rate()
+        self.last_error = time.monotonic()
+    
+    def current_error_rate(self):
+        """Error rate decayed by the time since the last error, so idle mirrors get tried again"""
+        if not self.error_rate:
+            return 0.0
+        idle = time.monotonic() - self.last_error
+        return self.error_rate * 0.5 ** (idle / ERROR_HALF_LIFE)
+    
+    def score(self):
+        """Lower is better; healthy unmeasured mirrors rank first so every mirror gets a sample"""
+        return (self.latency or 0.0) + ERROR_PENALTY * self.current_error_rate()
+
+
+# ============================================
+# POOL
+# ============================================
+
+def mirror_key(host):
+    """Group a host belongs to: the shared domain for wNN.<domain> hosts, else the host itself"""
+    match = MIRROR_PATTERN.match(host)
+    return match.group(1) if match else host
+
+
+class MirrorPool:
+    """Mirror sets and their statistics; safe to share between threads"""
+    
+    def __init__(self, groups=MIRROR_GROUPS):
+        self._groups = {}   # group key -> [host, ...]
+        self._stats = {}    # host -> MirrorStats
+        self._lock = threading.Lock()
+        for hosts in groups:
+            for host in hosts:
+                self.add_host(host, mirror_key(hosts[0]))
+    
+    def add_host(self, host, key=None):
+        key = key or mirror_key(host)
+        with self._lock:
+            hosts = self._groups.setdefault(key, [])
+            if host not in hosts:
+                hosts.append(host)
+                self._stats[host] = MirrorStats(host)
+    
+    def group_of(self, host):
+        with self._lock:
+            for hosts in self._groups.values():
+                if host in hosts:
+                    return list(hosts)
+        self.add_host(host)
+        return [host]
+    
+    def ranked_urls(self, url):
+        """
+        url rewritten onto every mirror of its host, best first.
+        Mirrors whose circuit is open go last.
+        """
+        parsed = urlparse(url)
+        hosts = self.group_of(parsed.netloc)
+        breakers = get_circuit_breakers()
+        
+        with self._lock:
+            ranked = sorted(hosts, key=lambda host: (
+                breakers.is_open(f"{parsed.scheme}://{host}"),
+                self._stats[host].score(),
+                host != parsed.netloc,
+            ))
+        return [parsed._replace(netloc=host).geturl() for host in ranked]
+    
+    def record(self, url, latency=None, ok=True):
+        host = urlparse(url).netloc
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                return
+            if ok:
+                stats.record_success(latency)
+            else:
+                stats.record_error()
+    
+    def report(self):
+        """Returns: {group: [{'host', 'latency_ms', 'error_rate', 'requests', 'errors'}, ...]}"""
+        with self._lock:
+            return {
+                key: [{
+                    'host': host,
+                    'latency_ms': round(self._stats[host].latency * 1000) if self._stats[host].latency is not None else None,
+                    'error_rate': round(self._stats[host].current_error_rate(), 3),
+                    'requests': self._stats[host].requests,
+                    'errors': self._stats[host].errors,
+                } for host in hosts]
+                for key, hosts in self._groups.items() if len(hosts) > 1
+            }
+
+
+def get_mirror_pool():
+    """Return the process-wide mirror pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MirrorPool()
+    return _pool
+
+
+# ============================================
+# FETCHING
+# ============================================
+
+def mirrored_get(url, **kwargs):
+    """
+    polite_get against the fastest healthy mirror of url's host, failing over
+    to the next mirror on errors, retryable statuses or a missing path.
+    Hosts without mirrors behave exactly like polite_get.
+    Returns: the response (raise_for_status() is left to the caller)
+    """
+    pool = get_mirror_pool()
+    candidates = pool.ranked_urls(url)
+    response = None
+    
+    for position, candidate in enumerate(candidates):
+        last = position == len(candidates) - 1
+        if response is not None:
+            response.close()
+        
+        started = time.monotonic()
+        try:
+            response = polite_get(candidate, policy=None if last else FAILOVER_POLICY, **kwargs)
+        except Exception:
+            pool.record(candidate, ok=False)
+            if last:
+                raise
+            print(f"🔀 {urlparse(candidate).netloc} failed, trying next mirror")
+            continue
+        
+        if response.status_code >= 500 or response.status_code == 429:
+            pool.record(candidate, ok=False)
+            if not last:
+                print(f"🔀 {urlparse(candidate).netloc} answered {response.status_code}, trying next mirror")
+            continue
+        
+        pool.record(candidate, time.monotonic() - started)
+        if response.status_code in MISS_STATUSES and not last:
+            continue
+        return response
+    
+    return response
+
+
+def print_mirror_report():
+    """Print the rolling statistics of every mirror set in use"""
+    for key, hosts in get_mirror_pool().report().items():
+        print(f"🌐 Mirrors of {key}:")
+        for stats in hosts:
+            latency = f"{stats['latency_ms']} ms" if stats['latency_ms'] is not None else "not measured"
+            print(f"   {stats['host']}: {latency}, error rate {stats['error_rate']:.0%} "
+                  f"({stats['errors']}/{stats['requests']} failed)")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+CONTENT-ADDRESSED PANEL STORE
+Panels that repeat across chapters (scanlation credits, recruitment banners,
+end-of-chapter pages) are kept once:
+  - locally as one blob under <root>/blobs/, hardlinked into each chapter folder
+  - remotely as one uploaded asset whose URL every later copy reuses
+Source URLs already seen are served from the store without downloading again.
+Only files that pass the image check (image_integrity) become or serve blobs.
+A registry (SQLite, same conventions as metadata_store) tracks blobs, sources,
+the files linked to each blob, remote assets and the bytes / requests / uploads saved.
+
+Print the savings report for a store:
+    python panel_store.py <store_root>
+"""
+
+import os
+import sys
+import sqlite3
+import threading
+
+from chapter_manifest import HASH_ALGORITHM, hash_file, load_manifest
+from image_integrity import check_image_file
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+PANEL_STORE_DIR = 'panel_store'  # Created next to the manga folders (local) or the metadata CSV (direct)
+BUSY_TIMEOUT = 30
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def blob_key(entry):
+    """Store key of a manifest entry: hash algorithm plus digest"""
+    return f"{entry['hash_algorithm']}-{entry['hash']}"
+
+
+# ============================================
+# STORE
+# ============================================
+
+class PanelStore:
+    """Blob files plus their registry; one SQLite connection per thread"""
+    
+    def __init__(self, root):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.db_path = os.path.join(root, 'panel_store.sqlite3')
+        self._local = threading.local()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.create_schema()
+    
+    def connection(self):
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def create_schema(self):
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    key TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    ext TEXT NOT NULL,
+                    refs INTEGER NOT NULL DEFAULT 0,
+                    remote_url TEXT,
+                    remote_public_id TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sources (
+                    url TEXT PRIMARY KEY,
+                    key TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS links (
+                    path TEXT PRIMARY KEY,
+                    key TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS savings (
+                    kind TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    bytes INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+    
+    # ---------- registry ----------
+    
+    def blob_path(self, key, ext):
+        return os.path.join(self.blob_dir, key[-2:], key + ext)
+    
+    def get_blob(self, key):
+        row = self.connection().execute('SELECT * FROM blobs WHERE key = ?', (key,)).fetchone()
+        return dict(row) if row else None
+    
+    def key_for_url(self, url):
+        row = self.connection().execute('SELECT key FROM sources WHERE url = ?', (url,)).fetchone()
+        return row['key'] if row else None
+    
+    def remember_source(self, url, key):
+        conn = self.connection()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO sources (url, key) VALUES (?, ?)', (url, key))
+    
+    def add_saving(self, kind, size):
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                INSERT INTO savings (kind, count, bytes) VALUES (?, 1, ?)
+                ON CONFLICT (kind) DO UPDATE SET count = count + 1, bytes = bytes + excluded.bytes
+            """, (kind, size))
+    
+    def link_key(self, filepath):
+        """links row key of a chapter file (relative to the store, so the tree can move)"""
+        return os.path.relpath(os.path.abspath(filepath), os.path.abspath(self.root)).replace('\\', '/')
+    
+    def register_blob(self, key, size, ext, filepath):
+        """
+        Insert a blob row if new and record filepath as one of its references.
+        refs counts distinct files, so placing the same panel again doesn't inflate it.
+        """
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                INSERT INTO blobs (key, size, ext, refs) VALUES (?, ?, ?, 0)
+                ON CONFLICT (key) DO NOTHING
+            """, (key, size, ext))
+            path = self.link_key(filepath)
+            previous = conn.execute('SELECT key FROM links WHERE path = ?', (path,)).fetchone()
+            conn.execute('INSERT OR REPLACE INTO links (path, key) VALUES (?, ?)', (path, key))
+            # The file may have held other content before (a re-downloaded panel)
+            for counted in {key, previous['key'] if previous else key}:
+                conn.execute(
+                    'UPDATE blobs SET refs = (SELECT COUNT(*) FROM links WHERE key = ?) WHERE key = ?',
+                    (counted, counted)
+                )
+    
+    def forget(self, key):
+        """Drop a blob whose content turned out to be damaged: its file, its row, and every source and link to it"""
+        blob = self.get_blob(key)
+        if blob:
+            try:
+                os.remove(self.blob_path(key, blob['ext']))
+            except FileNotFoundError:
+                pass
+        conn = self.connection()
+        with conn:
+            conn.execute('DELETE FROM sources WHERE key = ?', (key,))
+            conn.execute('DELETE FROM links WHERE key = ?', (key,))
+            conn.execute('DELETE FROM blobs WHERE key = ?', (key,))
+    
+    def forget_file(self, filepath):
+        """
+        Drop the blob a damaged chapter file belongs to, found by its current content
+        and by the hash its chapter manifest recorded (bit rot in a hardlink changes both).
+        Returns: number of blobs dropped
+        """
+        keys = set()
+        try:
+            keys.add(f"{HASH_ALGORITHM}-{hash_file(filepath)}")
+        except OSError:
+            pass
+        manifest = load_manifest(os.path.dirname(filepath))
+        entry = manifest['panels'].get(os.path.basename(filepath)) if manifest else None
+        if entry:
+            keys.add(blob_key(entry))
+        row = self.connection().execute('SELECT key FROM links WHERE path = ?', (self.link_key(filepath),)).fetchone()
+        if row:
+            keys.add(row['key'])
+        
+        dropped = 0
+        for key in keys:
+            if self.get_blob(key):
+                self.forget(key)
+                dropped += 1
+        return dropped
+    
+    # ---------- local (hardlinks) ----------
+    
+    def link_into(self, blob_file, filepath):
+        """Hardlink a blob onto filepath atomically. Returns False if the filesystem can't"""
+        tmp_path = filepath + '.link'
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            os.link(blob_file, tmp_path)
+            os.replace(tmp_path, filepath)
+            return True
+        except OSError:
+            return False
+    
+    def materialize_url(self, url, filepath):
+        """
+        Place a panel whose source URL the store has seen before, without downloading it.
+        A blob that fails the image check is dropped, so the panel is downloaded again.
+        Returns: (size, key) or None if the URL is unknown or its blob is gone or damaged
+        """
+        key = self.key_for_url(url)
+        blob = self.get_blob(key) if key else None
+        if not blob:
+            return None
+        
+        blob_file = self.blob_path(key, blob['ext'])
+        if not os.path.exists(blob_file):
+            return None
+        is_valid, issue = check_image_file(blob_file)
+        if not is_valid:
+            print(f"⚠ Panel store: dropping damaged blob {key} ({issue})")
+            self.forget(key)
+            return None
+        if not self.link_into(blob_file, filepath):
+            return None
+        
+        self.register_blob(key, blob['size'], blob['ext'], filepath)
+        self.add_saving('download', blob['size'])
+        self.add_saving('disk', blob['size'])
+        return blob['size'], key
+    
+    def adopt(self, filepath, entry):
+        """
+        Deduplicate a freshly downloaded panel.
+        If its content is already stored, the file is replaced by a hardlink to the blob;
+        otherwise the file itself becomes the blob (hardlinked into the store).
+        Files that fail the image check (error pages, truncated downloads) are left out.
+        Returns: (accepted, issue_description)
+        """
+        is_valid, issue = check_image_file(filepath)
+        if not is_valid:
+            return False, issue
+        
+        key = blob_key(entry)
+        ext = os.path.splitext(filepath)[1]
+        blob = self.get_blob(key)
+        
+        if entry.get('url'):
+            self.remember_source(entry['url'], key)
+        
+        if blob:
+            blob_file = self.blob_path(key, blob['ext'])
+            if os.path.exists(blob_file) and blob['size'] == entry['size']:
+                if not os.path.samefile(blob_file, filepath) and self.link_into(blob_file, filepath):
+                    self.add_saving('disk', entry['size'])
+                self.register_blob(key, entry['size'], blob['ext'], filepath)
+                return True, ""
+        
+        # New content, or a blob file that has gone missing and is rebuilt from this copy
+        ext = blob['ext'] if blob else ext
+        blob_file = self.blob_path(key, ext)
+        os.makedirs(os.path.dirname(blob_file), exist_ok=True)
+        try:
+            if os.path.exists(blob_file):
+                os.remove(blob_file)
+            os.link(filepath, blob_file)
+        except OSError:
+            return True, ""  # No hardlinks here (e.g. FAT / another volume): keep the plain file
+        self.register_blob(key, entry['size'], ext, filepath)
+        return True, ""
+    
+    def drop_unlinked(self, keys):
+        """
+        Delete the blob files of these keys that no chapter folder links to any more
+        (their registry rows stay, so uploaded copies are still reused).
+        Returns: bytes freed
+        """
+        freed = 0
+        for key in keys:
+            blob = self.get_blob(key)
+            if not blob:
+                continue
+            blob_file = self.blob_path(key, blob['ext'])
+            try:
+                stat = os.stat(blob_file)
+                if stat.st_nlink <= 1:
+                    os.remove(blob_file)
+                    freed += stat.st_size
+            except FileNotFoundError:
+                pass
+        return freed
+    
+    # ---------- remote (shared assets) ----------
+    
+    def remote_asset(self, key):
+        """(url, public_id) of an already uploaded copy of this content, or None"""
+        blob = self.get_blob(key)
+        if blob and blob['remote_url']:
+            return blob['remote_url'], blob['remote_public_id']
+        return None
+    
+    def remote_asset_for_url(self, url):
+        """Uploaded copy of a source URL seen before: (url, public_id, size) or None"""
+        key = self.key_for_url(url)
+        blob = self.get_blob(key) if key else None
+        if blob and blob['remote_url']:
+            return blob['remote_url'], blob['remote_public_id'], blob['size']
+        return None
+    
+    def record_remote(self, key, size, ext, remote_url, public_id, source_url=None):
+        """Remember the uploaded asset that holds this content"""
+        conn = self.connection()
+        with conn:
+            conn.execute("""
+                INSERT INTO blobs (key, size, ext, refs, remote_url, remote_public_id) VALUES (?, ?, ?, 1, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    remote_url = COALESCE(blobs.remote_url, excluded.remote_url),
+                    remote_public_id = COALESCE(blobs.remote_public_id, excluded.remote_public_id)
+            """, (key, size, ext, remote_url, public_id))
+        if source_url:
+            self.remember_source(source_url, key)
+    
+    # ---------- reporting ----------
+    
+    def savings(self):
+        """
+        Returns: {kind: {'count', 'bytes'}} for 'download', 'disk', 'upload' and
+        'remote_fetch' (panels Cloudinary pulled itself) plus totals of stored blobs and references
+        """
+        conn = self.connection()
+        report = {kind: {'count': 0, 'bytes': 0} for kind in ('download', 'disk', 'upload', 'remote_fetch')}
+        for row in conn.execute('SELECT * FROM savings'):
+            report[row['kind']] = {'count': row['count'], 'bytes': row['bytes']}
+        
+        blobs, blob_bytes, refs = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(refs), 0) FROM blobs'
+        ).fetchone()
+        report['blobs'] = {'count': blobs, 'bytes': blob_bytes, 'references': refs}
+        return report
+    
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ============================================
+# HELPERS
+# ============================================
+
+def get_panel_store(root):
+    """Shared PanelStore for a root folder"""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = PanelStore(root)
+            _stores[key] = store
+    return store
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def print_savings_report(store):
+    """Print how much deduplication has saved so far"""
+    report = store.savings()
+    print(f"\n{'='*60}")
+    print("PANEL STORE SAVINGS")
+    print(f"{'='*60}")
+    print(f"Unique panels stored: {report['blobs']['count']} ({format_bytes(report['blobs']['bytes'])}), "
+          f"{report['blobs']['references']} references")
+    print(f"Downloads skipped: {report['download']['count']} ({format_bytes(report['download']['bytes'])})")
+    print(f"Disk saved by hardlinks: {report['disk']['count']} panels ({format_bytes(report['disk']['bytes'])})")
+    print(f"Uploads skipped: {report['upload']['count']} ({format_bytes(report['upload']['bytes'])})")
+    if report['remote_fetch']['count']:
+        print(f"Pulled by Cloudinary (not proxied): {report['remote_fetch']['count']} "
+              f"({format_bytes(report['remote_fetch']['bytes'])})")
+    print(f"{'='*60}\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python panel_store.py <store_root>")
+        sys.exit(1)
+    print_savings_report(get_panel_store(sys.argv[1]))
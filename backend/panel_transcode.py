@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+PANEL TRANSCODING
+Optional pipeline stage between verification and upload: re-encodes scraped
+panels (mostly large baseline JPEGs) to WebP or AVIF in a process pool,
+dropping EXIF / XMP / ICC metadata. A panel is only replaced when the new file
+is meaningfully smaller; its manifest entry is rewritten and the bytes saved
+are accumulated in a per-manga report.
+
+Transcode one manga folder by hand:
+    python panel_transcode.py <manga_folder> [webp|avif] [quality]
+"""
+
+import os
+import sys
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from chapter_manifest import load_manifest, build_manifest, write_manifest, hash_file, HASH_ALGORITHM
+from verify_cache import list_chapter_folders
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  (registers the AVIF codec on Pillow < 11.3)
+except ImportError:
+    pillow_avif = None
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+TRANSCODE_FORMAT = 'webp'                # 'webp' or 'avif'
+TRANSCODE_QUALITY = 80
+TRANSCODE_MIN_SAVING = 0.05              # Keep the original unless the new file is at least 5% smaller
+TRANSCODE_WORKERS = os.cpu_count() or 4  # Encoding is CPU bound
+TRANSCODE_CHUNKSIZE = 8
+TRANSCODE_REPORT_FILE = 'transcode_report.json'  # Kept in the manga folder
+
+# format name -> (Pillow codec, file extension, encoder options)
+TARGET_FORMATS = {
+    'webp': ('WEBP', '.webp', {'method': 4}),
+    'avif': ('AVIF', '.avif', {'speed': 6}),
+}
+
+
+def format_supported(target_format):
+    """True if Pillow is installed and can encode the target format"""
+    if Image is None or target_format not in TARGET_FORMATS:
+        return False
+    Image.init()
+    return TARGET_FORMATS[target_format][0] in Image.SAVE
+
+
+# ============================================
+# SINGLE PANEL
+# ============================================
+
+def transcode_panel(path, target_format=TRANSCODE_FORMAT, quality=TRANSCODE_QUALITY,
+                    min_saving=TRANSCODE_MIN_SAVING):
+    """
+    Re-encode one panel next to the original.
+    The original is replaced only if the result is smaller by at least min_saving.
+    Returns: (path, new_path or None, original_size, new_size, new_hash, issue_description)
+    """
+    codec, ext, options = TARGET_FORMATS[target_format]
+    new_path = os.path.splitext(path)[0] + ext
+    tmp_path = new_path + '.transcode'
+    
+    try:
+        original_size = os.path.getsize(path)
+        with Image.open(path) as img:
+            if getattr(img, 'is_animated', False):
+                return path, None, original_size, original_size, None, "Animated image kept as is"
+            
+            img.load()
+            if img.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in img.mode or 'transparency' in img.info
+                img = img.convert('RGBA' if has_alpha else 'RGB')
+            
+            # No exif / icc_profile / xmp arguments: the new file carries pixels only
+            img.save(tmp_path, codec, quality=quality, **options)
+        
+        new_size = os.path.getsize(tmp_path)
+        if new_size > original_size * (1 - min_saving):
+            os.remove(tmp_path)
+            return path, None, original_size, original_size, None, "No worthwhile saving"
+        
+        new_hash = hash_file(tmp_path)
+        os.replace(tmp_path, new_path)
+        if new_path != path:
+            os.remove(path)
+        return path, new_path, original_size, new_size, new_hash, ""
+    
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return path, None, 0, 0, None, f"Transcode failed: {e}"
+
+
+def transcode_job(args):
+    """Process-pool unit: transcode_panel(*args)"""
+    return transcode_panel(*args)
+
+
+# ============================================
+# REPORT
+# ============================================
+
+def load_report(manga_path):
+    """Cumulative transcoding totals of a manga (empty if it was never transcoded)"""
+    path = os.path.join(manga_path, TRANSCODE_REPORT_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {'panels': 0, 'bytes_before': 0, 'bytes_after': 0}
+
+
+def save_report(manga_path, report):
+    path = os.path.join(manga_path, TRANSCODE_REPORT_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# ============================================
+# MANGA FOLDER
+# ============================================
+
+def collect_panels(manga_path, target_format, skip_panels):
+    """
+    Panels of every chapter that still need transcoding, with their manifests.
+    skip_panels: {"chapter-NNN/panel-NNN"} (no extension) to leave untouched,
+    e.g. panels already uploaded under their original format.
+    Returns: ({chapter_folder: manifest}, [panel_path, ...])
+    """
+    ext = TARGET_FORMATS[target_format][1]
+    manifests = {}
+    paths = []
+    
+    for folder_name in sorted(list_chapter_folders(manga_path)):
+        chapter_folder = os.path.join(manga_path, folder_name)
+        manifest = load_manifest(chapter_folder) or build_manifest(chapter_folder)
+        manifests[chapter_folder] = manifest
+        
+        for filename in sorted(manifest['panels']):
+            stem, file_ext = os.path.splitext(filename)
+            if file_ext.lower() == ext or f"{folder_name}/{stem}" in skip_panels:
+                continue
+            paths.append(os.path.join(chapter_folder, filename))
+    
+    return manifests, paths
+
+
+def transcode_manga(manga_path, target_format=TRANSCODE_FORMAT, quality=TRANSCODE_QUALITY,
+                    skip_panels=frozenset(), workers=TRANSCODE_WORKERS):
+    """
+    Transcode every chapter of a manga folder and rewrite the affected manifests.
+    Returns: {'panels', 'bytes_before', 'bytes_after', 'failed'} for this run
+    """
+    summary = {'panels': 0, 'bytes_before': 0, 'bytes_after': 0, 'failed': 0}
+    
+    if not format_supported(target_format):
+        print(f"⚠️  Transcoding skipped: Pillow with {target_format.upper()} support is not installed")
+        return summary
+    
+    manifests, paths = collect_panels(manga_path, target_format, skip_panels)
+    if not paths:
+        print("✅ No panels left to transcode")
+        return summary
+    
+    print(f"🎨 Transcoding {len(paths)} panels to {target_format.upper()} (quality {quality}, {workers} workers)...")
+    
+    changed = set()
+    jobs = [(path, target_format, quality) for path in paths]
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+        for path, new_path, original_size, new_size, new_hash, issue in executor.map(
+                transcode_job, jobs, chunksize=TRANSCODE_CHUNKSIZE):
+            if issue.startswith('Transcode failed'):
+                summary['failed'] += 1
+                print(f"❌ {os.path.relpath(path, manga_path)}: {issue}")
+                continue
+            if new_path is None:
+                continue
+            
+            chapter_folder = os.path.dirname(path)
+            panels = manifests[chapter_folder]['panels']
+            entry = panels.pop(os.path.basename(path))
+            entry['original_size'] = entry.get('original_size', entry['size'])
+            entry.update({'size': new_size, 'hash': new_hash, 'hash_algorithm': HASH_ALGORITHM})
+            panels[os.path.basename(new_path)] = entry
+            changed.add(chapter_folder)
+            
+            summary['panels'] += 1
+            summary['bytes_before'] += original_size
+            summary['bytes_after'] += new_size
+    
+    for chapter_folder in changed:
+        write_manifest(chapter_folder, manifests[chapter_folder])
+    
+    report = load_report(manga_path)
+    for key in ('panels', 'bytes_before', 'bytes_after'):
+        report[key] += summary[key]
+    report.update({'format': target_format, 'quality': quality})
+    save_report(manga_path, report)
+    
+    print_transcode_summary(summary)
+    return summary
+
+
+def print_transcode_summary(summary):
+    saved = summary['bytes_before'] - summary['bytes_after']
+    percent = (saved / summary['bytes_before'] * 100) if summary['bytes_before'] else 0
+    print(f"✅ Transcoded: {summary['panels']} panels")
+    print(f"💾 Size: {summary['bytes_before'] / 1024 / 1024:.1f} MB -> {summary['bytes_after'] / 1024 / 1024:.1f} MB "
+          f"({percent:.1f}% saved)")
+    if summary['failed']:
+        print(f"❌ Failed: {summary['failed']} (originals kept)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python panel_transcode.py <manga_folder> [webp|avif] [quality]")
+        sys.exit(1)
+    transcode_manga(
+        sys.argv[1],
+        target_format=sys.argv[2] if len(sys.argv) > 2 else TRANSCODE_FORMAT,
+        quality=int(sys.argv[3]) if len(sys.argv) > 3 else TRANSCODE_QUALITY,
+    )
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+RETRY POLICY
+One retry engine shared by the scrapers and uploaders:
+  - exponential backoff with full jitter between attempts
+  - Retry-After (seconds or HTTP date) honoured on 429 / 503 answers
+  - a circuit breaker per host: after repeated failures the host is parked,
+    callers wait instead of burning attempts, and a single probe request
+    decides when work resumes
+"""
+
+import re
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+RETRY_ATTEMPTS = 4          # Attempts per request, including the first
+RETRY_BASE_DELAY = 1.0      # Backoff before the second attempt (doubles after each failure)
+RETRY_MAX_DELAY = 60.0      # Ceiling for one backoff
+RETRY_AFTER_CAP = 300.0     # Longest Retry-After we are willing to honour
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+
+BREAKER_FAILURE_THRESHOLD = 5   # Consecutive failures that open a host's circuit
+BREAKER_RESET_TIMEOUT = 15.0    # First pause before a probe request is let through
+BREAKER_MAX_RESET_TIMEOUT = 600.0
+BREAKER_PROBE_POLL = 1.0        # How often parked callers look again while a probe is running
+
+CLOUDINARY_HOST = 'api.cloudinary.com'  # Breaker shared by every Cloudinary upload / Admin API call
+
+_breakers = None
+_breakers_lock = threading.Lock()
+
+
+def host_of(url):
+    """Host a URL's requests are accounted to (a bare name such as 'cloudinary' is its own host)"""
+    return urlparse(url).netloc or url
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), RETRY_AFTER_CAP)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return min(max(0.0, retry_at.timestamp() - time.time()), RETRY_AFTER_CAP)
+
+
+# ============================================
+# BACKOFF
+# ============================================
+
+class RetryPolicy:
+    """How often and how patiently to retry one request"""
+    
+    def __init__(self, max_attempts=RETRY_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY, retry_statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+    
+    def delay(self, attempt, retry_after=None):
+        """
+        Wait before retry number attempt + 1 (attempt counts from 0).
+        Full jitter keeps parallel workers from retrying in lockstep;
+        a server-supplied Retry-After is the minimum.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            return max(backoff, retry_after)
+        return backoff
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+def status_of(exc):
+    """HTTP status carried by an exception (requests or Cloudinary), or None"""
+    response = getattr(exc, 'response', None)
+    if response is not None and getattr(response, 'status_code', None):
+        return response.status_code
+    match = re.search(r'status code - (\d{3})', str(exc))
+    return int(match.group(1)) if match else None
+
+
+def is_retryable(exc, policy=DEFAULT_POLICY):
+    """True for failures worth another attempt: network errors, timeouts and retryable statuses"""
+    status = status_of(exc)
+    if status is not None:
+        return status in policy.retry_statuses
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError, ConnectionError, TimeoutError)):
+        return True
+    # Cloudinary wraps transport errors and throttling in its own exception types
+    return type(exc).__name__ == 'RateLimited' or str(exc).startswith('Unexpected error')
+
+
+def retry_after_of(exc_or_response):
+    """Retry-After of a response, or of the response attached to an exception"""
+    response = getattr(exc_or_response, 'response', exc_or_response)
+    headers = getattr(response, 'headers', None) or {}
+    return parse_retry_after(headers.get('Retry-After'))
+
+
+# ============================================
+# CIRCUIT BREAKERS
+# ============================================
+
+class CircuitBreaker:
+    """
+    Health of one host: closed (normal), open (parked until reset time) or
+    half-open (one probe request in flight decides whether to close again)
+    """
+    
+    def __init__(self, host, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT, max_reset_timeout=BREAKER_MAX_RESET_TIMEOUT):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.open_until = 0.0
+        self.paused_until = 0.0   # Retry-After from the host, honoured even while closed
+        self.probe_in_flight = False
+        self._lock = threading.Lock()
+    
+    def before_request(self):
+        """
+        Reserve the right to send a request.
+        Returns: seconds to wait first (0 means go ahead now)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.paused_until > now:
+                return self.paused_until - now
+            
+            if self.state == 'closed':
+                return 0
+            
+            if self.state == 'open':
+                if now < self.open_until:
+                    return self.open_until - now
+                self.state = 'half_open'
+                self.probe_in_flight = False
+            
+            if self.probe_in_flight:
+                return BREAKER_PROBE_POLL
+            self.probe_in_flight = True
+            return 0
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print(f"🟢 {self.host} recovered, resuming")
+            self.state = 'closed'
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self.probe_in_flight = False
+    
+    def record_failure(self, retry_after=None):
+        with self._lock:
+            now = time.monotonic()
+            self.failures += 1
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+            
+            if self.state == 'half_open':
+                # The probe failed: stay parked, and for longer
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                self.trip(now)
+            elif self.state == 'closed' and self.failures >= self.failure_threshold:
+                self.trip(now)
+    
+    def release(self):
+        """End a request that says nothing about host health (e.g. a local error)"""
+        with self._lock:
+            self.probe_in_flight = False
+    
+    def trip(self, now):
+        """Open the circuit (called with the lock held)"""
+        self.state = 'open'
+        self.open_until = now + self.reset_timeout
+        self.probe_in_flight = False
+        print(f"🔴 {self.host} failing ({self.failures} errors), parking requests for {self.reset_timeout:.0f}s")
+
+
+class HostCircuitBreakers:
+    """One CircuitBreaker per host, created on first use"""
+    
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+    
+    def get(self, url):
+        host = host_of(url)
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(host)
+                self._breakers[host] = breaker
+        return breaker
+    
+    def wait(self, url):
+        """
+        Park the caller until the host accepts requests again.
+        Returns: the host's breaker, with a request slot reserved
+        """
+        breaker = self.get(url)
+        while True:
+            wait = breaker.before_request()
+            if wait <= 0:
+                return breaker
+            time.sleep(wait)
+    
+    def is_open(self, url):
+        return self.get(url).state != 'closed'
+
+
+def get_circuit_breakers():
+    """Return the process-wide circuit breaker registry"""
+    global _breakers
+    if _breakers is None:
+        with _breakers_lock:
+            if _breakers is None:
+                _breakers = HostCircuitBreakers()
+    return _breakers
+
+
+def wait_for_host(url):
+    """Block while the URL's host is parked (no request is sent)"""
+    breakers = get_circuit_breakers()
+    breakers.wait(url).release()
+
+
+# ============================================
+# RETRYING CALLS
+# ============================================
+
+def retry_call(func, url, policy=None):
+    """
+    Call func() (one request to url's host) under the retry policy and the host's breaker.
+    Responses with a retryable status are retried; after the last attempt the
+    response is returned as is so the caller's raise_for_status() still applies.
+    Exceptions that are not retryable are raised immediately.
+    """
+    policy = policy or DEFAULT_POLICY
+    breakers = get_circuit_breakers()
+    
+    for attempt in range(policy.max_attempts):
+        breaker = breakers.wait(url)
+        last_attempt = attempt == policy.max_attempts - 1
+        
+        try:
+            result = func()
+        except Exception as e:
+            if not is_retryable(e, policy):
+                # 4xx and local errors say nothing about the host's health
+                if status_of(e) is not None:
+                    breaker.record_success()
+                else:
+                    breaker.release()
+                raise
+            retry_after = retry_after_of(e)
+            breaker.record_failure(retry_after)
+            if last_attempt:
+                raise
+            time.sleep(policy.delay(attempt, retry_after))
+            continue
+        
+        status = getattr(result, 'status_code', None)
+        if status in policy.retry_statuses:
+            retry_after = retry_after_of(result)
+            breaker.record_failure(retry_after)
+            if last_attempt:
+                return result
+            result.close()
+            time.sleep(policy.delay(attempt, retry_after))
+            continue
+        
+        breaker.record_success()
+        return result
@@ -7,8 +7,6 @@ Can work with or without Selenium
 import os
 import requests
 import re
-import csv
-from datetime import datetime
 import time
 import random
 from selenium import webdriver
@@ -16,6 +14,8 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
+from metadata_store import get_store, CSV_FIELDS
+from retry_policy import RetryPolicy, retry_call
 
 
 class HiMangaScraper:
@@ -53,25 +53,19 @@ class HiMangaScraper:
             return f"{self.cloudinary_base}{path}"
     
     def download_image(self, url, output_path, max_retries=3):
-        """Download image with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(url, timeout=15)
-                
-                if response.status_code == 200:
-                    with open(output_path, 'wb') as f:
-                        f.write(response.content)
-                    return True
-                elif response.status_code == 404:
-                    return False  # Panel doesn't exist
-                
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    print(f" ({str(e)[:30]})")
-                    return False
-                time.sleep(1)
+        """Download image with the shared retry policy (backoff, Retry-After, host breaker)"""
+        try:
+            response = retry_call(lambda: self.session.get(url, timeout=15), url, RetryPolicy(max_attempts=max_retries))
+        except Exception as e:
+            print(f" ({str(e)[:30]})")
+            return False
+        
+        if response.status_code == 200:
+            with open(output_path, 'wb') as f:
+                f.write(response.content)
+            return True
         
-        return False
+        return False  # 404: panel doesn't exist; anything else failed after retries
     
     def scrape_chapter_smart(self, manga_slug, chapter_num, output_folder, max_panels=200, use_selenium=False):
         """
@@ -190,52 +184,14 @@ class HiMangaScraper:
             driver.quit()
     
     def update_metadata(self, metadata_path, manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error=''):
-        """Update metadata CSV"""
-        
-        if not os.path.exists(metadata_path):
-            with open(metadata_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['manga_name', 'manga_slug', 'chapter_number', 'panel_count', 'expected_count', 'status', 'timestamp', 'error'])
-        
-        rows = []
-        chapter_exists = False
-        
-        try:
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                fieldnames = reader.fieldnames
-                
-                for row in reader:
-                    if row['manga_slug'] == manga_slug and int(row['chapter_number']) == chapter_num:
-                        row.update({
-                            'manga_name': manga_name,
-                            'panel_count': panel_count,
-                            'expected_count': expected_count,
-                            'status': status,
-                            'timestamp': datetime.now().isoformat(),
-                            'error': error
-                        })
-                        chapter_exists = True
-                    rows.append(row)
-        except FileNotFoundError:
-            fieldnames = ['manga_name', 'manga_slug', 'chapter_number', 'panel_count', 'expected_count', 'status', 'timestamp', 'error']
-        
-        with open(metadata_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-            
-            if not chapter_exists:
-                writer.writerow({
-                    'manga_name': manga_name,
-                    'manga_slug': manga_slug,
-                    'chapter_number': chapter_num,
-                    'panel_count': panel_count,
-                    'expected_count': expected_count,
-                    'status': status,
-                    'timestamp': datetime.now().isoformat(),
-                    'error': error
-                })
+        """Upsert chapter metadata (SQLite store behind the CSV)"""
+        get_store(metadata_path).upsert_chapter(
+            manga_name, manga_slug, chapter_num, panel_count, expected_count, status, error
+        )
+    
+    def export_metadata(self, metadata_path):
+        """Refresh the metadata CSV from the store"""
+        get_store(metadata_path).export_csv(metadata_path, fieldnames=CSV_FIELDS)
     
     def scrape_chapters_batch(self, manga_name, manga_slug, start_chapter, end_chapter, use_selenium=False):
         """Scrape multiple chapters"""
@@ -305,6 +261,8 @@ class HiMangaScraper:
         print(f"📁 Location: {manga_path}")
         print(f"📄 Metadata: {metadata_path}")
         print(f"{'='*60}\n")
+        
+        self.export_metadata(metadata_path)
 
 
 def main():
@@ -353,6 +311,7 @@ def main():
             metadata_path = os.path.join(base_path, 'himanga_metadata.csv')
             status = 'success' if downloaded == expected and downloaded > 0 else 'partial'
             scraper.update_metadata(metadata_path, manga_name, manga_slug, chapter_num, downloaded, expected, status)
+            scraper.export_metadata(metadata_path)
             
         elif choice == "2":
             start = int(input("Start chapter: "))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend modules are imported flat (python html_extract.py, from html_extract import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+"""Every extraction backend must return exactly what the full BeautifulSoup parse returns"""
+
+import os
+
+import pytest
+
+pytest.importorskip('bs4')
+
+import html_extract
+from html_extract import (
+    available_backends, chapter_link_items, chapter_links_bs4_full,
+    panel_image_srcs, panel_srcs_bs4_full,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+RECORDED_PAGES = sorted(name for name in os.listdir(FIXTURES) if name.endswith('.html'))
+BACKENDS = available_backends()
+
+
+def read_page(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('page', RECORDED_PAGES)
+def test_recorded_page_bytes(page, backend):
+    html = read_page(page)
+    assert panel_image_srcs(html, backend) == panel_srcs_bs4_full(html)
+    assert chapter_link_items(html, backend) == chapter_links_bs4_full(html)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('page', RECORDED_PAGES)
+def test_recorded_page_text(page, backend):
+    html = html_extract.as_text(read_page(page))
+    assert panel_image_srcs(html, backend) == panel_srcs_bs4_full(html)
+    assert chapter_link_items(html, backend) == chapter_links_bs4_full(html)
+
+
+def test_fixtures_exercise_the_selectors():
+    # A parity check on pages with nothing to extract would prove nothing
+    assert len(panel_srcs_bs4_full(read_page('chapter_page.html'))) == 5
+    assert len(chapter_links_bs4_full(read_page('index_page.html'))) == 6
+    assert 'https://cdn.mangaread.org/ch-1163/04 café.webp' in panel_srcs_bs4_full(read_page('chapter_page_cp1252.html'))
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('html', [b'', '', b'  \n', '\n\t'])
+def test_empty_page(html, backend):
+    assert panel_image_srcs(html, backend) == []
+    assert chapter_link_items(html, backend) == []
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_text_with_xml_declaration(backend):
+    html = ('<?xml version="1.0" encoding="utf-8"?>\n'
+            '<html><body><div class="page-break no-gaps"><img src="https://x/1.jpg"></div>'
+            '<ul class="main"><li><a href="/c1"> Chapter 1 </a></li></ul></body></html>')
+    assert panel_image_srcs(html, backend) == panel_srcs_bs4_full(html)
+    assert chapter_link_items(html, backend) == chapter_links_bs4_full(html)
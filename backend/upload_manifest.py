@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+UPLOAD MANIFESTS
+Every uploaded chapter gets a JSON manifest (one per Cloudinary folder) holding
+what Cloudinary answered for each panel: public_id, version, format, bytes,
+width, height, etag and the delivery URL. Verification, the Supabase sync and
+the reader's catalog are built from these files instead of listing resources
+through the rate-limited Admin API.
+"""
+
+import os
+import re
+import json
+import threading
+from datetime import datetime
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+UPLOAD_MANIFEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'upload_manifests')
+UPLOAD_MANIFEST_VERSION = 1
+ASSET_FIELDS = ('public_id', 'version', 'format', 'bytes', 'width', 'height', 'etag', 'secure_url')
+DELIVERY_URL_PATTERN = re.compile(r'/v(\d+)/(.+)\.(\w+)$')
+
+_folder_locks = {}   # cloudinary folder -> lock serialising read-modify-write of its manifest
+_locks_lock = threading.Lock()
+
+
+def folder_lock(cloudinary_folder):
+    with _locks_lock:
+        return _folder_locks.setdefault(cloudinary_folder, threading.Lock())
+
+
+def chapter_number(cloudinary_folder):
+    match = re.search(r'chapter-(\d+)$', cloudinary_folder)
+    return int(match.group(1)) if match else None
+
+
+# ============================================
+# ENTRIES
+# ============================================
+
+def asset_entry(index, upload_result, source_url=None):
+    """One manifest record from a Cloudinary upload result"""
+    entry = {field: upload_result.get(field) for field in ASSET_FIELDS}
+    entry.update({'index': index, 'source_url': source_url})
+    return entry
+
+
+def shared_asset_entry(index, secure_url, public_id, size, source_url=None):
+    """
+    Record for a panel served by an asset uploaded for another panel (same content).
+    Version and format come from the delivery URL; dimensions and etag are unknown.
+    """
+    match = DELIVERY_URL_PATTERN.search(secure_url or '')
+    entry = {field: None for field in ASSET_FIELDS}
+    entry.update({
+        'index': index,
+        'public_id': public_id,
+        'version': int(match.group(1)) if match else None,
+        'format': match.group(3) if match else None,
+        'bytes': size,
+        'secure_url': secure_url,
+        'source_url': source_url,
+        'shared': True,
+    })
+    return entry
+
+
+def panel_index(filename):
+    """Position of a panel-NNN file or public_id, or None for anything else"""
+    match = re.match(r'panel-(\d+)', os.path.basename(filename))
+    return int(match.group(1)) if match else None
+
+
+def panel_name(entry):
+    """Manifest key of an entry: panel-NNN"""
+    return f"panel-{entry['index']:03d}"
+
+
+# ============================================
+# READ / WRITE
+# ============================================
+
+def upload_manifest_path(cloudinary_folder, manifest_dir=UPLOAD_MANIFEST_DIR):
+    """JSON file of a Cloudinary folder (its path mirrored under manifest_dir)"""
+    parts = [re.sub(r'[^A-Za-z0-9_.-]', '_', part) for part in cloudinary_folder.strip('/').split('/')]
+    return os.path.join(manifest_dir, *parts) + '.json'
+
+
+def load_upload_manifest(cloudinary_folder, manifest_dir=UPLOAD_MANIFEST_DIR):
+    """A folder's upload manifest, or None if it has none (or an unreadable / older-format one)"""
+    path = upload_manifest_path(cloudinary_folder, manifest_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if manifest.get('version') != UPLOAD_MANIFEST_VERSION or manifest.get('cloudinary_folder') != cloudinary_folder:
+        return None
+    return manifest
+
+
+def write_upload_manifest(manifest, manifest_dir=UPLOAD_MANIFEST_DIR):
+    """Write a manifest atomically"""
+    path = upload_manifest_path(manifest['cloudinary_folder'], manifest_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def record_uploads(cloudinary_folder, entries, expected_count=None, chapter_url=None,
+                   manifest_dir=UPLOAD_MANIFEST_DIR):
+    """
+    Merge freshly uploaded panels into the folder's manifest (entries replace
+    earlier ones at the same position).
+    entries: iterable of asset_entry / shared_asset_entry records
+    Returns: the updated manifest
+    """
+    with folder_lock(cloudinary_folder):
+        manifest = load_upload_manifest(cloudinary_folder, manifest_dir) or {
+            'version': UPLOAD_MANIFEST_VERSION,
+            'cloudinary_folder': cloudinary_folder,
+            'chapter_number': chapter_number(cloudinary_folder),
+            'chapter_url': None,
+            'expected_count': None,
+            'panels': {},
+        }
+        if expected_count is not None:
+            manifest['expected_count'] = expected_count
+        manifest['chapter_url'] = chapter_url or manifest['chapter_url']
+        manifest['panels'].update({panel_name(entry): entry for entry in entries})
+        manifest['updated_at'] = datetime.now().isoformat()
+        write_upload_manifest(manifest, manifest_dir)
+    return manifest
+
+
+def load_manga_upload_manifests(cloudinary_base, manifest_dir=UPLOAD_MANIFEST_DIR):
+    """
+    Upload manifests of every chapter folder under a manga's Cloudinary folder.
+    Returns: {chapter_number: manifest}
+    """
+    manifests = {}
+    base_path = os.path.splitext(upload_manifest_path(cloudinary_base, manifest_dir))[0]
+    if not os.path.isdir(base_path):
+        return manifests
+    
+    with os.scandir(base_path) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith('.json'):
+                manifest = load_upload_manifest(f"{cloudinary_base}/{entry.name[:-5]}", manifest_dir)
+                if manifest is not None and manifest['chapter_number'] is not None:
+                    manifests[manifest['chapter_number']] = manifest
+    return manifests
+
+
+# ============================================
+# VERIFICATION AND LISTINGS
+# ============================================
+
+def check_upload_manifest(manifest, expected_count):
+    """
+    Verify a chapter's uploads against its expected panel count.
+    Returns: (uploaded_panel_count, expected_panel_count, is_valid, issue_description)
+    """
+    panels = manifest['panels'] if manifest else {}
+    uploaded_count = len(panels)
+    
+    if uploaded_count == 0:
+        return 0, expected_count, False, "No uploads recorded"
+    
+    if not expected_count:
+        return uploaded_count, 0, False, "No expected count in metadata"
+    
+    if uploaded_count != expected_count:
+        return uploaded_count, expected_count, False, f"Upload count mismatch: expected {expected_count}, got {uploaded_count}"
+    
+    if sorted(entry['index'] for entry in panels.values()) != list(range(1, expected_count + 1)):
+        return uploaded_count, expected_count, False, "Uploaded panel numbering has gaps"
+    
+    return uploaded_count, expected_count, True, ""
+
+
+def panel_urls(manifest):
+    """Delivery URLs of a chapter's panels, in reading order"""
+    entries = sorted(manifest['panels'].values(), key=lambda entry: entry['index'])
+    return [entry['secure_url'] for entry in entries]
+
+
+def uploaded_public_ids(manifest):
+    """
+    Uploaded panels as public_id.extension, the form get_all_public_ids_with_extension returns
+    (panels stored as a shared asset under another public_id are listed under their own name)
+    """
+    public_ids = set()
+    for name, entry in manifest['panels'].items():
+        ext = (entry.get('format') or '').lower()
+        ext = 'jpg' if ext == 'jpeg' else ext
+        public_id = f"{manifest['cloudinary_folder']}/{name}" if entry.get('shared') else entry['public_id']
+        public_ids.add(f"{public_id}.{ext}" if ext else public_id)
+    return public_ids
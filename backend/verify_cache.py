@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+CHAPTER VERIFICATION CACHE
+Remembers the result of verifying each chapter folder, keyed on the folder's
+mtime, entry count and a cheap signature of its entries, so unchanged chapters
+are not listed and re-checked on every pipeline step.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+VERIFY_CACHE_FILE = 'verify_cache.json'  # Kept in the manga folder, next to scrape_summary.json
+VERIFY_WORKERS = 16  # Chapter folders listed in parallel (directory reads are I/O bound)
+# Coarse filesystems (FAT, SMB) only store mtimes to ~2s, so a change made right
+# after a check can leave the mtime untouched; such entries are always re-listed
+MTIME_SLACK_NS = 2 * 10**9
+
+
+# ============================================
+# DIRECTORY SCANNING
+# ============================================
+
+def folder_mtime(folder):
+    """Folder mtime in ns, or None if it doesn't exist (one stat, no listing)"""
+    try:
+        return os.stat(folder).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def scan_folder(folder):
+    """
+    List a folder with os.scandir.
+    Returns: (file_names, entry_count, signature)
+    The signature hashes the sorted entry names and sizes, so renames, additions,
+    removals and replaced files change it.
+    """
+    names = []
+    sized_names = []
+    entry_count = 0
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            entry_count += 1
+            if entry.is_file():
+                names.append(entry.name)
+                sized_names.append(f"{entry.name}:{entry.stat().st_size}")
+    
+    names.sort()
+    sized_names.sort()
+    signature = hashlib.sha1('\n'.join(sized_names).encode('utf-8')).hexdigest()
+    return names, entry_count, signature
+
+
+def list_chapter_folders(manga_path):
+    """chapter-* subfolder names of a manga folder, via one scandir"""
+    with os.scandir(manga_path) as entries:
+        return [entry.name for entry in entries
+                if entry.name.startswith('chapter-') and entry.is_dir()]
+
+
+# ============================================
+# CACHE
+# ============================================
+
+class VerificationCache:
+    """Per-manga verification results persisted as JSON; safe to share between threads"""
+    
+    def __init__(self, manga_path):
+        self.path = os.path.join(manga_path, VERIFY_CACHE_FILE)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self.load()
+    
+    def load(self):
+        """Read the cache file (a missing or unreadable file is an empty cache)"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def lookup(self, folder_name, mtime_ns, expected_count):
+        """Cached result if the folder's mtime and the expected count are unchanged"""
+        with self._lock:
+            entry = self.entries.get(folder_name)
+        if (entry and entry['mtime_ns'] == mtime_ns and entry['expected_count'] == expected_count
+                and entry['checked_ns'] - mtime_ns > MTIME_SLACK_NS):
+            return entry['result']
+        return None
+    
+    def lookup_signature(self, folder_name, entry_count, signature, expected_count):
+        """Cached result if the listing is identical (the folder was touched but not changed)"""
+        with self._lock:
+            entry = self.entries.get(folder_name)
+        if (entry and entry['entry_count'] == entry_count and entry['signature'] == signature
+                and entry['expected_count'] == expected_count):
+            return entry['result']
+        return None
+    
+    def store(self, folder_name, mtime_ns, entry_count, signature, expected_count, result):
+        """Remember one folder's verification result"""
+        with self._lock:
+            self.entries[folder_name] = {
+                'mtime_ns': mtime_ns,
+                'entry_count': entry_count,
+                'signature': signature,
+                'expected_count': expected_count,
+                'result': list(result),
+                'checked_ns': time.time_ns(),
+            }
+            self._dirty = True
+    
+    def save(self):
+        """Write the cache back if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False